@@ -0,0 +1,66 @@
+"""
+Throughput of run_agent (sequential) vs arun_agent (concurrent).
+
+A local fake LLM with artificial latency stands in for OpenAI, so the
+numbers show how much network wait a single process can overlap.
+
+    python benchmarks/bench_async_agent.py --requests 64 --llm-latency 0.2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-local-benchmark")
+os.environ["LLM_CACHE_ENABLED"] = "0"
+
+from core.agent import Intent, arun_agent, run_agent
+from core.fakes import install_fakes
+
+
+def _payload(i):
+    return {"question": f"How many days of annual leave do I get? (request {i})"}
+
+
+def run_sequential(n):
+    start = time.perf_counter()
+    for i in range(n):
+        run_agent(Intent.HR_QA, _payload(i))
+    return time.perf_counter() - start
+
+
+async def run_concurrent(n):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(arun_agent(Intent.HR_QA, _payload(i)) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for r in results if "error" in r)
+    return elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--sequential-requests", type=int, default=8,
+                        help="sequential sample size (it is slow by design)")
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    install_fakes(llm_latency=args.llm_latency, embed_latency=args.embed_latency)
+
+    seq = run_sequential(args.sequential_requests)
+    conc, errors = asyncio.run(run_concurrent(args.requests))
+
+    print(f"sync  run_agent : {args.sequential_requests / seq:8.1f} req/s")
+    print(f"async arun_agent: {args.requests / conc:8.1f} req/s "
+          f"({args.requests} concurrent, {errors} errors)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Upstream call policy: tail latency with and without hedging, and an LLM outage with and without the circuit breaker.
+
+HR Q&A requests run against fakes whose LLM latency is drawn from a
+distribution with a slow tail (`--tail-probability` of calls take
+`--tail` seconds instead of `--base`), like a provider with one bad
+replica. Each mode first warms the latency window, then reports p50/p95/
+p99 request latency and the extra LLM calls spent on hedges.
+
+The outage scenario makes every LLM call hang past its deadline and times
+a run of requests: without the breaker each one waits out the deadline,
+with it they fail fast to the fallback answer once the circuit opens.
+
+    python benchmarks/bench_call_policy.py --requests 200 --base 0.03 --tail 1.0
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "0")
+# LLM hedging is opt-in; the tail scenario measures exactly that
+os.environ.setdefault("HEDGE_UPSTREAMS", "llm,embeddings,vector_search")
+
+from core import call_policy, config, registry  # noqa: E402
+from core.agent import Intent, run_agent  # noqa: E402
+from core.fakes import install_fakes, tail_latency  # noqa: E402
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _llm_calls():
+    return sum(llm.calls for llm in registry._llms.values())
+
+
+def _ask(i):
+    start = time.perf_counter()
+    result = run_agent(Intent.HR_QA, {"question": f"What is the annual leave policy? (case {i})"})
+    return time.perf_counter() - start, result
+
+
+def run_tail(label, hedging, args):
+    config.HEDGE_ENABLED = hedging
+    call_policy.reset()
+    install_fakes(llm_latency=tail_latency(args.base, args.tail, args.tail_probability, seed=7))
+
+    for i in range(config.HEDGE_MIN_SAMPLES + 10):
+        _ask(-i - 1)
+    calls_before = _llm_calls()
+
+    latencies = [_ask(i)[0] for i in range(args.requests)]
+    extra = _llm_calls() - calls_before - args.requests
+    llm = call_policy.stats()["llm"]
+    print(
+        f"{label:<16} p50 {_percentile(latencies, 0.50) * 1000:7.1f}ms"
+        f"  p95 {_percentile(latencies, 0.95) * 1000:7.1f}ms"
+        f"  p99 {_percentile(latencies, 0.99) * 1000:7.1f}ms"
+        f"  mean {statistics.mean(latencies) * 1000:6.1f}ms"
+        f"  extra LLM calls {extra / args.requests:5.1%}"
+        f"  hedges fired/won {llm['hedges_fired']}/{llm['hedges_won']}"
+    )
+
+
+def run_outage(label, failures, args):
+    config.BREAKER_FAILURES = failures
+    config.LLM_TIMEOUT_SECONDS = args.outage_timeout
+    call_policy.reset()
+    install_fakes(llm_latency=args.outage_timeout * 10)
+
+    start = time.perf_counter()
+    results = [_ask(i)[1] for i in range(args.outage_requests)]
+    elapsed = time.perf_counter() - start
+    llm = call_policy.stats()["llm"]
+    fallbacks = sum(1 for r in results if "LLM unavailable" in r.get("source", ""))
+    print(
+        f"{label:<16} {args.outage_requests} requests in {elapsed:6.2f}s"
+        f"  ({elapsed / args.outage_requests * 1000:6.1f}ms each)"
+        f"  timeouts {llm['timeouts']}  rejected {llm['rejected']}"
+        f"  fallback answers {fallbacks}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--base", type=float, default=0.03, help="usual LLM latency (s)")
+    parser.add_argument("--tail", type=float, default=1.0, help="slow-tail LLM latency (s)")
+    parser.add_argument("--tail-probability", type=float, default=0.03)
+    parser.add_argument("--outage-requests", type=int, default=20)
+    parser.add_argument("--outage-timeout", type=float, default=0.25, help="LLM deadline during the outage (s)")
+    args = parser.parse_args()
+
+    print(
+        f"LLM latency {args.base * 1000:.0f}ms, {args.tail_probability:.0%} of calls "
+        f"{args.tail * 1000:.0f}ms; {args.requests} sequential HR Q&A requests\n"
+    )
+    try:
+        run_tail("no hedging", False, args)
+        run_tail("hedged at p95", True, args)
+
+        print(f"\nLLM outage: every call hangs, deadline {args.outage_timeout * 1000:.0f}ms\n")
+        run_outage("no breaker", 10 ** 9, args)
+        run_outage("circuit breaker", 5, args)
+    finally:
+        registry.restore_defaults()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Time to a rendered screening list, per explain mode.
+
+Screens --resumes resumes against one job description with explanations
+for the top --top-k, using a fake LLM with --llm-latency per call. For each
+mode it reports how long until the ranked list is available, how long
+until --read explanations have been fetched (a recruiter opening a few
+rows), and how many LLM calls were made in total.
+
+    python benchmarks/bench_deferred_explanations.py --resumes 200 --top-k 10 --read 2
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ["LLM_CACHE_ENABLED"] = "0"
+
+from core import registry
+from core.agent import Intent, run_agent
+from core.fakes import install_fakes
+
+SKILLS = ["Python", "Docker", "Kubernetes", "PostgreSQL", "AWS", "React", "Go", "Terraform", "Kafka"]
+JOB_DESCRIPTION = "Backend engineer: Python, Docker, Kubernetes, PostgreSQL, AWS"
+
+
+def _llm_calls():
+    return sum(llm.calls for llm in registry._llms.values())
+
+
+def _resumes(count, seed=3):
+    rng = random.Random(seed)
+    return [", ".join(rng.sample(SKILLS, rng.randint(1, 6))) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--read", type=int, default=2, help="explanations fetched after the list renders")
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    args = parser.parse_args()
+
+    install_fakes(llm_latency=args.llm_latency)
+    resumes = _resumes(args.resumes)
+    print(f"{args.resumes} resumes, top {args.top_k} explained, {args.read} read\n")
+    print(f"{'mode':<12}{'list ready':>12}{'read done':>12}{'llm calls':>12}")
+
+    for mode in ("inline", "background", "lazy", "none"):
+        before = _llm_calls()
+        start = time.perf_counter()
+        result = run_agent(Intent.RESUME_SCREENING_BATCH, {
+            "resumes": resumes,
+            "job_description": JOB_DESCRIPTION,
+            "explain_top_k": args.top_k,
+            "explain": mode
+        })
+        listed = time.perf_counter() - start
+
+        for row in result["results"][:args.read]:
+            if "explanation_handle" in row:
+                run_agent(Intent.EXPLANATION, {"handle": row["explanation_handle"]})
+        read = time.perf_counter() - start
+
+        # Background explanations nobody read still finish (and are paid for)
+        for row in result["results"]:
+            if "explanation_handle" in row and mode == "background":
+                run_agent(Intent.EXPLANATION, {"handle": row["explanation_handle"]})
+
+        print(f"{mode:<12}{listed * 1000:>10.0f}ms{read * 1000:>10.0f}ms{_llm_calls() - before:>12}")
+
+
+if __name__ == "__main__":
+    main()
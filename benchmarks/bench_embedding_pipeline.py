@@ -0,0 +1,127 @@
+"""
+Knowledge-base build throughput: batch size, concurrency, rate limits, resume.
+
+Builds a numpy-backed vector store from a generated policy corpus with
+fake embeddings that take `--latency` per request, then:
+
+  * compares one request in flight with `--concurrency` in flight,
+  * caps the fake provider at `--rps` requests per second to show the
+    AIMD window shrinking and the build still completing,
+  * fails a build partway and resumes it, counting re-embedded chunks.
+
+    python benchmarks/bench_embedding_pipeline.py --paragraphs 20000 --latency 0.05
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from core import config, vector_store
+from core.fakes import FakeEmbeddings, sample_corpus
+
+
+class FailingEmbeddings(FakeEmbeddings):
+    """Raises a non-retryable error on the n-th request."""
+
+    def __init__(self, fail_on, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_on = fail_on
+
+    def embed_documents(self, texts):
+        if self.calls + 1 >= self.fail_on:
+            raise ConnectionError("simulated provider outage")
+        return super().embed_documents(texts)
+
+
+def generate(data_dir, paragraphs: int, files: int = 8, seed: int = 11):
+    rng = random.Random(seed)
+    corpus = sample_corpus()
+    per_file = max(paragraphs // files, 1)
+    for i in range(files):
+        with open(os.path.join(data_dir, f"policy_{i:02d}.txt"), "w", encoding="utf-8") as f:
+            for j in range(per_file):
+                f.write(f"Section {i}.{j}. {rng.choice(corpus)}\n\n")
+
+
+def _point_at(work_dir, name):
+    """Use a fresh vector_db under `work_dir` for the next build."""
+    db_dir = os.path.join(work_dir, name)
+    vector_store.VECTOR_DB_DIR = db_dir
+    vector_store.MANIFEST_PATH = os.path.join(db_dir, "manifest.json")
+    vector_store.NUMPY_INDEX_DIR = os.path.join(db_dir, "numpy")
+    vector_store.JOURNAL_PATH = os.path.join(db_dir, "build_journal.jsonl")
+
+
+def _build(label, embeddings, **kwargs):
+    start = time.perf_counter()
+    summary = vector_store.build_vector_store(embeddings=embeddings, **kwargs)
+    seconds = time.perf_counter() - start
+    stats = summary["embedding"]
+    print(
+        f"{label:<34}{seconds:>8.2f}s{summary['chunks_added'] / seconds:>9.0f} chunks/s"
+        f"  requests={embeddings.calls} rate_limited={stats['rate_limited']}"
+        f" final_window={stats['concurrency']} resumed={summary['chunks_resumed']}"
+    )
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paragraphs", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per embedding request")
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=20, help="provider rate limit for the throttled run")
+    args = parser.parse_args()
+
+    config.VECTOR_BACKEND = "numpy"
+    work_dir = tempfile.mkdtemp(prefix="hr_embed_")
+    data_dir = os.path.join(work_dir, "data")
+    os.makedirs(data_dir)
+    try:
+        generate(data_dir, args.paragraphs)
+        vector_store.DATA_DIR = data_dir
+        size = sum(os.path.getsize(os.path.join(data_dir, f)) for f in os.listdir(data_dir))
+        print(f"{args.paragraphs} paragraphs, {size / 1e6:.1f} MB, batch size {args.batch_size}\n")
+
+        _point_at(work_dir, "serial")
+        _build("1 request in flight", FakeEmbeddings(latency=args.latency),
+               batch_size=args.batch_size, concurrency=1)
+
+        _point_at(work_dir, "parallel")
+        _build(f"up to {args.concurrency} in flight", FakeEmbeddings(latency=args.latency),
+               batch_size=args.batch_size, concurrency=args.concurrency)
+
+        _point_at(work_dir, "throttled")
+        throttled = FakeEmbeddings(latency=args.latency, requests_per_second=args.rps)
+        _build(f"rate limited to {args.rps:g} req/s", throttled,
+               batch_size=args.batch_size, concurrency=args.concurrency)
+
+        _point_at(work_dir, "resumed")
+        try:
+            vector_store.build_vector_store(
+                embeddings=FailingEmbeddings(fail_on=20, latency=args.latency),
+                batch_size=args.batch_size, concurrency=args.concurrency
+            )
+        except ConnectionError as e:
+            print(f"\nbuild failed partway ({e}); resuming")
+        summary = _build("resumed build", FakeEmbeddings(latency=args.latency),
+                         batch_size=args.batch_size, concurrency=args.concurrency)
+
+        store = vector_store.load_vector_store(FakeEmbeddings())
+        assert len(store) == summary["chunks_added"], (len(store), summary["chunks_added"])
+        print(f"store holds {len(store)} chunks, each embedded once after the resume")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
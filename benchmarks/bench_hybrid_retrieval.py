@@ -0,0 +1,204 @@
+"""
+Retrieval latency and recall: vector-only vs hybrid vs hybrid + lexical fast path.
+
+Builds a numpy vector store and its BM25 index from a generated policy
+corpus (one file per topic, so the relevant chunks of each query are
+known) with fake embeddings that take `--embed-latency` per call, like a
+remote embedding API. Every query of the labelled set is then retrieved
+in each mode with an empty memo, reporting latency, embedding calls made,
+recall@k (a query counts when a top-k chunk comes from its topic file) and
+the share of vector-only results each mode keeps.
+
+    python benchmarks/bench_hybrid_retrieval.py --embed-latency 0.08 --k 3
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from core import config, registry, retrieval, vector_store
+from core.fakes import FakeEmbeddings
+
+TOPICS = {
+    "probation": [
+        "New employees serve a probation period of six months from their start date.",
+        "During probation, performance is reviewed monthly by the line manager.",
+        "The probation period can be extended once by up to three months if goals are not met.",
+        "Either party may end employment during probation with one week of notice.",
+    ],
+    "notice": [
+        "The notice period for resignation is thirty days for all permanent staff.",
+        "Managers and senior staff must give sixty days of notice when resigning.",
+        "Garden leave may be granted for part of the notice period at the company's discretion.",
+        "Unused annual leave is paid out at the end of the notice period.",
+    ],
+    "annual_leave": [
+        "Employees receive twenty days of annual leave per calendar year.",
+        "Annual leave accrues monthly and up to five days may be carried over.",
+        "Leave requests must be submitted through the HR portal two weeks in advance.",
+        "Public holidays are granted in addition to the annual leave allowance.",
+    ],
+    "parental_leave": [
+        "Birth parents are entitled to sixteen weeks of paid parental leave.",
+        "Non-birth parents receive eight weeks of paid parental leave after the child's arrival.",
+        "Parental leave can be taken in up to three blocks within the first year.",
+        "Adoptive parents have the same parental leave rights as birth parents.",
+    ],
+    "remote_work": [
+        "Staff may work remotely up to three days per week with manager approval.",
+        "Fully remote arrangements require a signed remote work agreement.",
+        "The company provides a home office stipend for equipment and internet costs.",
+        "Remote employees must be reachable during core hours from ten to four.",
+    ],
+    "expenses": [
+        "Business travel expenses are reimbursed within thirty days of submission.",
+        "Receipts are required for every expense claim above twenty-five dollars.",
+        "Meals during business travel are reimbursed up to a daily allowance.",
+        "Expense claims must be approved by the budget owner before payment.",
+    ],
+    "performance": [
+        "Performance reviews are held twice a year in June and December.",
+        "Ratings use a five point scale from needs improvement to outstanding.",
+        "Employees rated outstanding are eligible for an accelerated salary review.",
+        "A performance improvement plan lasts sixty days and sets measurable goals.",
+    ],
+    "harassment": [
+        "The company has zero tolerance for harassment, bullying and discrimination.",
+        "Complaints can be raised confidentially with HR or through the ethics hotline.",
+        "Every harassment complaint is investigated within ten working days.",
+        "Retaliation against anyone who raises a complaint is a disciplinary offence.",
+    ],
+}
+
+QUERIES = [
+    ("probation period", "probation"),
+    ("probation extension", "probation"),
+    ("notice policy", "notice"),
+    ("resignation notice period", "notice"),
+    ("garden leave", "notice"),
+    ("annual leave carry over", "annual_leave"),
+    ("holiday allowance public holidays", "annual_leave"),
+    ("parental leave weeks", "parental_leave"),
+    ("adoption leave", "parental_leave"),
+    ("remote work agreement", "remote_work"),
+    ("home office stipend", "remote_work"),
+    ("expense receipts", "expenses"),
+    ("travel meals reimbursement", "expenses"),
+    ("performance review schedule", "performance"),
+    ("performance improvement plan", "performance"),
+    ("harassment complaint", "harassment"),
+    ("ethics hotline", "harassment"),
+    ("How long do new hires wait before they are confirmed?", "probation"),
+    ("How many days off do I get each year?", "annual_leave"),
+    ("Can I work from home?", "remote_work"),
+    ("Who approves my claim for a client dinner?", "expenses"),
+    ("What happens if I report bullying?", "harassment"),
+    ("How much time can a new father take?", "parental_leave"),
+    ("When do I get my rating?", "performance"),
+]
+
+
+def generate(data_dir, filler: int, seed: int = 5):
+    """One file per topic: its policy paragraphs mixed with generic filler."""
+    rng = random.Random(seed)
+    generic = [
+        "This policy applies to all employees and is reviewed annually by HR.",
+        "Questions about this policy should be directed to your HR business partner.",
+        "Local law takes precedence where it grants employees greater rights.",
+        "Managers are responsible for applying this policy consistently.",
+    ]
+    for topic, paragraphs in TOPICS.items():
+        body = list(paragraphs) + [rng.choice(generic) for _ in range(filler)]
+        rng.shuffle(body)
+        with open(os.path.join(data_dir, f"{topic}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n\n".join(body) + "\n")
+
+
+def _point_at(work_dir):
+    db_dir = os.path.join(work_dir, "vector_db")
+    vector_store.VECTOR_DB_DIR = db_dir
+    vector_store.MANIFEST_PATH = retrieval.MANIFEST_PATH = os.path.join(db_dir, "manifest.json")
+    vector_store.NUMPY_INDEX_DIR = os.path.join(db_dir, "numpy")
+    vector_store.JOURNAL_PATH = os.path.join(db_dir, "build_journal.jsonl")
+    vector_store.BM25_PATH = retrieval.BM25_PATH = os.path.join(db_dir, "bm25.json")
+
+
+def _run_mode(label, mode, fast_path, k, baseline=None):
+    config.RETRIEVAL_MODE = mode
+    config.LEXICAL_FAST_PATH = fast_path
+    embeddings = registry.get_embeddings()
+    calls_before = embeddings.calls
+
+    latencies, hits, results = [], 0, []
+    for query, topic in QUERIES:
+        retrieval.clear()
+        start = time.perf_counter()
+        docs = retrieval.retrieve(query, k=k)
+        latencies.append(time.perf_counter() - start)
+        results.append({d.metadata["chunk_id"] for d in docs})
+        hits += any(d.metadata["source"] == f"{topic}.txt" for d in docs)
+
+    overlap = ""
+    if baseline is not None:
+        shared = sum(len(a & b) for a, b in zip(results, baseline))
+        overlap = f"  vector overlap={shared / sum(len(b) for b in baseline):.0%}"
+    print(
+        f"{label:<28} mean {statistics.mean(latencies) * 1000:6.1f}ms"
+        f"  p50 {statistics.median(latencies) * 1000:6.1f}ms"
+        f"  embed_calls={embeddings.calls - calls_before:<3}"
+        f" recall@{k}={hits / len(QUERIES):.0%}{overlap}"
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--embed-latency", type=float, default=0.08)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--filler", type=int, default=20, help="generic paragraphs per topic file")
+    args = parser.parse_args()
+
+    config.VECTOR_BACKEND = "numpy"
+    work_dir = tempfile.mkdtemp(prefix="hr_hybrid_")
+    data_dir = os.path.join(work_dir, "data")
+    os.makedirs(data_dir)
+    try:
+        generate(data_dir, args.filler)
+        vector_store.DATA_DIR = data_dir
+        _point_at(work_dir)
+
+        registry.configure(
+            embeddings=lambda: FakeEmbeddings(latency=args.embed_latency),
+            vector_store=lambda emb: vector_store.load_vector_store(emb)
+        )
+        summary = vector_store.build_vector_store()
+        print(
+            f"{summary['chunks_added']} chunks in {len(TOPICS)} topic files, "
+            f"{len(QUERIES)} labelled queries, embedding latency {args.embed_latency * 1000:.0f}ms\n"
+        )
+
+        baseline = _run_mode("vector only", "vector", False, args.k)
+        _run_mode("hybrid (RRF)", "hybrid", False, args.k, baseline)
+        _run_mode("hybrid + lexical fast path", "hybrid", True, args.k, baseline)
+
+        stats = retrieval.stats()
+        print(
+            f"\nfast path answered {stats['lexical_fast_path']} of {len(QUERIES)} queries "
+            f"(confidence >= {config.LEXICAL_CONFIDENCE})"
+        )
+    finally:
+        registry.restore_defaults()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Cold-start import time of core.agent, with a regression threshold.
+
+Each run imports the module in a fresh interpreter under
+`python -X importtime` (no OPENAI_API_KEY set) and reads the cumulative
+time of the module. The median over all runs is compared to --max-ms, and
+none of the heavy dependencies may be loaded by the import alone. Exits
+with status 1 on a regression, so it can gate CI.
+
+    python benchmarks/bench_import_time.py --runs 7 --max-ms 50
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Must only load when an intent that needs them first runs
+HEAVY_MODULES = (
+    "langchain_openai",
+    "langchain_community",
+    "langchain_core",
+    "langchain_text_splitters",
+    "chromadb",
+    "numpy",
+    "openai",
+)
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def _env():
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env["PYTHONPATH"] = ROOT_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def _run(module):
+    """Cumulative import time (us) per imported module, and sys.modules afterwards."""
+    code = f"import {module}, sys; print(' '.join(sorted(sys.modules)))" if module else "pass"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=_env(), cwd=ROOT_DIR, check=True
+    )
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            timings[match.group(4)] = int(match.group(2))
+    return timings, set(proc.stdout.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="core.agent")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=50.0,
+                        help="fail if the median cumulative import time exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    # Modules the bare interpreter imports at startup are not ours to report
+    startup, _ = _run(None)
+
+    totals = []
+    timings = loaded = None
+    for _ in range(args.runs):
+        timings, loaded = _run(args.module)
+        totals.append(timings[args.module] / 1000)
+
+    median = statistics.median(totals)
+    print(f"{args.module}: median {median:.1f}ms, min {min(totals):.1f}ms over {args.runs} runs")
+
+    print("\nSlowest imports (cumulative, last run):")
+    ours = {name: micros for name, micros in timings.items() if name not in startup}
+    for name, micros in sorted(ours.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {micros / 1000:8.1f}ms  {name}")
+
+    heavy = sorted(m for m in HEAVY_MODULES if m in loaded)
+    failures = []
+    if median > args.max_ms:
+        failures.append(f"median import time {median:.1f}ms exceeds {args.max_ms:.1f}ms")
+    if heavy:
+        failures.append(f"heavy modules loaded at import: {', '.join(heavy)}")
+
+    if failures:
+        print("\nREGRESSION: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
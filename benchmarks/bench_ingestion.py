@@ -0,0 +1,152 @@
+"""
+Resume ingestion throughput: in-process vs process pool vs warm cache.
+
+Generates sample PDF and DOCX resumes from the skill dictionary, then
+extracts them three ways: in-process with an empty cache, on a process
+pool with an empty cache, and again with every document already cached.
+
+    python benchmarks/bench_ingestion.py --docs 400 --workers 4
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ["LLM_CACHE_ENABLED"] = "0"
+
+from core import config
+from core.ingestion import ingest, screen_documents
+from core.skills import SKILLS_PATH
+
+FILLER = [
+    "Led a team of engineers delivering customer-facing features on schedule.",
+    "Reduced infrastructure cost by consolidating services and tuning queries.",
+    "Mentored junior developers and ran weekly design reviews.",
+    "Owned the on-call rotation and wrote the incident response runbook.",
+    "Worked closely with product managers to refine requirements.",
+]
+
+
+def _resume_lines(rng, aliases, i):
+    skills = rng.sample(aliases, 8)
+    lines = [f"Candidate {i}", "Senior Software Engineer", "", "Skills: " + ", ".join(skills), ""]
+    for year in range(2015, 2024, 2):
+        lines.append(f"{year} - {year + 2}: Engineer at Company {rng.randint(1, 500)}")
+        lines.extend(rng.sample(FILLER, 3))
+        lines.append(f"Used {rng.choice(skills)} and {rng.choice(skills)} in production.")
+    return lines
+
+
+def _pdf_bytes(lines) -> bytes:
+    """A minimal single-page PDF with one Helvetica text block."""
+    def escape(text):
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    content = "BT /F1 10 Tf 50 760 Td 13 TL " + " ".join(
+        f"({escape(line)}) Tj T*" for line in lines
+    ) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def _write_docx(path, lines):
+    import docx
+
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def generate(directory: Path, count: int, seed: int = 7):
+    rng = random.Random(seed)
+    with open(SKILLS_PATH, "r", encoding="utf-8") as f:
+        aliases = sorted({a for forms in json.load(f).values() for a in forms})
+
+    for i in range(count):
+        lines = _resume_lines(rng, aliases, i)
+        if i % 2:
+            _write_docx(directory / f"resume_{i:05d}.docx", lines)
+        else:
+            (directory / f"resume_{i:05d}.pdf").write_bytes(_pdf_bytes(lines))
+
+
+def _timed(label, docs_dir, workers, total_bytes):
+    start = time.perf_counter()
+    documents = list(ingest([docs_dir], workers=workers))
+    seconds = time.perf_counter() - start
+    failed = sum(1 for d in documents if d["error"])
+    cached = sum(1 for d in documents if d["cached"])
+    print(
+        f"{label:<28}{seconds * 1000:>10.0f}ms{len(documents) / seconds:>10.0f} docs/s"
+        f"{total_bytes / seconds / 1e6:>8.1f} MB/s   cached={cached} failed={failed}"
+    )
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="hr_ingest_"))
+    docs_dir = work_dir / "docs"
+    docs_dir.mkdir()
+    try:
+        generate(docs_dir, args.docs)
+        total_bytes = sum(p.stat().st_size for p in docs_dir.iterdir())
+        print(f"{args.docs} documents, {total_bytes / 1e6:.1f} MB, {args.workers} workers\n")
+
+        config.CACHE_DIR = work_dir / "cache_inline"
+        _timed("in-process, cold cache", docs_dir, 0, total_bytes)
+
+        config.CACHE_DIR = work_dir / "cache_pool"
+        _timed("process pool, cold cache", docs_dir, args.workers, total_bytes)
+        documents = _timed("warm cache", docs_dir, args.workers, total_bytes)
+
+        sample = next(line for line in documents[0]["text"].splitlines() if line.startswith("Skills"))
+        print(f"\nsample extracted line: {sample[:70]}")
+
+        start = time.perf_counter()
+        result = screen_documents([docs_dir], "Python, Docker, Kubernetes, PostgreSQL", explain_top_k=0)
+        best = result["results"][0]
+        print(
+            f"screened {len(result['results'])} documents (warm cache) in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms; best {best['name'].rsplit('/', 1)[-1]} "
+            f"at {best['match_percentage']}%"
+        )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Interview question bank: near-duplicate grouping, warmup cost and lookup latency.
+
+Generates `--roles` distinct postings that all carry the same company
+boilerplate, plus `--variants` near-copies of each that differ only in
+location or one extra line. The postings are fingerprinted to check that
+variants share their original's entry and that distinct roles never
+merge. Questions are then requested for every posting and role level:
+once without the bank, and once after warming it, counting LLM calls and
+per-request latency. The fake LLM takes `--llm-latency` per call.
+
+    python benchmarks/bench_question_bank.py --roles 20 --variants 4 --llm-latency 0.3
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+
+from core import config, question_bank, registry  # noqa: E402
+from core.fakes import install_fakes  # noqa: E402
+from core.tools.interview_generator import generate_interview_questions  # noqa: E402
+
+SKILLS = [
+    "python", "java", "javascript", "typescript", "go", "rust", "sql", "postgresql", "mongodb",
+    "redis", "kafka", "spark", "airflow", "django", "flask", "fastapi", "spring", "react",
+    "angular", "vue", "graphql", "docker", "kubernetes", "terraform", "aws", "azure", "gcp",
+    "machine learning", "pytorch", "tensorflow"
+]
+TITLES = ["Backend Engineer", "Data Engineer", "Frontend Developer", "Platform Engineer",
+          "ML Engineer", "Full Stack Developer", "Site Reliability Engineer"]
+CITIES = ["Berlin", "London", "Lisbon", "Toronto", "Austin", "Singapore", "Remote (EU)"]
+LEVELS = ["Junior", "Mid", "Senior"]
+
+BOILERPLATE = (
+    "About us: we build hiring software used by thousands of companies worldwide. "
+    "We offer a competitive salary, equity, private health insurance, a learning budget "
+    "and flexible working hours. We are an equal opportunity employer and value diversity. "
+    "Our interview process has three stages and we aim to reply to every applicant within a week."
+)
+EXTRA_LINES = [
+    "Visa sponsorship is available for this role.",
+    "This position reports to the Head of Engineering.",
+    "Applications close at the end of the month.",
+    "Relocation support is offered for this position.",
+]
+
+
+def postings(roles: int, variants: int, seed: int = 11):
+    """`(group, job_description)` pairs: each role's original plus its near-copies."""
+    rng = random.Random(seed)
+    out = []
+    for group in range(roles):
+        title = rng.choice(TITLES)
+        skills = rng.sample(SKILLS, 5)
+        duties = (
+            f"You will design, build and operate services using {', '.join(skills[:3])}. "
+            f"Experience with {skills[3]} and {skills[4]} is expected. You will review code, "
+            f"mentor colleagues, improve reliability and take part in an on-call rotation."
+        )
+        for variant in range(variants + 1):
+            city = CITIES[(group + variant) % len(CITIES)]
+            extra = EXTRA_LINES[variant % len(EXTRA_LINES)] if variant % 2 else ""
+            out.append((group, f"{title} ({city}).\n{duties}\n{extra}\n{BOILERPLATE}"))
+    return out
+
+
+def _request_all(items):
+    latencies = []
+    for _, job_description in items:
+        for level in LEVELS:
+            start = time.perf_counter()
+            generate_interview_questions(job_description, level)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _llm_calls():
+    return sum(llm.calls for llm in registry._llms.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--variants", type=int, default=4, help="near-copies per role")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    install_fakes(llm_latency=args.llm_latency)
+    items = postings(args.roles, args.variants)
+
+    try:
+        # -----------------------------
+        # Grouping quality
+        # -----------------------------
+        bank = question_bank.QuestionBank(threshold=config.QUESTION_BANK_SIMILARITY)
+        question_bank.set_bank(bank)
+        start = time.perf_counter()
+        groups = {}
+        for group, job_description in items:
+            match = bank.match(job_description)
+            bank.register(match, job_description)
+            groups.setdefault(match.fingerprint, set()).add(group)
+        per_posting = (time.perf_counter() - start) / len(items)
+
+        by_group = {}
+        for fingerprint, members in groups.items():
+            for group in members:
+                by_group.setdefault(group, set()).add(fingerprint)
+        merged = sum(1 for members in groups.values() if len(members) > 1)
+        split = sum(1 for fingerprints in by_group.values() if len(fingerprints) > 1)
+        print(
+            f"{len(items)} postings ({args.roles} roles x {args.variants + 1} copies) -> "
+            f"{len(groups)} fingerprints; wrongly merged: {merged}, roles split: {split}; "
+            f"fingerprinting {per_posting * 1000:.2f}ms per posting\n"
+        )
+
+        # -----------------------------
+        # Without the bank
+        # -----------------------------
+        config.QUESTION_BANK_ENABLED = False
+        calls = _llm_calls()
+        latencies = _request_all(items)
+        print(
+            f"{'no bank':<20} llm_calls={_llm_calls() - calls:<5} "
+            f"p50 {statistics.median(latencies) * 1000:7.1f}ms  total {sum(latencies):6.2f}s"
+        )
+
+        # -----------------------------
+        # Warmup, then interactive lookups
+        # -----------------------------
+        config.QUESTION_BANK_ENABLED = True
+        question_bank.set_bank(question_bank.QuestionBank(threshold=config.QUESTION_BANK_SIMILARITY))
+        calls = _llm_calls()
+        summary = question_bank.warm(items, role_levels=LEVELS, workers=4)
+        print(
+            f"{'warmup':<20} llm_calls={_llm_calls() - calls:<5} "
+            f"{summary['seconds']:>23.2f}s  ({summary['fingerprints']} groups x {len(LEVELS)} levels)"
+        )
+
+        calls = _llm_calls()
+        latencies = _request_all(items)
+        stats = question_bank.get_bank().stats()
+        print(
+            f"{'after warmup':<20} llm_calls={_llm_calls() - calls:<5} "
+            f"p50 {statistics.median(latencies) * 1000:7.1f}ms  total {sum(latencies):6.2f}s  "
+            f"hits={stats['hits']} (near-duplicate {stats['near_duplicate_hits']})"
+        )
+    finally:
+        question_bank.set_bank(None)
+        registry.restore_defaults()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Cold vs warm resource acquisition.
+
+Cold: what every tool call used to do - build a fresh embedding client,
+reopen the vector store and create a new chat model, then query.
+Warm: the same request served from the shared registry.
+
+Uses the local stand-ins from core.fakes; `--init-latency` simulates the
+client construction / persistent-directory open cost.
+
+    python benchmarks/bench_registry.py --requests 200 --init-latency 0.005
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from core import registry
+from core.fakes import FakeEmbeddings, FakeLLM, FakeVectorStore, install_fakes, sample_corpus
+
+
+def _request(vectordb, llm):
+    docs = vectordb.similarity_search("annual leave policy", k=4)
+    llm.invoke("\n".join(d.page_content for d in docs))
+
+
+def cold_path(n, init_latency, corpus):
+    start = time.perf_counter()
+    for _ in range(n):
+        embeddings = FakeEmbeddings(init_latency=init_latency)
+        vectordb = FakeVectorStore(embeddings, corpus, init_latency=init_latency)
+        llm = FakeLLM(init_latency=init_latency)
+        _request(vectordb, llm)
+    return time.perf_counter() - start
+
+
+def warm_path(n, init_latency, corpus):
+    install_fakes(init_latency=init_latency, texts=corpus)
+    start = time.perf_counter()
+    for _ in range(n):
+        _request(registry.get_vector_store(), registry.get_llm())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--init-latency", type=float, default=0.005,
+                        help="seconds to construct each client stand-in")
+    args = parser.parse_args()
+
+    corpus = sample_corpus()
+    cold = cold_path(args.requests, args.init_latency, corpus)
+    warm = warm_path(args.requests, args.init_latency, corpus)
+
+    print(f"requests: {args.requests}  corpus chunks: {len(corpus)}")
+    print(f"cold path: {cold * 1000 / args.requests:8.3f} ms/request")
+    print(f"warm path: {warm * 1000 / args.requests:8.3f} ms/request")
+    print(f"speedup:   {cold / max(warm, 1e-9):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+HTTP server backpressure: bounded vs. unbounded wait queue under overload.
+
+Starts core.server in-process on a free port with `--workers` agent
+workers and fake backends, then offers the sample request mix over
+keep-alive HTTP at `--overload` times the pool's capacity (workers / LLM
+latency). With a deep queue every request is accepted and waits longer
+and longer for a worker; with `--queue-depth` the excess is refused with
+429 at once and accepted requests keep a bounded queue wait.
+
+    python benchmarks/bench_server.py --workers 4 --llm-latency 0.2 --overload 2 --duration 10
+"""
+
+import argparse
+import os
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "0")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "0")
+
+from core import registry  # noqa: E402
+from core.fakes import install_fakes  # noqa: E402
+from core.load_generator import load_mix, run_load  # noqa: E402
+from core.server import make_server, start  # noqa: E402
+
+MIX = os.path.join(ROOT_DIR, "data", "load_mix.jsonl")
+
+
+def _run(label, queue_depth, args, qps):
+    server = make_server("127.0.0.1", 0, workers=args.workers, queue_depth=queue_depth)
+    start(server)
+    host, port = server.server_address[:2]
+    try:
+        report = run_load(
+            load_mix(MIX), qps=qps, duration=args.duration, mode="http",
+            concurrency=256, target=f"http://{host}:{port}"
+        )
+    finally:
+        server.shutdown()
+        server.close()
+
+    overall = report["overall"]
+    queue = report["server"]["queue"]
+    wait = queue["queue_wait_ms"]
+    print(
+        f"{label:<22} accepted={queue['accepted']:<5} 429={queue['rejected']:<5} "
+        f"client p50 {overall['latency_ms']['p50_ms']:8.1f}ms  p99 {overall['latency_ms']['p99_ms']:8.1f}ms  "
+        f"queue wait p99 {wait['p99_ms']:8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-depth", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--overload", type=float, default=2.0, help="offered rate / pool capacity")
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    install_fakes(llm_latency=args.llm_latency, embed_latency=0.01)
+    qps = args.overload * args.workers / args.llm_latency
+    print(f"{args.workers} workers, ~{args.workers / args.llm_latency:.0f} req/s capacity, {qps:.0f} req/s offered\n")
+
+    try:
+        _run("unbounded queue", 1_000_000, args, qps)
+        _run(f"queue depth {args.queue_depth}", args.queue_depth, args, qps)
+    finally:
+        registry.restore_defaults()
+
+
+if __name__ == "__main__":
+    main()
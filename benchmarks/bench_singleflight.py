@@ -0,0 +1,80 @@
+"""
+Duplicate-request bursts with and without single-flight coalescing.
+
+Simulates several recruiter sessions (threads) opening the same postings
+at once: each of --postings job descriptions is requested by --sessions
+sessions simultaneously. Reports wall time and the number of LLM calls
+actually made, with coalescing off and on.
+
+    python benchmarks/bench_singleflight.py --sessions 8 --postings 4 --llm-latency 0.3
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ["LLM_CACHE_ENABLED"] = "0"
+os.environ["SEMANTIC_CACHE_ENABLED"] = "0"
+
+from core import config, registry, singleflight
+from core.agent import Intent, run_agent
+from core.fakes import install_fakes
+
+
+def _requests(postings, sessions):
+    requests = []
+    for p in range(postings):
+        requests += [(Intent.INTERVIEW_GENERATION, {
+            "job_description": f"Backend engineer #{p}: Python, Docker, PostgreSQL",
+            "role_level": "Senior"
+        })] * sessions
+        requests += [(Intent.HR_QA, {"question": f"What is the notice period for posting {p}?"})] * sessions
+    return requests
+
+
+def _llm_calls():
+    # Every (model, temperature) client the tools have created so far
+    return sum(llm.calls for llm in registry._llms.values())
+
+
+def _burst(requests, enabled):
+    config.SINGLEFLIGHT_ENABLED = enabled
+    singleflight.reset()
+    before = _llm_calls()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        results = list(pool.map(lambda r: run_agent(*r), requests))
+    seconds = time.perf_counter() - start
+
+    errors = sum(1 for r in results if "error" in r)
+    stats = singleflight.stats()
+    print(
+        f"coalescing {'on ' if enabled else 'off'}  {seconds:6.2f}s  llm_calls={_llm_calls() - before:<4}"
+        f" coalesced={stats['coalesced']:<4} errors={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--postings", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    install_fakes(llm_latency=args.llm_latency)
+    requests = _requests(args.postings, args.sessions)
+    print(f"{len(requests)} requests ({args.postings} postings x 2 intents x {args.sessions} sessions)\n")
+
+    _burst(requests, enabled=False)
+    _burst(requests, enabled=True)
+
+
+if __name__ == "__main__":
+    main()
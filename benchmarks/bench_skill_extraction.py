@@ -0,0 +1,85 @@
+"""
+Skill extraction throughput in MB of resume text per second.
+
+Compares the compiled Aho-Corasick matcher with the naive approach of
+running one word-boundary regex per known alias over every resume.
+
+    python benchmarks/bench_skill_extraction.py --resumes 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-local-benchmark")
+
+from core.skills import SKILLS_PATH, SkillMatcher, load_matcher
+
+FILLER = (
+    "responsible for delivering features across the platform working closely with "
+    "product and design teams to improve reliability and customer experience while "
+    "mentoring engineers and owning production incidents end to end"
+).split()
+
+
+def _resumes(n, aliases, rng):
+    docs = []
+    for _ in range(n):
+        words = []
+        for _ in range(rng.randint(300, 600)):
+            words.append(rng.choice(aliases) if rng.random() < 0.03 else rng.choice(FILLER))
+        docs.append(" ".join(words))
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=2000)
+    parser.add_argument("--naive-resumes", type=int, default=200)
+    args = parser.parse_args()
+
+    dictionary = json.loads(SKILLS_PATH.read_text(encoding="utf-8"))
+    aliases = [a for forms in dictionary.values() for a in forms]
+    rng = random.Random(0)
+    docs = _resumes(args.resumes, aliases, rng)
+    megabytes = sum(len(d) for d in docs) / 1e6
+
+    start = time.perf_counter()
+    SkillMatcher.compile(dictionary)
+    compile_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    matcher = load_matcher()
+    load_ms = (time.perf_counter() - start) * 1e3
+
+    start = time.perf_counter()
+    for doc in docs:
+        matcher.extract(doc)
+    automaton = time.perf_counter() - start
+
+    patterns = [(re.compile(r"(?<![\w.])" + re.escape(a) + r"(?!\w)"), s)
+                for s, forms in dictionary.items() for a in forms]
+    naive_docs = docs[:args.naive_resumes]
+    naive_mb = sum(len(d) for d in naive_docs) / 1e6
+    start = time.perf_counter()
+    for doc in naive_docs:
+        lowered = doc.lower()
+        {s for p, s in patterns if p.search(lowered)}
+    naive = time.perf_counter() - start
+
+    print(f"dictionary: {len(dictionary)} skills, {len(aliases)} aliases")
+    print(f"compile: {compile_ms:.1f} ms   load (disk cache): {load_ms:.1f} ms")
+    print(f"automaton: {megabytes / automaton:8.2f} MB/s  ({args.resumes / automaton:,.0f} resumes/s)")
+    print(f"naive regex: {naive_mb / naive:6.2f} MB/s  ({len(naive_docs) / naive:,.0f} resumes/s)")
+
+
+if __name__ == "__main__":
+    main()
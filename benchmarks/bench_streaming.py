@@ -0,0 +1,76 @@
+"""
+Time to first token of stream_agent vs the blocking run_agent.
+
+A local fake LLM emits its reply in chunks with a fixed time to the first
+chunk and a fixed gap between chunks, so the gap between the two numbers
+is the wait users no longer sit through.
+
+    python benchmarks/bench_streaming.py --requests 20 --llm-latency 0.3 --chunk-latency 0.02
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-local-benchmark")
+os.environ["LLM_CACHE_ENABLED"] = "0"
+os.environ["SEMANTIC_CACHE_ENABLED"] = "0"
+
+from core.agent import Intent, run_agent, stream_agent
+from core.fakes import install_fakes
+
+CASES = {
+    Intent.HR_QA: lambda i: {"question": f"How many days of annual leave do I get? ({i})"},
+    Intent.RESUME_SCREENING: lambda i: {
+        "resume_text": f"Python, SQL, Docker developer #{i}",
+        "job_description": "Python, Docker, Kubernetes"
+    },
+    Intent.INTERVIEW_EVALUATION: lambda i: {
+        "question": "How do you debug a slow endpoint?",
+        "answer": f"I profile first, then look at queries ({i}).",
+        "job_description": "Backend engineer",
+        "role_level": "Mid"
+    },
+}
+
+
+def _ms(seconds):
+    return round(statistics.median(seconds) * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--chunk-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    install_fakes(llm_latency=args.llm_latency, chunk_latency=args.chunk_latency)
+
+    print(f"{'intent':<24}{'blocking':>12}{'first event':>14}{'stream done':>14}")
+    for intent, payload in CASES.items():
+        blocking, first, done = [], [], []
+        for i in range(args.requests):
+            start = time.perf_counter()
+            run_agent(intent, payload(i))
+            blocking.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            first_at = None
+            for _ in stream_agent(intent, payload(i + args.requests)):
+                if first_at is None:
+                    first_at = time.perf_counter() - start
+            first.append(first_at)
+            done.append(time.perf_counter() - start)
+
+        print(f"{intent.value:<24}{_ms(blocking):>10}ms{_ms(first):>12}ms{_ms(done):>12}ms")
+
+
+if __name__ == "__main__":
+    main()
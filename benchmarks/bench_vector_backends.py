@@ -0,0 +1,126 @@
+"""
+Numpy index vs Chroma on synthetic corpora.
+
+Random unit vectors stand in for chunk embeddings; queries are given as
+precomputed vectors so only the index itself is measured (no embedding
+calls). Chroma is skipped above `--chroma-max` chunks because building it
+takes minutes.
+
+    python benchmarks/bench_vector_backends.py --sizes 1000,100000,1000000 --dim 384
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from core.numpy_store import NumpyVectorStore
+
+
+class _StaticEmbeddings:
+    """Returns pre-generated query vectors in order (no model involved)."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return self.vectors[:len(texts)]
+
+    def embed_query(self, text):
+        return self.vectors[0]
+
+
+def _corpus(n, dim, rng):
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    records = [{"id": str(i), "text": f"chunk {i}", "metadata": {}} for i in range(n)]
+    return vectors, records
+
+
+def _timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_numpy(directory, vectors, records, queries, k, repeat):
+    NumpyVectorStore.write(directory, vectors, records)
+
+    start = time.perf_counter()
+    store = NumpyVectorStore(directory, _StaticEmbeddings(queries))
+    load = time.perf_counter() - start
+
+    # First touch pages the memory map in; measure steady state afterwards
+    store.similarity_search_by_vector(queries[0], k)
+    single = _timeit(lambda: store.similarity_search_by_vector(queries[0], k), repeat)
+    batch = _timeit(lambda: store.similarity_search_many(["q"] * len(queries), k), 3)
+    return load, single, batch / len(queries)
+
+
+def bench_chroma(directory, vectors, queries, k, repeat):
+    import chromadb
+
+    client = chromadb.PersistentClient(path=directory)
+    collection = client.create_collection("bench", metadata={"hnsw:space": "cosine"})
+    step = 5000
+    for i in range(0, len(vectors), step):
+        collection.add(
+            ids=[str(j) for j in range(i, min(i + step, len(vectors)))],
+            embeddings=vectors[i:i + step].tolist(),
+            documents=[f"chunk {j}" for j in range(i, min(i + step, len(vectors)))]
+        )
+    del collection, client
+
+    start = time.perf_counter()
+    client = chromadb.PersistentClient(path=directory)
+    collection = client.get_collection("bench")
+    load = time.perf_counter() - start
+
+    query = [queries[0].tolist()]
+    collection.query(query_embeddings=query, n_results=k)
+    single = _timeit(lambda: collection.query(query_embeddings=query, n_results=k), repeat)
+    batch = _timeit(lambda: collection.query(query_embeddings=queries.tolist(), n_results=k), 3)
+    return load, single, batch / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1000,100000,1000000")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--chroma-max", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    print(f"{'backend':8} {'chunks':>9} {'load ms':>9} {'query us':>10} {'batched us/q':>13}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        vectors, records = _corpus(n, args.dim, rng)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            load, single, batch = bench_numpy(tmp, vectors, records, queries, args.k, args.repeat)
+        print(f"{'numpy':8} {n:>9} {load * 1e3:>9.2f} {single * 1e6:>10.1f} {batch * 1e6:>13.1f}")
+
+        if n > args.chroma_max:
+            print(f"{'chroma':8} {n:>9} {'skipped (--chroma-max)':>34}")
+            continue
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                load, single, batch = bench_chroma(tmp, vectors, queries, args.k, args.repeat)
+            print(f"{'chroma':8} {n:>9} {load * 1e3:>9.2f} {single * 1e6:>10.1f} {batch * 1e6:>13.1f}")
+        except ImportError:
+            print(f"{'chroma':8} {n:>9} {'skipped (chromadb not installed)':>34}")
+
+
+if __name__ == "__main__":
+    main()
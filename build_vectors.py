@@ -3,5 +3,17 @@ load_dotenv()
 
 from core.vector_store import build_vector_store
 
-build_vector_store()
-print("Vector DB built successfully")
+
+def _progress(stats):
+    print(
+        f"  {stats['chunks_embedded']} chunks embedded "
+        f"({stats['rate_limited']} rate limited, {stats['concurrency']} requests in flight)"
+    )
+
+
+summary = build_vector_store(progress=_progress)
+print(
+    "Vector DB built successfully "
+    f"(+{summary['chunks_added']} / -{summary['chunks_removed']} chunks, "
+    f"{summary['files_unchanged']} files unchanged)"
+)
@@ -1,46 +1,316 @@
+"""
+Central agent router.
+
+Tools are referenced by module path and imported when their intent first
+runs, so importing this module (every Streamlit rerun, CLI or worker
+start) does not pull in langchain, numpy or the vector store.
+"""
+
+import importlib
+import threading
 from enum import Enum
 
-from core.tools.resume_tool import run_resume_screening
-from core.tools.interview_generator import generate_interview_questions
-from core.tools.interview_evaluator import evaluate_interview
-from core.tools.hr_qa_tool import answer_hr_question
+from core import call_policy, singleflight, tracing
 
 
 class Intent(Enum):
     RESUME_SCREENING = "resume_screening"
+    RESUME_SCREENING_BATCH = "resume_screening_batch"
     INTERVIEW_GENERATION = "interview_generation"
     INTERVIEW_EVALUATION = "interview_evaluation"
+    INTERVIEW_EVALUATION_BATCH = "interview_evaluation_batch"
     HR_QA = "hr_qa"
+    CANDIDATE_SEARCH = "candidate_search"
+    CANDIDATE_ADD = "candidate_add"
+    CANDIDATE_REMOVE = "candidate_remove"
+    EXPLANATION = "explanation"
+
+
+def _resume_screening_batch(**kwargs) -> dict:
+    from core.tools.resume_tool import run_resume_screening_batch
+
+    try:
+        results = list(run_resume_screening_batch(**kwargs))
+    except ValueError as e:
+        return {"error": str(e)}
+    return {
+        "results": results,
+        "reasoning": [
+            f"Screened {len(results)} resumes against one job description",
+            "Ranked candidates by skill match percentage",
+            "Generated LLM explanations for the top candidates only"
+        ]
+    }
+
+
+async def _aresume_screening_batch(**kwargs) -> dict:
+    import asyncio
+
+    return await asyncio.to_thread(_resume_screening_batch, **kwargs)
+
+
+async def _asearch_candidates(**kwargs) -> dict:
+    import asyncio
+
+    from core.resume_store import search_candidates
+
+    return await asyncio.to_thread(search_candidates, **kwargs)
+
+
+async def _aadd_candidates(**kwargs) -> dict:
+    import asyncio
+
+    from core.resume_store import add_candidates
+
+    return await asyncio.to_thread(add_candidates, **kwargs)
+
+
+async def _aremove_candidates(**kwargs) -> dict:
+    import asyncio
+
+    from core.resume_store import remove_candidates
+
+    return await asyncio.to_thread(remove_candidates, **kwargs)
+
+
+_RESUME = "core.tools.resume_tool"
+_GENERATOR = "core.tools.interview_generator"
+_EVALUATOR = "core.tools.interview_evaluator"
+_HR_QA = "core.tools.hr_qa_tool"
+
+# intent -> (sync tool, async tool), as "module:function"
+_TOOLS = {
+    Intent.RESUME_SCREENING: (f"{_RESUME}:run_resume_screening", f"{_RESUME}:arun_resume_screening"),
+    Intent.RESUME_SCREENING_BATCH: (f"{__name__}:_resume_screening_batch", f"{__name__}:_aresume_screening_batch"),
+    Intent.INTERVIEW_GENERATION: (
+        f"{_GENERATOR}:generate_interview_questions", f"{_GENERATOR}:agenerate_interview_questions"
+    ),
+    Intent.INTERVIEW_EVALUATION: (f"{_EVALUATOR}:evaluate_interview", f"{_EVALUATOR}:aevaluate_interview"),
+    Intent.INTERVIEW_EVALUATION_BATCH: (
+        f"{_EVALUATOR}:evaluate_interview_batch", f"{_EVALUATOR}:aevaluate_interview_batch"
+    ),
+    Intent.HR_QA: (f"{_HR_QA}:answer_hr_question", f"{_HR_QA}:aanswer_hr_question"),
+    Intent.CANDIDATE_SEARCH: ("core.resume_store:search_candidates", f"{__name__}:_asearch_candidates"),
+    Intent.CANDIDATE_ADD: ("core.resume_store:add_candidates", f"{__name__}:_aadd_candidates"),
+    Intent.CANDIDATE_REMOVE: ("core.resume_store:remove_candidates", f"{__name__}:_aremove_candidates"),
+    Intent.EXPLANATION: ("core.explanations:get_explanation", "core.explanations:aget_explanation"),
+}
+
+# intent -> streaming tool (generator of events)
+_STREAMS = {
+    Intent.RESUME_SCREENING: f"{_RESUME}:stream_resume_screening",
+    Intent.INTERVIEW_EVALUATION: f"{_EVALUATOR}:stream_interview_evaluation",
+    Intent.HR_QA: f"{_HR_QA}:stream_hr_question",
+}
+
+_resolved = {}
+_resolve_lock = threading.Lock()
+
+
+def _resolve(target: str):
+    """Import the module of a "module:function" target on first use."""
+    fn = _resolved.get(target)
+    if fn is None:
+        with _resolve_lock:
+            fn = _resolved.get(target)
+            if fn is None:
+                module, name = target.split(":")
+                with tracing.span("agent.import_tool", module=module):
+                    fn = getattr(importlib.import_module(module), name)
+                _resolved[target] = fn
+    return fn
+
+
+def _tool(intent: Intent, asynchronous: bool = False):
+    sync_target, async_target = _TOOLS[intent]
+    return _resolve(async_target if asynchronous else sync_target)
+
+
+def _stream_tool(intent: Intent):
+    target = _STREAMS.get(intent)
+    return _resolve(target) if target else None
+
+
+def preload(intents=None):
+    """Import the tools of `intents` (default: all) ahead of the first request."""
+    for intent in intents or list(Intent):
+        _tool(intent)
+        _tool(intent, asynchronous=True)
+        _stream_tool(intent)
+
+
+def loaded_tools() -> list:
+    """"module:function" targets imported so far."""
+    with _resolve_lock:
+        return sorted(_resolved)
+
+
+def _tool_arguments(intent: Intent, payload: dict):
+    """Map a request payload onto the keyword arguments of the intent's tool."""
+    use_cache = payload.get("use_cache", True)
+
+    if intent == Intent.RESUME_SCREENING:
+        return {
+            "resume_text": payload.get("resume_text", ""),
+            "job_description": payload.get("job_description", ""),
+            "use_cache": use_cache,
+            "explain": payload.get("explain", "inline")
+        }
+
+    if intent == Intent.RESUME_SCREENING_BATCH:
+        return {
+            "resumes": payload.get("resumes", []),
+            "job_description": payload.get("job_description", ""),
+            "explain_top_k": payload.get("explain_top_k", 5),
+            "use_cache": use_cache,
+            "explain": payload.get("explain", "inline")
+        }
+
+    if intent == Intent.INTERVIEW_GENERATION:
+        return {
+            "job_description": payload.get("job_description", ""),
+            "role_level": payload.get("role_level", "Junior"),
+            "use_cache": use_cache
+        }
+
+    if intent == Intent.INTERVIEW_EVALUATION:
+        return {
+            "question": payload.get("question", ""),
+            "answer": payload.get("answer", ""),  # ✅ FIXED
+            "job_description": payload.get("job_description", ""),
+            "role_level": payload.get("role_level", "Junior"),
+            "use_cache": use_cache
+        }
+
+    if intent == Intent.INTERVIEW_EVALUATION_BATCH:
+        return {
+            "pairs": payload.get("pairs", []),
+            "job_description": payload.get("job_description", ""),
+            "role_level": payload.get("role_level", "Junior"),
+            "packed": payload.get("packed", False),
+            "use_cache": use_cache
+        }
+
+    if intent == Intent.HR_QA:
+        return {
+            "question": payload.get("question", ""),
+            "use_cache": use_cache
+        }
+
+    if intent == Intent.CANDIDATE_SEARCH:
+        return {
+            "job_description": payload.get("job_description", ""),
+            "top_n": payload.get("top_n", 10)
+        }
+
+    if intent == Intent.CANDIDATE_ADD:
+        return {"candidates": payload.get("candidates", [])}
+
+    if intent == Intent.CANDIDATE_REMOVE:
+        return {"candidate_ids": payload.get("candidate_ids", [])}
+
+    if intent == Intent.EXPLANATION:
+        return {
+            "handle": payload.get("handle", ""),
+            "wait": payload.get("wait", True),
+            "timeout": payload.get("timeout")
+        }
+
+    return None
+
+
+def _intent_name(intent) -> str:
+    return intent.value if isinstance(intent, Intent) else str(intent)
 
 
 def run_agent(intent: Intent, payload: dict) -> dict:
+    """
+    Route one request to its tool.
+
+    Identical requests already in flight (same intent and normalized
+    payload) share that execution; see `core.singleflight`. An optional
+    `deadline_seconds` in the payload caps every upstream call the request
+    makes (`core.call_policy.budget`).
+    """
+    with tracing.trace(_intent_name(intent)) as trace:
+        result = _run(intent, payload)
+        trace.set(error="error" in result)
+        return result
+
+
+def _run(intent: Intent, payload: dict) -> dict:
+    try:
+        kwargs = _tool_arguments(intent, payload)
+        if kwargs is None:
+            return {"error": "Unknown intent"}
+
+        with call_policy.budget(payload.get("deadline_seconds")):
+            result, _ = singleflight.do(intent.value, kwargs, lambda: _tool(intent)(**kwargs))
+        return result
+
+    except Exception as e:
+        return {"error": f"Agent execution error: {str(e)}"}
+
+
+async def arun_agent(intent: Intent, payload: dict) -> dict:
+    """
+    Async counterpart of `run_agent`.
+
+    Retrieval and LLM calls are awaited, so one event loop can overlap the
+    network waits of many requests. In-flight LLM calls are capped
+    process-wide by `config.LLM_MAX_CONCURRENCY`.
+    """
+    with tracing.trace(_intent_name(intent)) as trace:
+        result = await _arun(intent, payload)
+        trace.set(error="error" in result)
+        return result
+
+
+async def _arun(intent: Intent, payload: dict) -> dict:
     try:
-        if intent == Intent.RESUME_SCREENING:
-            return run_resume_screening(
-                resume_text=payload.get("resume_text", ""),
-                job_description=payload.get("job_description", "")
-            )
-
-        if intent == Intent.INTERVIEW_GENERATION:
-            return generate_interview_questions(
-                job_description=payload.get("job_description", ""),
-                role_level=payload.get("role_level", "Junior")
-            )
-
-        if intent == Intent.INTERVIEW_EVALUATION:
-            return evaluate_interview(
-                question=payload.get("question", ""),
-                answer=payload.get("answer", ""),  # ✅ FIXED
-                job_description=payload.get("job_description", ""),
-                role_level=payload.get("role_level", "Junior")
-            )
-
-        if intent == Intent.HR_QA:
-            return answer_hr_question(
-                question=payload.get("question", "")
-            )
-
-        return {"error": "Unknown intent"}
+        kwargs = _tool_arguments(intent, payload)
+        if kwargs is None:
+            return {"error": "Unknown intent"}
+
+        tool = _tool(intent, asynchronous=True)
+        with call_policy.budget(payload.get("deadline_seconds")):
+            result, _ = await singleflight.ado(intent.value, kwargs, lambda: tool(**kwargs))
+        return result
 
     except Exception as e:
         return {"error": f"Agent execution error: {str(e)}"}
+
+
+def stream_agent(intent: Intent, payload: dict):
+    """
+    Streaming counterpart of `run_agent`; a generator of events:
+
+    - `{"type": "token", "text": str}`: the next piece of generated text
+    - `{"type": "partial", "fields": dict}`: result fields known so far
+    - `{"type": "result", "result": dict}`: the final result, always last
+
+    Intents without a streaming tool yield only the result event.
+    """
+    with tracing.trace(_intent_name(intent), streamed=True) as trace:
+        for event in _stream(intent, payload):
+            if event["type"] == "result":
+                trace.set(error="error" in event["result"])
+            yield event
+
+
+def _stream(intent: Intent, payload: dict):
+    try:
+        kwargs = _tool_arguments(intent, payload)
+        if kwargs is None:
+            yield {"type": "result", "result": {"error": "Unknown intent"}}
+            return
+
+        stream = _stream_tool(intent)
+        if stream is None:
+            yield {"type": "result", "result": _tool(intent)(**kwargs)}
+            return
+
+        yield from stream(**kwargs)
+
+    except Exception as e:
+        yield {"type": "result", "result": {"error": f"Agent execution error: {str(e)}"}}
@@ -0,0 +1,289 @@
+"""
+Offline batch runner for JSONL request files.
+
+Each input line is a `{"intent": ..., "payload": {...}}` record (an optional
+"id" is copied to the output). Records are streamed through `run_agent` on
+a thread or process pool with a bounded number of records in flight, so
+memory stays flat however large the file is. Results go to an output JSONL
+either in input order or as they complete.
+
+Progress is checkpointed next to the output: a watermark (every line below
+it is finished), the finished lines above the watermark, and the byte
+length of the output at that point. On resume the output is truncated to
+that length and only unfinished lines are run again, so no record is
+lost or written twice.
+
+Explanation handles would not outlive the run, so resume screening
+records asking for a "background" or "lazy" explanation are explained
+inline, and "explanation" records are refused.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+CHECKPOINT_VERSION = 1
+
+# Explain modes that return a handle, fetchable only from this process
+DEFERRED_EXPLAIN_MODES = ("background", "lazy")
+
+
+def _execute(intent: str, payload: dict) -> dict:
+    from core.agent import Intent, run_agent
+
+    return run_agent(Intent(intent), payload)
+
+
+def _init_worker(fake: bool):
+    if fake:
+        from core.fakes import install_fakes
+
+        install_fakes()
+
+
+# =================================================
+# Checkpoint
+# =================================================
+class Checkpoint:
+    """Finished input lines plus the output length they correspond to."""
+
+    def __init__(self, path: str, input_path: str):
+        self.path = path
+        self.input_path = os.path.abspath(input_path)
+        self.watermark = 1
+        self.done = set()
+        self.output_bytes = 0
+        self.complete = False
+
+    @classmethod
+    def load(cls, path: str, input_path: str) -> "Checkpoint":
+        checkpoint = cls(path, input_path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return checkpoint
+
+        if state.get("input") != checkpoint.input_path:
+            raise ValueError(
+                f"Checkpoint {path} belongs to {state.get('input')}; use --restart to start over"
+            )
+        checkpoint.watermark = state["watermark"]
+        checkpoint.done = set(state["done"])
+        checkpoint.output_bytes = state["output_bytes"]
+        checkpoint.complete = state.get("complete", False)
+        return checkpoint
+
+    def finished(self, line_no: int) -> bool:
+        return line_no < self.watermark or line_no in self.done
+
+    def mark(self, line_no: int):
+        self.done.add(line_no)
+        while self.watermark in self.done:
+            self.done.remove(self.watermark)
+            self.watermark += 1
+
+    def save(self, output_bytes: int, complete: bool = False):
+        self.output_bytes = output_bytes
+        self.complete = complete
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": CHECKPOINT_VERSION,
+                "input": self.input_path,
+                "watermark": self.watermark,
+                "done": sorted(self.done),
+                "output_bytes": output_bytes,
+                "complete": complete
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+# =================================================
+# Runner
+# =================================================
+def _parse(line: str):
+    """(intent, payload, id) of one input line, or an error message."""
+    from core.agent import Intent
+
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
+    if not isinstance(record, dict):
+        return None, "Record must be a JSON object"
+
+    try:
+        intent = Intent(record.get("intent"))
+    except ValueError:
+        return None, "Unknown intent"
+    if intent == Intent.EXPLANATION:
+        return None, "Explanation handles cannot be fetched from a batch run"
+
+    payload = record.get("payload") or {}
+    if not isinstance(payload, dict):
+        return None, "Payload must be a JSON object"
+    if payload.get("explain") in DEFERRED_EXPLAIN_MODES:
+        payload = dict(payload, explain="inline")
+    return (intent.value, payload, record.get("id")), None
+
+
+class _Writer:
+    """Writes finished records (in order if asked) and checkpoints them."""
+
+    def __init__(self, out, checkpoint: Checkpoint, ordered: bool, checkpoint_every: int):
+        self.out = out
+        self.checkpoint = checkpoint
+        self.ordered = ordered
+        self.checkpoint_every = max(checkpoint_every, 1)
+        self.buffer = {}
+        self.next_line = checkpoint.watermark
+        self.written = 0
+        self.errors = 0
+        self._since_checkpoint = 0
+
+    def emit(self, line_no: int, record):
+        """Finish a line; `record` None means the line produces no output."""
+        if not self.ordered:
+            self._write(line_no, record)
+            return
+
+        self.buffer[line_no] = record
+        while self.next_line in self.buffer:
+            self._write(self.next_line, self.buffer.pop(self.next_line))
+            self.next_line += 1
+
+    def skip(self, line_no: int):
+        """A line finished in an earlier run."""
+        if self.ordered and line_no >= self.next_line:
+            self.emit(line_no, None)
+
+    def _write(self, line_no: int, record):
+        if record is not None:
+            self.out.write((json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+            self.written += 1
+            if "error" in record or "error" in (record.get("result") or {}):
+                self.errors += 1
+
+        if not self.checkpoint.finished(line_no):
+            self.checkpoint.mark(line_no)
+            self._since_checkpoint += 1
+            if self._since_checkpoint >= self.checkpoint_every:
+                self.save()
+
+    def save(self, complete: bool = False):
+        self.out.flush()
+        os.fsync(self.out.fileno())
+        self.checkpoint.save(self.out.tell(), complete=complete)
+        self._since_checkpoint = 0
+
+
+def run_batch(input_path, output_path, workers: int = 4, mode: str = "thread",
+              ordered: bool = True, window: int = None, checkpoint_path=None,
+              checkpoint_every: int = 100, fake: bool = False, progress=None) -> dict:
+    """
+    Run every record of `input_path` through the agent; returns a summary.
+
+    Args:
+        mode: "thread" or "process" pool
+        ordered: write results in input order (else in completion order)
+        window: maximum records in flight, buffered results included
+            (default 4 per worker)
+        checkpoint_path: defaults to `<output_path>.ckpt`
+        fake: use local stand-ins instead of OpenAI (in every worker)
+        progress: optional callable(summary) invoked after each result
+    """
+    if mode not in ("thread", "process"):
+        raise ValueError(f"Unknown mode: {mode}")
+
+    workers = max(workers, 1)
+    window = max(window or workers * 4, 1)
+    checkpoint_path = str(checkpoint_path or f"{output_path}.ckpt")
+    fresh = not os.path.exists(output_path)
+    if fresh:
+        # Without its output a checkpoint means nothing
+        checkpoint = Checkpoint(checkpoint_path, input_path)
+    else:
+        checkpoint = Checkpoint.load(checkpoint_path, input_path)
+        fresh = not os.path.exists(checkpoint_path)
+
+    summary = {"processed": 0, "resumed_from_line": checkpoint.watermark, "skipped": 0,
+               "written": 0, "errors": 0, "seconds": 0.0, "complete": checkpoint.complete}
+    if checkpoint.complete:
+        summary["already_complete"] = True
+        return summary
+
+    if mode == "process":
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(fake,))
+    else:
+        _init_worker(fake)
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+    started = time.perf_counter()
+    pending = {}
+
+    with open(output_path, "wb" if fresh else "r+b") as out, \
+            open(input_path, "r", encoding="utf-8") as source:
+        # Drop output written after the last checkpoint; those lines rerun
+        out.truncate(checkpoint.output_bytes)
+        out.seek(checkpoint.output_bytes)
+        writer = _Writer(out, checkpoint, ordered, checkpoint_every)
+
+        def _collect(futures):
+            for future in futures:
+                line_no, record_id, intent = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:  # worker died or result not transferable
+                    result = {"error": f"Worker error: {e}"}
+                writer.emit(line_no, {"line": line_no, "id": record_id, "intent": intent, "result": result})
+                summary["processed"] += 1
+                if progress is not None:
+                    progress(dict(summary, written=writer.written, errors=writer.errors))
+
+        try:
+            for line_no, line in enumerate(source, start=1):
+                if checkpoint.finished(line_no):
+                    summary["skipped"] += 1
+                    writer.skip(line_no)
+                    continue
+
+                if not line.strip():
+                    writer.emit(line_no, None)
+                    continue
+
+                parsed, error = _parse(line)
+                if error:
+                    writer.emit(line_no, {"line": line_no, "error": error})
+                    continue
+
+                intent, payload, record_id = parsed
+                future = pool.submit(_execute, intent, payload)
+                pending[future] = (line_no, record_id, intent)
+
+                while len(pending) + len(writer.buffer) >= window and pending:
+                    done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                    _collect(done)
+
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                _collect(done)
+
+            writer.save(complete=True)
+        finally:
+            # Records still running when interrupted are simply run again
+            pool.shutdown(wait=not pending, cancel_futures=True)
+            if not checkpoint.complete:
+                # Interrupted: everything flushed so far is safely recorded
+                writer.save()
+
+    summary.update(
+        written=writer.written,
+        errors=writer.errors,
+        seconds=round(time.perf_counter() - started, 3),
+        complete=checkpoint.complete
+    )
+    return summary
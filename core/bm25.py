@@ -0,0 +1,163 @@
+"""
+Incremental BM25 index over knowledge-base chunks.
+
+Built next to the vector store by `build_vector_store` (same chunk ids and
+metadata) and persisted as one JSON file. Chunks are added and removed by
+id, so incremental builds only touch changed files. Scoring is Okapi BM25
+over lowercased alphanumeric terms with stopwords dropped and a light
+plural fold ("policies" and "policy" match).
+
+`confidence` tells whether the lexical result alone can be trusted: every
+query term must be known to the index, the top chunk must contain all of
+them, and it must clearly outscore every chunk that misses some.
+"""
+
+import json
+import math
+import os
+import re
+
+INDEX_VERSION = 1
+K1 = 1.5
+B = 0.75
+
+_TERM_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from how i if in into is it its
+me my of on or our should so that the their them then there these they this
+to was we were what when where which who why will with you your
+""".split())
+
+
+def _fold(term: str) -> str:
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    if len(term) > 3 and term.endswith("s") and not term.endswith(("ss", "us", "is")):
+        return term[:-1]
+    return term
+
+
+def tokenize(text: str) -> list:
+    return [_fold(t) for t in _TERM_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Postings `term -> {chunk_id: tf}` plus chunk text, metadata and length."""
+
+    def __init__(self):
+        self.docs = {}      # chunk_id -> [text, metadata, length]
+        self.postings = {}  # term -> {chunk_id: tf}
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+    def add(self, chunk_id: str, text: str, metadata: dict = None):
+        if chunk_id in self.docs:
+            return
+        terms = tokenize(text)
+        self.docs[chunk_id] = [text, metadata or {}, len(terms)]
+        self.total_length += len(terms)
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[chunk_id] = tf
+
+    def remove(self, chunk_id: str):
+        doc = self.docs.pop(chunk_id, None)
+        if doc is None:
+            return
+        self.total_length -= doc[2]
+        for term in set(tokenize(doc[0])):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(chunk_id, None)
+                if not posting:
+                    del self.postings[term]
+
+    # -----------------------------
+    # Search
+    # -----------------------------
+    def _idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1.0 + (len(self.docs) - df + 0.5) / (df + 0.5))
+
+    def scores(self, terms) -> dict:
+        """BM25 score of every chunk containing at least one of `terms`."""
+        if not self.docs:
+            return {}
+        avg_length = self.total_length / len(self.docs) or 1.0
+        scores = {}
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = self._idf(term)
+            for chunk_id, tf in posting.items():
+                norm = K1 * (1 - B + B * self.docs[chunk_id][2] / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, k: int = 4) -> list:
+        """`(chunk_id, score)` pairs, best first."""
+        scores = self.scores(tokenize(query))
+        return sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+
+    def confidence(self, query: str, ranked=None) -> float:
+        """
+        0..1: how clearly the chunks matching every query term outscore the
+        rest. 0 when a term is unknown or the best chunk misses a term.
+        """
+        terms = set(tokenize(query))
+        if not terms or any(t not in self.postings for t in terms):
+            return 0.0
+        ranked = ranked if ranked is not None else self.search(query, k=len(self.docs))
+        if not ranked:
+            return 0.0
+
+        def _complete(chunk_id):
+            return all(chunk_id in self.postings[t] for t in terms)
+
+        top_id, top_score = ranked[0]
+        if not _complete(top_id) or top_score <= 0:
+            return 0.0
+        partial = next((score for chunk_id, score in ranked if not _complete(chunk_id)), 0.0)
+        return max(0.0, 1.0 - partial / top_score)
+
+    def text(self, chunk_id: str) -> str:
+        return self.docs[chunk_id][0]
+
+    def metadata(self, chunk_id: str) -> dict:
+        return self.docs[chunk_id][1]
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "docs": self.docs}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """The index at `path`, or None if missing or from another version."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("version") != INDEX_VERSION:
+            return None
+
+        index = cls()
+        # Postings are rebuilt rather than stored: the file stays small and
+        # tokenizing a knowledge base takes milliseconds
+        for chunk_id, (text, metadata, _) in state["docs"].items():
+            index.add(chunk_id, text, metadata)
+        return index
@@ -0,0 +1,527 @@
+"""
+Deadlines, hedged requests and circuit breakers for upstream calls.
+
+Every LLM, embedding and vector-search call made by the tools goes through
+the `CallPolicy` of its upstream (see `UPSTREAMS`):
+
+- Deadline: the caller stops waiting with `DeadlineExceeded` after the
+  upstream's `config.*_TIMEOUT_SECONDS`, or earlier inside a `budget()`
+  block. Blocking calls run on a worker thread so the caller can give up;
+  an abandoned call finishes (and is discarded) in the background.
+- Hedging: a call still running after the recent p95 latency gets one
+  duplicate, and whichever answers first wins. Hedges are capped at
+  `config.HEDGE_MAX_RATIO` of calls so a slowed-down upstream does not see
+  its load doubled. Streams are never hedged, and neither is the LLM
+  unless "llm" is listed in `config.HEDGE_UPSTREAMS`.
+- Circuit breaker: after `config.BREAKER_FAILURES` consecutive failures
+  (errors or deadlines) calls fail at once with `CircuitOpenError` for
+  `config.BREAKER_COOLDOWN_SECONDS`; then a single probe call is let
+  through and its outcome closes or reopens the circuit.
+
+Transport and provider failures raised by the upstream (see
+`is_upstream_failure`) are re-raised as `UpstreamError`. All three errors
+derive from `UpstreamUnavailable`, which the tools catch to fall back to
+their LLM-only or deterministic answers. Any other exception, such as a
+TypeError from a bad call, propagates unchanged and leaves the breaker
+alone.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from core import config, tracing
+
+# upstream -> config attribute holding its deadline in seconds
+UPSTREAMS = {
+    "llm": "LLM_TIMEOUT_SECONDS",
+    "embeddings": "EMBEDDING_TIMEOUT_SECONDS",
+    "vector_search": "VECTOR_SEARCH_TIMEOUT_SECONDS",
+}
+
+LATENCY_WINDOW = 256
+_REFRESH_EVERY = 16
+
+_budget = contextvars.ContextVar("hr_agent_call_budget", default=None)
+_pool = None
+_pool_lock = threading.Lock()
+_transport_errors = None
+
+
+class UpstreamUnavailable(Exception):
+    """An upstream call did not produce a result in time, or was not attempted."""
+
+
+class DeadlineExceeded(UpstreamUnavailable, TimeoutError):
+    pass
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class UpstreamError(UpstreamUnavailable):
+    """The upstream call raised; the original exception is the `__cause__`."""
+
+
+def _transport_error_types() -> tuple:
+    """Timeouts and connection errors, including the provider SDKs' own where installed."""
+    global _transport_errors
+    if _transport_errors is None:
+        # OSError covers ConnectionError and requests' RequestException
+        errors = [OSError, TimeoutError]
+        try:
+            import httpx
+
+            errors.append(httpx.TransportError)
+        except ImportError:
+            pass
+        try:
+            import openai
+
+            errors.append(openai.APIConnectionError)
+        except ImportError:
+            pass
+        _transport_errors = tuple(errors)
+    return _transport_errors
+
+
+def is_upstream_failure(error) -> bool:
+    """
+    Whether `error` says the upstream is unhealthy: a timeout, a transport
+    error, or a provider HTTP error (429 or 5xx). Anything else is a bug in
+    the call itself.
+    """
+    if isinstance(error, _transport_error_types()):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                _pool = ThreadPoolExecutor(
+                    max_workers=config.UPSTREAM_WORKERS, thread_name_prefix="upstream"
+                )
+    return _pool
+
+
+@contextmanager
+def budget(seconds):
+    """
+    Cap every upstream call made inside the block to finish within
+    `seconds` of entering it (on top of each upstream's own deadline).
+    Nested budgets can only shorten the outer one; None is a no-op.
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + float(seconds)
+    outer = _budget.get()
+    token = _budget.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+
+def budget_deadline():
+    """`time.monotonic()` deadline of the enclosing `budget()`, or None outside one."""
+    return _budget.get()
+
+
+# =================================================
+# Circuit breaker
+# =================================================
+class CircuitBreaker:
+    """closed -> open after consecutive failures -> half-open probe after the cooldown."""
+
+    def __init__(self):
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._probing = False
+
+    def allow(self, now: float) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and now - self.opened_at >= config.BREAKER_COOLDOWN_SECONDS:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def succeeded(self):
+        self.state = "closed"
+        self.failures = 0
+        self._probing = False
+
+    def failed(self, now: float):
+        self.failures += 1
+        self._probing = False
+        if self.state == "half_open" or self.failures >= config.BREAKER_FAILURES:
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self.opened_at = now
+
+    def released(self):
+        """An admitted call ended without telling anything about the upstream."""
+        self._probing = False
+
+
+# =================================================
+# Policy
+# =================================================
+class CallPolicy:
+    """Deadline, hedging and circuit breaker of one upstream."""
+
+    def __init__(self, upstream: str, timeout_setting: str):
+        self.upstream = upstream
+        self.timeout_setting = timeout_setting
+        self.breaker = CircuitBreaker()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._recorded = 0
+        self._hedge_after = None
+        self._hedge_tokens = 1.0
+        self._stats = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.breaker = CircuitBreaker()
+            self._latencies.clear()
+            self._recorded = 0
+            self._hedge_after = None
+            self._hedge_tokens = 1.0
+            self._stats = {
+                "calls": 0, "ok": 0, "errors": 0, "timeouts": 0, "rejected": 0,
+                "hedges_fired": 0, "hedges_won": 0
+            }
+
+    # -----------------------------
+    # Bookkeeping
+    # -----------------------------
+    def timeout(self) -> float:
+        return getattr(config, self.timeout_setting)
+
+    def _admit(self):
+        """
+        Start one call: `(deadline, own)`, where `own` tells whether the
+        deadline is the upstream's own rather than a shorter caller budget.
+        """
+        now = time.monotonic()
+        deadline = now + self.timeout()
+        outer = _budget.get()
+        own = outer is None or deadline <= outer
+        if not own and outer <= now:
+            raise DeadlineExceeded(f"{self.upstream}: request budget exhausted")
+
+        with self._lock:
+            if not self.breaker.allow(now):
+                self._stats["rejected"] += 1
+                rejected = True
+            else:
+                self._stats["calls"] += 1
+                self._hedge_tokens = min(
+                    self._hedge_tokens + config.HEDGE_MAX_RATIO, 1.0 + config.HEDGE_MAX_RATIO * 10
+                )
+                rejected = False
+        if rejected:
+            tracing.event("upstream.circuit_open", upstream=self.upstream)
+            raise CircuitOpenError(f"{self.upstream} circuit is open after repeated failures")
+        return (deadline if own else outer), own
+
+    def _succeeded(self, latency: float, hedge_won: bool = False):
+        with self._lock:
+            self._stats["ok"] += 1
+            if hedge_won:
+                self._stats["hedges_won"] += 1
+            self.breaker.succeeded()
+            self._latencies.append(latency)
+            self._recorded += 1
+            if self._recorded % _REFRESH_EVERY == 0 or self._hedge_after is None:
+                self._hedge_after = self._quantile(config.HEDGE_QUANTILE)
+
+    def _failed(self, timed_out: bool, own: bool = True):
+        with self._lock:
+            self._stats["timeouts" if timed_out else "errors"] += 1
+            if timed_out and not own:
+                # The caller's budget ran out, not the upstream's deadline
+                self.breaker.released()
+            else:
+                self.breaker.failed(time.monotonic())
+
+    def _released(self):
+        with self._lock:
+            self.breaker.released()
+
+    def _quantile(self, q: float):
+        """Quantile of recent latencies (must hold `_lock`); None until enough samples."""
+        if len(self._latencies) < config.HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def _hedge_delay(self):
+        if not config.HEDGE_ENABLED or self.upstream not in config.HEDGE_UPSTREAMS:
+            return None
+        with self._lock:
+            if self._hedge_after is None or self.breaker.state != "closed":
+                return None
+            return max(self._hedge_after, config.HEDGE_MIN_DELAY_SECONDS)
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if self._hedge_tokens < 1.0:
+                return False
+            self._hedge_tokens -= 1.0
+            self._stats["hedges_fired"] += 1
+        tracing.event("upstream.hedge", upstream=self.upstream)
+        return True
+
+    def _deadline_error(self):
+        return DeadlineExceeded(f"{self.upstream} call did not finish within its deadline")
+
+    def _raised(self, error):
+        """
+        Record a call that raised `error` and return the exception to raise:
+        upstream failures count against the breaker and are wrapped in
+        `UpstreamError`, anything else is returned unchanged.
+        """
+        if isinstance(error, UpstreamUnavailable):
+            self._failed(timed_out=False)
+            return error
+        if not is_upstream_failure(error):
+            self._released()
+            return error
+        self._failed(timed_out=False)
+        wrapped = UpstreamError(f"{self.upstream} call failed: {error}")
+        wrapped.__cause__ = error
+        return wrapped
+
+    # -----------------------------
+    # Sync
+    # -----------------------------
+    def call(self, fn, *args, **kwargs):
+        """`fn(*args, **kwargs)` under this upstream's deadline, hedging and breaker."""
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        deadline, own = self._admit()
+        run = tracing.propagate(fn)
+        pool = _executor()
+        primary = pool.submit(run, *args, **kwargs)
+        attempts = {primary: time.monotonic()}
+
+        delay = self._hedge_delay()
+        if delay is not None:
+            done, _ = wait([primary], timeout=max(min(delay, deadline - time.monotonic()), 0))
+            if not done and time.monotonic() < deadline and self._take_hedge():
+                attempts[pool.submit(run, *args, **kwargs)] = time.monotonic()
+
+        error = None
+        while attempts:
+            done, _ = wait(
+                list(attempts), timeout=max(deadline - time.monotonic(), 0),
+                return_when=FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for future in done:
+                started = attempts.pop(future)
+                if future.exception() is None:
+                    self._succeeded(time.monotonic() - started, hedge_won=future is not primary)
+                    for other in attempts:
+                        other.cancel()
+                    return future.result()
+                error = future.exception()
+
+        if not attempts:
+            raise self._raised(error)
+        for other in attempts:
+            other.cancel()
+        self._failed(timed_out=True, own=own)
+        raise self._deadline_error()
+
+    def stream(self, open_stream, *args, **kwargs):
+        """
+        Iterate `open_stream(*args, **kwargs)` with the whole stream held to
+        the deadline. The stream is read on a worker thread; closing this
+        generator closes the upstream stream after its next chunk.
+        """
+        import queue
+
+        deadline, own = self._admit()
+        chunks = queue.Queue()
+        stop = threading.Event()
+
+        def pump():
+            try:
+                stream = open_stream(*args, **kwargs)
+                try:
+                    for chunk in stream:
+                        chunks.put(("chunk", chunk))
+                        if stop.is_set():
+                            break
+                finally:
+                    close = getattr(stream, "close", None)
+                    if close is not None:
+                        close()
+            except BaseException as e:
+                chunks.put(("error", e))
+                return
+            chunks.put(("end", None))
+
+        started = time.monotonic()
+        _executor().submit(tracing.propagate(pump))
+        settled = received = False
+        try:
+            while True:
+                try:
+                    kind, value = chunks.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    settled = True
+                    self._failed(timed_out=True, own=own)
+                    raise self._deadline_error() from None
+                if kind == "chunk":
+                    received = True
+                    yield value
+                elif kind == "end":
+                    settled = True
+                    self._succeeded(time.monotonic() - started)
+                    return
+                else:
+                    settled = True
+                    raise self._raised(value)
+        finally:
+            stop.set()
+            if not settled:
+                # Closed early by the consumer: chunks arriving counts as healthy
+                if received:
+                    self._succeeded(time.monotonic() - started)
+                else:
+                    self._released()
+
+    # -----------------------------
+    # Async
+    # -----------------------------
+    async def acall(self, fn, *args, **kwargs):
+        """Async counterpart of `call`; `fn` is a coroutine function."""
+        import asyncio
+
+        deadline, own = self._admit()
+        primary = asyncio.ensure_future(fn(*args, **kwargs))
+        attempts = {primary: time.monotonic()}
+        try:
+            delay = self._hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(
+                    [primary], timeout=max(min(delay, deadline - time.monotonic()), 0)
+                )
+                if not done and time.monotonic() < deadline and self._take_hedge():
+                    attempts[asyncio.ensure_future(fn(*args, **kwargs))] = time.monotonic()
+
+            error = None
+            while attempts:
+                done, _ = await asyncio.wait(
+                    list(attempts), timeout=max(deadline - time.monotonic(), 0),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    started = attempts.pop(task)
+                    if task.exception() is None:
+                        self._succeeded(time.monotonic() - started, hedge_won=task is not primary)
+                        return task.result()
+                    error = task.exception()
+
+            if not attempts:
+                raise self._raised(error)
+            self._failed(timed_out=True, own=own)
+            raise self._deadline_error()
+        except asyncio.CancelledError:
+            self._released()
+            raise
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    async def astream(self, open_stream, *args, **kwargs):
+        """Async counterpart of `stream`, reading the stream on the running loop."""
+        import asyncio
+
+        deadline, own = self._admit()
+        started = time.monotonic()
+        stream = open_stream(*args, **kwargs)
+        settled = received = False
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        stream.__anext__(), timeout=max(deadline - time.monotonic(), 0)
+                    )
+                except StopAsyncIteration:
+                    settled = True
+                    self._succeeded(time.monotonic() - started)
+                    return
+                except asyncio.TimeoutError:
+                    settled = True
+                    self._failed(timed_out=True, own=own)
+                    raise self._deadline_error() from None
+                except Exception as e:
+                    settled = True
+                    raise self._raised(e)
+                received = True
+                yield chunk
+        finally:
+            if not settled:
+                if received:
+                    self._succeeded(time.monotonic() - started)
+                else:
+                    self._released()
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    # -----------------------------
+    # Counters
+    # -----------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            p95 = self._quantile(0.95)
+            stats["breaker"] = self.breaker.state
+            stats["breaker_opens"] = self.breaker.opens
+        stats["p95_ms"] = round(p95 * 1000, 2) if p95 is not None else None
+        stats["timeout_seconds"] = self.timeout()
+        return stats
+
+
+_policies = {name: CallPolicy(name, setting) for name, setting in UPSTREAMS.items()}
+
+
+def policy(upstream: str) -> CallPolicy:
+    """The policy of "llm", "embeddings" or "vector_search"."""
+    return _policies[upstream]
+
+
+def stats() -> dict:
+    """Per-upstream calls, outcomes, hedges fired and won, and breaker state."""
+    return {name: p.stats() for name, p in _policies.items()}
+
+
+def reset():
+    """Zero the counters, forget latencies and close every breaker."""
+    for p in _policies.values():
+        p.reset()
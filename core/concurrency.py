@@ -0,0 +1,143 @@
+"""
+Process-wide cap on in-flight LLM calls.
+
+One pool of `config.LLM_MAX_CONCURRENCY` slots is shared by every thread
+and every event loop. `llm_slot()` guards blocking calls, `allm_slot()`
+guards coroutines (it polls for a free slot instead of blocking the loop),
+and `acquire_slot()` + `hold_while_open()` let a streamed call give its
+slot back when the upstream stream ends, on the thread reading it, rather
+than when the consumer of the text stops iterating.
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from core import config
+
+_POLL_MIN_SECONDS = 0.001
+_POLL_MAX_SECONDS = 0.02
+
+
+class _Slots:
+    def __init__(self, limit: int):
+        self.limit = max(limit, 1)
+        self._cond = threading.Condition()
+        self._used = 0
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self._used >= self.limit:
+                return False
+            self._used += 1
+            return True
+
+    def acquire(self):
+        with self._cond:
+            while self._used >= self.limit:
+                self._cond.wait()
+            self._used += 1
+
+    def release(self):
+        with self._cond:
+            if self._used <= 0:
+                raise RuntimeError("LLM slot released more often than acquired")
+            self._used -= 1
+            self._cond.notify()
+
+    def in_use(self) -> int:
+        with self._cond:
+            return self._used
+
+
+_slots = _Slots(config.LLM_MAX_CONCURRENCY)
+
+
+def in_flight() -> int:
+    """LLM slots currently held (sync and async together)."""
+    return _slots.in_use()
+
+
+@contextmanager
+def llm_slot():
+    """Context manager holding one LLM slot for a blocking call."""
+    _slots.acquire()
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+@asynccontextmanager
+async def allm_slot():
+    """Async context manager holding one LLM slot; waits without blocking the loop."""
+    delay = _POLL_MIN_SECONDS
+    while not _slots.try_acquire():
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _POLL_MAX_SECONDS)
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+class Slot:
+    """One held LLM slot; `release()` may be called any number of times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._held = True
+
+    def release(self):
+        with self._lock:
+            if not self._held:
+                return
+            self._held = False
+        _slots.release()
+
+
+def acquire_slot() -> Slot:
+    """Block until a slot is free and return it."""
+    _slots.acquire()
+    return Slot()
+
+
+class _SlotStream:
+    def __init__(self, stream, slot: Slot):
+        self._stream = stream
+        self._iter = iter(stream)
+        self._slot = slot
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._iter)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._slot.release()
+
+
+def hold_while_open(slot: Slot, open_stream):
+    """
+    Wrap `open_stream` so the stream it opens releases `slot` once it is
+    exhausted, fails or is closed.
+    """
+    def open_(*args, **kwargs):
+        try:
+            stream = open_stream(*args, **kwargs)
+        except BaseException:
+            slot.release()
+            raise
+        return _SlotStream(stream, slot)
+
+    return open_
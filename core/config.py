@@ -1,16 +1,140 @@
 import os
-from dotenv import load_dotenv
+import time
 from pathlib import Path
 
+_load_started = time.perf_counter()
+
 # Load .env from project root
 ROOT_DIR = Path(__file__).resolve().parent.parent
 ENV_PATH = ROOT_DIR / ".env"
 
-load_dotenv(dotenv_path=ENV_PATH)
+if ENV_PATH.exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=ENV_PATH)
+
+
+def require_openai_key() -> str:
+    """
+    The OpenAI API key; raises if it is not configured.
+
+    Validation is deferred to the first OpenAI client so that importing
+    `core` (and running with local stand-ins) never needs a key.
+    """
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        raise RuntimeError(
+            "OPENAI_API_KEY not found. Ensure .env exists at project root."
+        )
+    return key
+
+
+def __getattr__(name):
+    # `config.OPENAI_API_KEY` keeps working, validated on access
+    if name == "OPENAI_API_KEY":
+        return require_openai_key()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Local caches (LLM responses etc.)
+CACHE_DIR = Path(os.getenv("HR_AGENT_CACHE_DIR", ROOT_DIR / ".cache"))
+
+# LLM response cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Maximum in-flight LLM calls per process (sync and async paths)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+# Coalesce identical agent requests that are in flight at the same time
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "1") != "0"
+
+# Upstream call policy (see core/call_policy.py): deadline per call of
+# each upstream, hedged duplicates after the recent p95 latency (at most
+# HEDGE_MAX_RATIO extra calls), and a circuit breaker that fails fast for
+# BREAKER_COOLDOWN_SECONDS after BREAKER_FAILURES consecutive failures.
+# LLM calls are billed per token, so hedging them is opt-in: add "llm" to
+# HEDGE_UPSTREAMS
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+EMBEDDING_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_TIMEOUT_SECONDS", "10"))
+VECTOR_SEARCH_TIMEOUT_SECONDS = float(os.getenv("VECTOR_SEARCH_TIMEOUT_SECONDS", "10"))
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "1") != "0"
+HEDGE_UPSTREAMS = tuple(
+    os.getenv("HEDGE_UPSTREAMS", "embeddings,vector_search").replace(" ", "").split(",")
+)
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.005"))
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("BREAKER_COOLDOWN_SECONDS", "30"))
+UPSTREAM_WORKERS = int(os.getenv("UPSTREAM_WORKERS", "64"))
+
+# Vector store backend: "chroma" (persistent client) or "numpy" (memory-mapped index)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+
+# Retrieval memo: results are fetched with at least this k so smaller
+# requests for the same query are served from memory
+RETRIEVAL_PREFETCH_K = int(os.getenv("RETRIEVAL_PREFETCH_K", "4"))
+RETRIEVAL_CACHE_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_ENTRIES", "256"))
+
+# "hybrid": fuse vector and BM25 rankings (needs the BM25 index written by
+# build_vectors.py; falls back to vector search without it) or "vector".
+# With the fast path on, confident BM25 results skip the embedding call.
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "10"))
+LEXICAL_FAST_PATH = os.getenv("LEXICAL_FAST_PATH", "1") != "0"
+LEXICAL_CONFIDENCE = float(os.getenv("LEXICAL_CONFIDENCE", "0.35"))
+
+# Semantic answer cache for HR Q&A (cosine similarity of question embeddings)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") != "0"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_CAPACITY = int(os.getenv("SEMANTIC_CACHE_CAPACITY", "1024"))
+
+# Interview question bank: generated questions are reused for postings
+# whose MinHash-estimated Jaccard similarity reaches this threshold; the
+# oldest banked results beyond the entry cap are evicted
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "1") != "0"
+QUESTION_BANK_SIMILARITY = float(os.getenv("QUESTION_BANK_SIMILARITY", "0.7"))
+QUESTION_BANK_MAX_ENTRIES = int(os.getenv("QUESTION_BANK_MAX_ENTRIES", "10000"))
+
+# Persistent pool of parsed candidates (inverted skill index); the change
+# log is folded into a new snapshot after this many adds and removes
+RESUME_POOL_DIR = Path(os.getenv("RESUME_POOL_DIR", ROOT_DIR / "resume_pool"))
+RESUME_POOL_COMPACT_CHANGES = int(os.getenv("RESUME_POOL_COMPACT_CHANGES", "1000"))
+
+# Knowledge-base builds: texts per embedding request, maximum requests in
+# flight (adapted down on rate limits), chunks per store write, and
+# rate-limit retries per batch
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "128"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_FLUSH_CHUNKS = int(os.getenv("EMBED_FLUSH_CHUNKS", "1024"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "8"))
+
+# Deferred resume explanations (explain="background"/"lazy"): worker
+# threads for background explanations and how many handles are kept
+EXPLAIN_WORKERS = int(os.getenv("EXPLAIN_WORKERS", "4"))
+EXPLANATION_HANDLES = int(os.getenv("EXPLANATION_HANDLES", "1024"))
+
+# Resume document ingestion: processes used to extract PDF/DOCX text
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+
+# Headless HTTP server (serve.py, see core/server.py): agent worker
+# threads, requests allowed to wait for a worker before new ones get 429,
+# idle keep-alive timeout, open connection cap and request body limit
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "32"))
+SERVER_QUEUE_DEPTH = int(os.getenv("SERVER_QUEUE_DEPTH", "64"))
+SERVER_KEEPALIVE_SECONDS = float(os.getenv("SERVER_KEEPALIVE_SECONDS", "15"))
+SERVER_MAX_CONNECTIONS = int(os.getenv("SERVER_MAX_CONNECTIONS", "512"))
+SERVER_MAX_BODY_BYTES = int(os.getenv("SERVER_MAX_BODY_BYTES", str(16 * 1024 * 1024)))
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Stage-level tracing (see core/tracing.py); off by default
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") != "0"
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH")  # append each finished trace as JSONL
+TRACE_HISTORY = int(os.getenv("TRACE_HISTORY", "100"))
 
-if not OPENAI_API_KEY:
-    raise RuntimeError(
-        "OPENAI_API_KEY not found. Ensure .env exists at project root."
-    )
+# Time spent loading this module (reported by core.tracing)
+LOAD_SECONDS = time.perf_counter() - _load_started
@@ -0,0 +1,397 @@
+"""
+Batched, rate-limit-aware embedding for knowledge-base builds.
+
+Input files are chunked as a stream (a block of the file and at most one
+chunk's worth of paragraphs are held at a time), chunks are embedded in
+batches on a thread pool and written to the vector store with their
+precomputed vectors.
+
+The number of batches in flight follows AIMD: it grows by about one per
+round of successful batches and halves when the provider answers with a
+rate limit, after which the batch is retried with backoff (honouring
+`Retry-After` when given). Chunk ids written to the store are appended to
+a progress journal, so a build that fails partway resumes without
+re-embedding finished batches.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from core import config, tracing
+
+READ_BLOCK_SIZE = 64 * 1024
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 30.0
+
+
+# =================================================
+# Streaming chunker
+# =================================================
+def _paragraphs(path, separator: str):
+    """Non-empty pieces of a file split on `separator`, read block by block."""
+    buffer = ""
+    # newline="" keeps line endings as they are, like decoding the raw bytes
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        while True:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            buffer += block
+            *complete, buffer = buffer.split(separator)
+            for piece in complete:
+                if piece:
+                    yield piece
+    if buffer:
+        yield buffer
+
+
+def stream_chunks(path, chunk_size: int, chunk_overlap: int, separator: str = "\n\n"):
+    """
+    Yield the chunks `CharacterTextSplitter(chunk_size, chunk_overlap)`
+    produces for a file, without reading the whole file into memory.
+
+    The merge mirrors the splitter's: pieces are packed up to `chunk_size`
+    and the tail of each chunk (up to `chunk_overlap`) starts the next one.
+    """
+    sep_len = len(separator)
+    current = deque()
+    total = 0
+
+    for piece in _paragraphs(path, separator):
+        length = len(piece)
+        if total + length + (sep_len if current else 0) > chunk_size and current:
+            chunk = separator.join(current).strip()
+            if chunk:
+                yield chunk
+            while total > chunk_overlap or (
+                total + length + (sep_len if current else 0) > chunk_size and total > 0
+            ):
+                total -= len(current[0]) + (sep_len if len(current) > 1 else 0)
+                current.popleft()
+        current.append(piece)
+        total += length + (sep_len if len(current) > 1 else 0)
+
+    chunk = separator.join(current).strip()
+    if chunk:
+        yield chunk
+
+
+def batched(items, size: int):
+    """Lists of up to `size` consecutive items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# =================================================
+# Progress journal
+# =================================================
+class ProgressJournal:
+    """
+    Append-only record of chunk ids already written to the store.
+
+    The first line holds the build settings; a journal written under other
+    settings is ignored. Each later line lists the ids of one flush.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        self.resumed = False
+
+    def open(self, settings: dict) -> "ProgressJournal":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "null")
+                if header == {"settings": settings}:
+                    for line in f:
+                        try:
+                            self.done.update(json.loads(line)["ids"])
+                        except (ValueError, KeyError):
+                            break  # torn final line of a crashed build
+                    self.resumed = True
+        except (OSError, ValueError):
+            pass
+
+        if not self.resumed:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"settings": settings}, sort_keys=True) + "\n")
+        return self
+
+    def record(self, ids):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ids": list(ids)}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(ids)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+# =================================================
+# Adaptive concurrency
+# =================================================
+def is_rate_limit(error: Exception) -> bool:
+    """True for provider throttling (HTTP 429 / openai.RateLimitError)."""
+    return (
+        getattr(error, "status_code", None) == 429
+        or type(error).__name__ == "RateLimitError"
+    )
+
+
+def _retry_after(error: Exception):
+    seconds = getattr(error, "retry_after", None)
+    response = getattr(error, "response", None)
+    if seconds is None and response is not None:
+        seconds = getattr(response, "headers", {}).get("retry-after")
+    try:
+        return float(seconds) if seconds is not None else None
+    except ValueError:
+        return None
+
+
+class AdaptiveLimit:
+    """Additive-increase / multiplicative-decrease limit on batches in flight."""
+
+    def __init__(self, maximum: int, initial: int = None):
+        self.maximum = max(maximum, 1)
+        self.value = float(min(initial or self.maximum, self.maximum))
+        self.decreased_at = 0.0
+        self.backoff_until = 0.0
+        self._consecutive = 0
+
+    def __int__(self):
+        return max(int(self.value), 1)
+
+    def on_success(self):
+        self._consecutive = 0
+        # About +1 per round of `value` successful batches
+        self.value = min(self.value + 1.0 / self.value, float(self.maximum))
+
+    def on_rate_limit(self, error: Exception, submitted_at: float) -> float:
+        """Shrink the window and return the backoff (seconds) before retrying."""
+        now = time.monotonic()
+        delay = _retry_after(error)
+
+        # Batches sent before the last decrease saw the old limit; one
+        # throttling episode halves the window (and escalates backoff) once
+        if submitted_at < self.decreased_at:
+            return max(self.backoff_until - now, delay or 0.0)
+
+        self.value = max(self.value / 2.0, 1.0)
+        self.decreased_at = now
+        self._consecutive += 1
+
+        if delay is None:
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (self._consecutive - 1))
+            delay *= random.uniform(0.5, 1.0)
+        self.backoff_until = max(self.backoff_until, now + delay)
+        return delay
+
+
+# =================================================
+# Pipeline
+# =================================================
+class PrecomputedEmbeddings:
+    """
+    Embedding client for stores that only take texts (langchain Chroma).
+
+    Inside `serving(texts, vectors)`, `embed_documents(texts)` returns the
+    vectors already computed for those texts, so `add_texts` stores them
+    without a second embedding request; every other call is delegated to
+    the wrapped client.
+    """
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self._local = threading.local()
+
+    @contextmanager
+    def serving(self, texts, vectors):
+        self._local.rows = (list(texts), [list(map(float, v)) for v in vectors])
+        try:
+            yield
+        finally:
+            self._local.rows = None
+
+    def embed_documents(self, texts):
+        rows = getattr(self._local, "rows", None)
+        if rows is not None and list(texts) == rows[0]:
+            return rows[1]
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+
+def write_embeddings(vectordb, ids, texts, vectors, metadatas):
+    """
+    Store rows with precomputed vectors on any supported backend.
+
+    Stores without `add_embeddings` get them through `add_texts`, which
+    only avoids re-embedding when the store was opened with
+    `PrecomputedEmbeddings`.
+    """
+    if hasattr(vectordb, "add_embeddings"):
+        vectordb.add_embeddings(ids, texts, vectors, metadatas)
+        return
+
+    texts = list(texts)
+    embeddings = getattr(vectordb, "embeddings", None)
+    if isinstance(embeddings, PrecomputedEmbeddings):
+        with embeddings.serving(texts, vectors):
+            vectordb.add_texts(texts=texts, metadatas=list(metadatas), ids=list(ids))
+    else:
+        vectordb.add_texts(texts=texts, metadatas=list(metadatas), ids=list(ids))
+
+
+def _embed_batch(embeddings, texts):
+    with tracing.span("embedding.batch", size=len(texts)):
+        return embeddings.embed_documents(texts)
+
+
+def embed_chunks(chunks, vectordb, embeddings, journal: ProgressJournal = None,
+                 batch_size: int = None, concurrency: int = None,
+                 flush_chunks: int = None, max_retries: int = None,
+                 progress=None) -> dict:
+    """
+    Embed `(chunk_id, text, metadata)` tuples and write them to `vectordb`.
+
+    Chunks already in `journal.done` are skipped. Finished vectors are
+    written to the store (and recorded in the journal) every
+    `flush_chunks` chunks, and whatever is finished when an error stops
+    the build is written before the error propagates.
+
+    Args:
+        batch_size: texts per embedding request (default `config.EMBED_BATCH_SIZE`)
+        concurrency: upper bound on requests in flight (default `config.EMBED_CONCURRENCY`)
+        max_retries: rate-limit retries per batch before giving up
+        progress: optional callable(stats) invoked after each flush
+    """
+    batch_size = max(batch_size or config.EMBED_BATCH_SIZE, 1)
+    limit = AdaptiveLimit(concurrency or config.EMBED_CONCURRENCY)
+    flush_chunks = max(flush_chunks or config.EMBED_FLUSH_CHUNKS, batch_size)
+    max_retries = config.EMBED_MAX_RETRIES if max_retries is None else max_retries
+    done = journal.done if journal is not None else set()
+
+    stats = {
+        "chunks_embedded": 0,
+        "chunks_skipped": 0,
+        "batches": 0,
+        "rate_limited": 0,
+        "retries": 0,
+        "concurrency": int(limit),
+        "seconds": 0.0
+    }
+    started = time.perf_counter()
+
+    def _todo():
+        for chunk in chunks:
+            if chunk[0] in done:
+                stats["chunks_skipped"] += 1
+            else:
+                yield chunk
+
+    batches = batched(_todo(), batch_size)
+    retry = deque()
+    pending = {}
+    finished = []  # (batch, vectors) not yet written
+
+    def _flush():
+        if not finished:
+            return
+        rows = [(c, v) for batch, vectors in finished for c, v in zip(batch, vectors)]
+        finished.clear()
+        write_embeddings(
+            vectordb,
+            [c[0] for c, _ in rows], [c[1] for c, _ in rows],
+            [v for _, v in rows], [c[2] for c, _ in rows]
+        )
+        if journal is not None:
+            journal.record([c[0] for c, _ in rows])
+        stats["chunks_embedded"] += len(rows)
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        if progress is not None:
+            progress(dict(stats))
+
+    def _submit(pool, batch, attempt):
+        future = pool.submit(tracing.propagate(_embed_batch), embeddings, [c[1] for c in batch])
+        pending[future] = (batch, attempt, time.monotonic())
+
+    exhausted = False
+    with ThreadPoolExecutor(max_workers=limit.maximum) as pool:
+        try:
+            while True:
+                # -----------------------------
+                # Fill the window
+                # -----------------------------
+                now = time.monotonic()
+                while len(pending) < int(limit) and now >= limit.backoff_until:
+                    if retry:
+                        _submit(pool, *retry.popleft())
+                        stats["retries"] += 1
+                    elif not exhausted:
+                        batch = next(batches, None)
+                        if batch is None:
+                            exhausted = True
+                            continue
+                        _submit(pool, batch, 0)
+                    else:
+                        break
+
+                if not pending:
+                    if retry:
+                        time.sleep(max(limit.backoff_until - time.monotonic(), 0))
+                        continue
+                    break
+
+                timeout = None
+                if retry or not exhausted:
+                    timeout = max(limit.backoff_until - time.monotonic(), 0) or None
+                completed, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                # -----------------------------
+                # Collect
+                # -----------------------------
+                for future in completed:
+                    batch, attempt, submitted_at = pending.pop(future)
+                    try:
+                        vectors = future.result()
+                    except Exception as e:
+                        if not is_rate_limit(e) or attempt >= max_retries:
+                            raise
+                        stats["rate_limited"] += 1
+                        limit.on_rate_limit(e, submitted_at)
+                        retry.append((batch, attempt + 1))
+                        continue
+                    limit.on_success()
+                    stats["batches"] += 1
+                    finished.append((batch, vectors))
+
+                stats["concurrency"] = int(limit)
+                if sum(len(b) for b, _ in finished) >= flush_chunks:
+                    _flush()
+        finally:
+            # Keep what finished; in-flight and queued batches rerun on resume
+            for future in pending:
+                future.cancel()
+            _flush()
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,142 @@
+"""
+Deferred LLM explanations, fetched by handle.
+
+Tools that can return their verdict before the LLM has explained it
+register the explanation work here and return an opaque handle string.
+Handles live only in the memory of the process that registered them:
+they can be fetched from that process (in-process or over the HTTP
+server) but not once it has exited, which is why the batch runner
+explains inline instead. Two ways to defer:
+
+- `submit`: start now on a small background pool; fetching waits only
+  for whatever is left of the call.
+- `defer`: do nothing until the handle is first fetched, so explanations
+  nobody reads cost nothing.
+
+Handles are kept for the most recent `config.EXPLANATION_HANDLES` calls.
+Each deferred computation is recorded as its own trace ("explanation").
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from core import config, tracing
+
+MODES = ("inline", "background", "lazy", "none")
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_pool = None
+_stats = {"submitted": 0, "deferred": 0, "computed": 0, "fetched": 0, "evicted": 0}
+
+
+class _Entry:
+    __slots__ = ("fn", "future", "lock", "value", "source")
+
+    def __init__(self, fn, source: str):
+        self.fn = fn
+        self.future = None
+        self.lock = threading.Lock()
+        self.value = None
+        self.source = source
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=config.EXPLAIN_WORKERS, thread_name_prefix="explain"
+                )
+    return _pool
+
+
+def _compute(entry: _Entry, mode: str) -> str:
+    with tracing.trace("explanation", mode=mode, source=entry.source):
+        value = entry.fn()
+    with _lock:
+        _stats["computed"] += 1
+    return value
+
+
+def _register(entry: _Entry) -> str:
+    handle = "expl_" + os.urandom(8).hex()
+    with _lock:
+        _entries[handle] = entry
+        while len(_entries) > config.EXPLANATION_HANDLES:
+            _, evicted = _entries.popitem(last=False)
+            if evicted.future is not None:
+                evicted.future.cancel()
+            _stats["evicted"] += 1
+    return handle
+
+
+def submit(fn, source: str = "") -> str:
+    """Start `fn()` (returning the explanation text) in the background."""
+    entry = _Entry(fn, source)
+    handle = _register(entry)
+    entry.future = _executor().submit(_compute, entry, "background")
+    with _lock:
+        _stats["submitted"] += 1
+    return handle
+
+
+def defer(fn, source: str = "") -> str:
+    """Run `fn()` only when the handle is first fetched."""
+    with _lock:
+        _stats["deferred"] += 1
+    return _register(_Entry(fn, source))
+
+
+def get_explanation(handle: str, wait: bool = True, timeout: float = None) -> dict:
+    """
+    Resolve an explanation handle.
+
+    Returns `{"handle", "status", "explanation"}` where status is "ready",
+    or "pending" when `wait` is False (or `timeout` ran out) and the text
+    is not available yet. Lazy explanations are generated by the first
+    waiting fetch.
+    """
+    with _lock:
+        entry = _entries.get(handle)
+        if entry is not None:
+            _entries.move_to_end(handle)
+            _stats["fetched"] += 1
+    if entry is None:
+        return {"error": "Unknown or expired explanation handle."}
+
+    try:
+        if entry.future is not None:
+            if not wait and not entry.future.done():
+                return {"handle": handle, "status": "pending", "explanation": None}
+            value = entry.future.result(timeout=timeout)
+        else:
+            if not wait and entry.value is None:
+                return {"handle": handle, "status": "pending", "explanation": None}
+            with entry.lock:
+                if entry.value is None:
+                    # Errors are not kept: the next fetch tries again
+                    entry.value = _compute(entry, "lazy")
+                value = entry.value
+    except FutureTimeout:
+        return {"handle": handle, "status": "pending", "explanation": None}
+    except Exception as e:
+        return {"error": f"Explanation failed: {str(e)}"}
+
+    return {"handle": handle, "status": "ready", "explanation": value}
+
+
+async def aget_explanation(handle: str, wait: bool = True, timeout: float = None) -> dict:
+    """Async variant of `get_explanation` (resolved on a worker thread)."""
+    import asyncio
+
+    return await asyncio.to_thread(get_explanation, handle, wait, timeout)
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_stats, handles=len(_entries))
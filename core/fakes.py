@@ -0,0 +1,338 @@
+"""
+Local stand-ins for the OpenAI chat model, the embedding client and the
+vector store.
+
+They need no network or API key and are used by the benchmarks to measure
+the agent's own overhead. `install_fakes()` wires them into the registry.
+
+Latencies may be numbers or zero-argument callables drawn per call, such
+as `lognormal_latency` or `tail_latency`, and `failure_rate` makes a share
+of calls raise `FakeUpstreamError`, to exercise `core.call_policy`.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _seconds(latency):
+    return latency() if callable(latency) else latency
+
+
+def _sleep_for(latency):
+    seconds = _seconds(latency)
+    if seconds and seconds > 0:
+        time.sleep(seconds)
+
+
+async def _asleep_for(latency):
+    seconds = _seconds(latency)
+    if seconds and seconds > 0:
+        await asyncio.sleep(seconds)
+
+
+def lognormal_latency(median: float, p99: float, seed=None):
+    """Latency sampler: lognormal with the given median and 99th percentile (seconds)."""
+    rng = random.Random(seed)
+    sigma = math.log(p99 / median) / 2.326
+    lock = threading.Lock()
+
+    def sample():
+        with lock:
+            return rng.lognormvariate(math.log(median), sigma)
+
+    return sample
+
+
+def tail_latency(base: float, tail: float, tail_probability: float = 0.02, seed=None):
+    """Latency sampler: `base` seconds, or `tail` seconds with `tail_probability` (a slow replica)."""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def sample():
+        with lock:
+            return tail if rng.random() < tail_probability else base
+
+    return sample
+
+
+class FakeUpstreamError(ConnectionError):
+    """Injected upstream failure (see `failure_rate`)."""
+
+
+def _maybe_fail(failure_rate, what: str):
+    if failure_rate and random.random() < failure_rate:
+        raise FakeUpstreamError(f"Injected {what} failure")
+
+
+@dataclass
+class FakeMessage:
+    content: str
+
+
+@dataclass
+class FakeDocument:
+    page_content: str
+    metadata: dict = field(default_factory=dict)
+
+
+def default_reply(prompt: str) -> str:
+    """Produce a plausible answer for each of the tool prompts."""
+    if '"technical"' in prompt:
+        return (
+            '{"technical": ["Explain your approach to testing.", '
+            '"How do you debug a slow endpoint?", '
+            '"Describe a data model you designed."], '
+            '"behavioral": ["Tell me about a conflict you resolved.", '
+            '"Describe a deadline you missed."]}'
+        )
+    if '"evaluations"' in prompt:
+        pairs = re.findall(r"^Pair (\d+):", prompt, re.M)
+        return json.dumps({"evaluations": [
+            {"pair": int(p), "base_score": 72, "strengths": ["Clear structure"],
+             "weaknesses": ["Little depth on trade-offs"], "reasoning": "Covers the fundamentals."}
+            for p in pairs
+        ]})
+    if '"base_score"' in prompt:
+        return (
+            '{"base_score": 72, "strengths": ["Clear structure"], '
+            '"weaknesses": ["Little depth on trade-offs"], '
+            '"reasoning": "Covers the fundamentals."}'
+        )
+    return "This is a locally generated answer based on the provided context."
+
+
+class FakeLLM:
+    """
+    Chat model stand-in with configurable latency and a call counter.
+
+    `latency` is the time to the first chunk and `chunk_latency` the time
+    between chunks; `invoke` waits for the whole reply. A `failure_rate`
+    share of calls raises `FakeUpstreamError` instead. The model name always
+    carries a "fake-" prefix so its cache keys never collide with a real
+    model's.
+    """
+
+    def __init__(self, model_name="fake-llm", temperature=0.2, reply=None,
+                 latency=0.0, init_latency=0.0, chunk_size=8, chunk_latency=0.0,
+                 failure_rate=0.0):
+        _sleep_for(init_latency)
+        self.model_name = model_name if model_name.startswith("fake-") else f"fake-{model_name}"
+        self.temperature = temperature
+        self.reply = reply or default_reply
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_latency = chunk_latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _respond(self, prompt) -> str:
+        with self._lock:
+            self.calls += 1
+        _maybe_fail(self.failure_rate, "LLM")
+        text = prompt if isinstance(prompt, str) else str(prompt)
+        return self.reply(text) if callable(self.reply) else self.reply
+
+    def _generation_time(self, text) -> float:
+        return (_seconds(self.latency) or 0.0) + (_seconds(self.chunk_latency) or 0.0) * (
+            max(len(self._pieces(text)) - 1, 0)
+        )
+
+    def invoke(self, prompt):
+        text = self._respond(prompt)
+        _sleep_for(self._generation_time(text))
+        return FakeMessage(text)
+
+    async def ainvoke(self, prompt):
+        text = self._respond(prompt)
+        await _asleep_for(self._generation_time(text))
+        return FakeMessage(text)
+
+    def _pieces(self, text):
+        return [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+
+    def stream(self, prompt):
+        """Yields the reply in chunks; `latency` is the time to first chunk."""
+        _sleep_for(self.latency)
+        for i, piece in enumerate(self._pieces(self._respond(prompt))):
+            if i:
+                _sleep_for(self.chunk_latency)
+            yield FakeMessage(piece)
+
+    async def astream(self, prompt):
+        await _asleep_for(self.latency)
+        for i, piece in enumerate(self._pieces(self._respond(prompt))):
+            if i:
+                await _asleep_for(self.chunk_latency)
+            yield FakeMessage(piece)
+
+
+class FakeRateLimitError(Exception):
+    """Stand-in for `openai.RateLimitError` (HTTP 429)."""
+
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("Rate limit reached for fake embeddings")
+        self.retry_after = retry_after
+
+
+class FakeEmbeddings:
+    """
+    Deterministic hashed bag-of-words embeddings.
+
+    With `requests_per_second` set, `embed_documents` raises
+    `FakeRateLimitError` once more requests than that were started within
+    the last second, like a provider enforcing a rate limit. A
+    `failure_rate` share of query embeddings raises `FakeUpstreamError`.
+    """
+
+    def __init__(self, dim=64, latency=0.0, init_latency=0.0, requests_per_second=None,
+                 failure_rate=0.0):
+        _sleep_for(init_latency)
+        self.dim = dim
+        self.latency = latency
+        self.requests_per_second = requests_per_second
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._recent = []
+
+    def _admit(self):
+        if not self.requests_per_second:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._recent = [t for t in self._recent if now - t < 1.0]
+            if len(self._recent) >= self.requests_per_second:
+                self.rate_limited += 1
+                raise FakeRateLimitError()
+            self._recent.append(now)
+
+    def _embed(self, text: str) -> list:
+        vec = [0.0] * self.dim
+        for token in _TOKEN_RE.findall(text.lower()):
+            h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            vec[h % self.dim] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def embed_query(self, text: str) -> list:
+        _maybe_fail(self.failure_rate, "embedding")
+        _sleep_for(self.latency)
+        self.calls += 1
+        return self._embed(text)
+
+    def embed_documents(self, texts) -> list:
+        self._admit()
+        _sleep_for(self.latency)
+        self.calls += 1
+        return [self._embed(t) for t in texts]
+
+    async def aembed_query(self, text: str) -> list:
+        _maybe_fail(self.failure_rate, "embedding")
+        await _asleep_for(self.latency)
+        self.calls += 1
+        return self._embed(text)
+
+
+class FakeVectorStore:
+    """Brute-force cosine search over an in-memory list of texts."""
+
+    def __init__(self, embeddings, texts=None, init_latency=0.0):
+        _sleep_for(init_latency)
+        self.embeddings = embeddings
+        self._texts = []
+        self._vectors = []
+        if texts:
+            self.add_texts(texts)
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        texts = list(texts)
+        self._vectors.extend(self.embeddings.embed_documents(texts))
+        self._texts.extend(texts)
+
+    def add_embeddings(self, ids, texts, vectors, metadatas=None):
+        self._vectors.extend(list(v) for v in vectors)
+        self._texts.extend(texts)
+
+    def similarity_search(self, query: str, k: int = 4):
+        return self._top_k(self.embeddings.embed_query(query), k)
+
+    async def asimilarity_search(self, query: str, k: int = 4):
+        return self._top_k(await self.embeddings.aembed_query(query), k)
+
+    def similarity_search_by_vector(self, embedding, k: int = 4):
+        return self._top_k(embedding, k)
+
+    def _top_k(self, q, k):
+        scored = sorted(
+            range(len(self._texts)),
+            key=lambda i: -sum(a * b for a, b in zip(q, self._vectors[i]))
+        )
+        return [FakeDocument(self._texts[i]) for i in scored[:k]]
+
+
+def sample_corpus():
+    """Paragraphs of the bundled HR knowledge base, or a tiny built-in set."""
+    from pathlib import Path
+
+    data_dir = Path(__file__).resolve().parent.parent / "data" / "hr_knowledge"
+    paragraphs = []
+    for path in sorted(data_dir.glob("*.txt")):
+        text = path.read_text(encoding="utf-8")
+        paragraphs.extend(p.strip() for p in text.split("\n\n") if p.strip())
+    return paragraphs or [
+        "Employees receive 20 days of annual leave per year.",
+        "The probation period for new hires is six months.",
+        "Resignations require a notice period of 30 days."
+    ]
+
+
+def install_fakes(llm_latency=0.0, embed_latency=0.0, init_latency=0.0, texts=None,
+                  chunk_latency=0.0, failure_rate=0.0):
+    """
+    Point the registry at local stand-ins; latencies may be samplers.
+
+    The LLM response cache and the question bank are swapped for in-memory
+    ones, so canned fake replies never reach the persistent stores that
+    real runs read.
+    """
+    from core import config, llm_cache, question_bank, registry
+
+    llm_cache.set_cache(llm_cache.LLMCache(
+        path=None,
+        memory_entries=config.LLM_CACHE_MEMORY_ENTRIES,
+        ttl_seconds=config.LLM_CACHE_TTL_SECONDS
+    ))
+    question_bank.set_bank(question_bank.QuestionBank(
+        path=None,
+        threshold=config.QUESTION_BANK_SIMILARITY,
+        max_entries=config.QUESTION_BANK_MAX_ENTRIES
+    ))
+
+    corpus = texts if texts is not None else sample_corpus()
+    registry.configure(
+        embeddings=lambda: FakeEmbeddings(
+            latency=embed_latency, init_latency=init_latency, failure_rate=failure_rate
+        ),
+        vector_store=lambda emb: FakeVectorStore(emb, corpus, init_latency=init_latency),
+        llm=lambda model, temperature: FakeLLM(
+            model_name=model,
+            temperature=temperature,
+            latency=llm_latency,
+            init_latency=init_latency,
+            chunk_latency=chunk_latency,
+            failure_rate=failure_rate
+        )
+    )
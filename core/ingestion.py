@@ -0,0 +1,304 @@
+"""
+Resume document ingestion (PDF, DOCX, TXT).
+
+Sources are file paths, directories (walked for supported files) or
+uploaded `(name, bytes)` pairs. Extracted text is normalized and cached
+under `config.CACHE_DIR/extracted`, keyed on the SHA-256 of the file
+content, so ingesting the same document again costs one hash. Cache misses
+are extracted on a process pool once there are enough of them to pay for
+starting one; results come back in input order with a bounded number in
+flight.
+
+`screen_documents` feeds the extracted text into batch resume screening.
+"""
+
+import hashlib
+import io
+import os
+import re
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from core import config
+
+SUPPORTED_SUFFIXES = (".pdf", ".docx", ".txt")
+EXTRACTOR_VERSION = 1
+
+# Below this many cache misses, extracting in-process beats starting a pool
+PROCESS_POOL_MIN_FILES = 8
+
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n(\w)")
+_SPACES_RE = re.compile(r"[ \t\f\v ]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f]")
+_BULLETS_RE = re.compile(r"^[•●▪‣⁃◦\-\*]\s+", re.M)
+
+
+# =================================================
+# Text extraction
+# =================================================
+def normalize_text(text: str) -> str:
+    """NFKC-fold, rejoin hyphenated line breaks and squeeze whitespace."""
+    text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _CONTROL_RE.sub("", text)
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+    text = _BULLETS_RE.sub("", text)
+    lines = [_SPACES_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def _extract_pdf(data: bytes) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _extract_docx(data: bytes) -> str:
+    import docx
+
+    document = docx.Document(io.BytesIO(data))
+    parts = [p.text for p in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            parts.append(" | ".join(cell.text for cell in row.cells))
+    return "\n".join(parts)
+
+
+def _extract_txt(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+_EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".docx": _extract_docx,
+    ".txt": _extract_txt,
+}
+
+
+def extract_text(name: str, data: bytes) -> str:
+    """Normalized text of one document; the format is taken from `name`."""
+    suffix = Path(name).suffix.lower()
+    extractor = _EXTRACTORS.get(suffix)
+    if extractor is None:
+        raise ValueError(f"Unsupported file type: {suffix or name}")
+    return normalize_text(extractor(data))
+
+
+# =================================================
+# Content-hash cache
+# =================================================
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cache_path(cache_dir: Path, digest: str) -> Path:
+    return cache_dir / digest[:2] / f"{digest}.v{EXTRACTOR_VERSION}.txt"
+
+
+def _cache_get(cache_dir: Path, digest: str):
+    try:
+        return _cache_path(cache_dir, digest).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def _cache_put(cache_dir: Path, digest: str, text: str):
+    path = _cache_path(cache_dir, digest)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        tmp_path.replace(path)
+    except OSError:
+        pass
+
+
+def _extract_job(name: str, path, data, digest: str, cache_dir):
+    """Worker entry point: extract (reading `path` if no bytes) and cache."""
+    try:
+        if data is None:
+            data = Path(path).read_bytes()
+        text = extract_text(name, data)
+    except Exception as e:  # corrupt or unreadable documents are reported, not fatal
+        return None, f"{type(e).__name__}: {e}"
+    # A file rewritten since it was hashed must not be cached under the old hash
+    if cache_dir is not None and _digest(data) == digest:
+        _cache_put(Path(cache_dir), digest, text)
+    return text, None
+
+
+# =================================================
+# Ingestion
+# =================================================
+def walk(directory, recursive: bool = True) -> list:
+    """Supported documents under `directory`, sorted by path."""
+    root = Path(directory)
+    pattern = "**/*" if recursive else "*"
+    return sorted(
+        p for p in root.glob(pattern)
+        if p.is_file() and p.suffix.lower() in SUPPORTED_SUFFIXES
+    )
+
+
+def _expand(sources) -> list:
+    """Paths and (name, bytes) uploads; directories are walked."""
+    items = []
+    for source in sources:
+        if isinstance(source, tuple):
+            items.append(source)
+        elif Path(source).is_dir():
+            items.extend(walk(source))
+        else:
+            items.append(Path(source))
+    return items
+
+
+def _document(name, digest, text, cached, error=None) -> dict:
+    return {
+        "name": name,
+        "sha256": digest,
+        "text": text,
+        "cached": cached,
+        "error": error
+    }
+
+
+def ingest(sources, workers: int = None, use_cache: bool = True):
+    """
+    Extract text from resume documents; yields one dict per document in
+    input order: name, sha256, text, cached, error.
+
+    Args:
+        sources: file paths, directories and/or (name, bytes) uploads
+        workers: extraction processes (default `config.INGEST_WORKERS`);
+            0 extracts in-process
+    """
+    items = _expand(sources)
+    workers = config.INGEST_WORKERS if workers is None else max(workers, 0)
+    cache_dir = Path(config.CACHE_DIR) / "extracted" if use_cache else None
+
+    # -----------------------------
+    # Cache lookup by content hash
+    # -----------------------------
+    jobs = []
+    for item in items:
+        if isinstance(item, tuple):
+            name, data = item
+            path = None
+        else:
+            name, path = str(item), item
+            try:
+                data = Path(path).read_bytes()
+            except OSError as e:
+                jobs.append((name, None, None, None, f"{type(e).__name__}: {e}"))
+                continue
+
+        digest = _digest(data)
+        text = _cache_get(cache_dir, digest) if cache_dir is not None else None
+        # File bytes are dropped here; a worker rereads the file itself
+        jobs.append((name, path, data if path is None else None, digest, text))
+
+    misses = [i for i, job in enumerate(jobs) if job[3] is not None and job[4] is None]
+    if workers and len(misses) >= PROCESS_POOL_MIN_FILES:
+        return _ingest_pooled(jobs, misses, workers, cache_dir)
+    return _ingest_inline(jobs, cache_dir)
+
+
+def _ingest_inline(jobs, cache_dir):
+    for name, path, data, digest, text in jobs:
+        if digest is None:
+            yield _document(name, None, None, False, error=text)
+        elif text is not None:
+            yield _document(name, digest, text, True)
+        else:
+            text, error = _extract_job(name, path, data, digest, cache_dir)
+            yield _document(name, digest, text, False, error)
+
+
+def _ingest_pooled(jobs, misses, workers, cache_dir):
+    window = workers * 4
+    cache_arg = str(cache_dir) if cache_dir is not None else None
+    pending = {}
+    ready = {}
+    next_miss = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, (name, path, data, digest, text) in enumerate(jobs):
+            if digest is None:
+                yield _document(name, None, None, False, error=text)
+                continue
+            if text is not None:
+                yield _document(name, digest, text, True)
+                continue
+
+            # Keep the pool busy with up to `window` misses ahead of this one
+            while next_miss < len(misses) and len(pending) + len(ready) < window:
+                j = misses[next_miss]
+                n, p, d, h, _ = jobs[j]
+                pending[pool.submit(_extract_job, n, p, d, h, cache_arg)] = j
+                next_miss += 1
+
+            while i not in ready:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for future in done:
+                    ready[pending.pop(future)] = future.result()
+
+            text, error = ready.pop(i)
+            yield _document(name, digest, text, False, error)
+
+
+def screen_documents(sources, job_description: str, explain_top_k: int = 5,
+                     workers: int = None, use_cache: bool = True, explain: str = "inline",
+                     add_to_pool: bool = False) -> dict:
+    """
+    Ingest resume documents and screen them against one job description.
+
+    Returns ranked screening results (each with the document `name`) plus
+    the documents that could not be read. `explain` is passed on to
+    `run_resume_screening_batch`. With `add_to_pool` the readable documents
+    are also added to the candidate pool (`core.resume_store`) under their
+    names, for later `candidate_search` requests.
+    """
+    from core.tools.resume_tool import run_resume_screening_batch
+
+    if not job_description:
+        return {"error": "Job Description required."}
+
+    names, texts, failed = [], [], []
+    for document in ingest(sources, workers=workers, use_cache=use_cache):
+        if document["error"] or not document["text"]:
+            failed.append({"name": document["name"], "error": document["error"] or "No text found"})
+        else:
+            names.append(document["name"])
+            texts.append(document["text"])
+
+    if not texts:
+        return {"error": "No readable resumes found.", "failed": failed}
+
+    try:
+        ranked = run_resume_screening_batch(
+            texts, job_description, explain_top_k=explain_top_k, use_cache=use_cache, explain=explain
+        )
+    except ValueError as e:
+        return {"error": str(e), "failed": failed}
+
+    results = []
+    for result in ranked:
+        result["name"] = names[result["index"]]
+        results.append(result)
+
+    reasoning = [
+        f"Extracted text from {len(texts)} documents ({len(failed)} unreadable)",
+        "Ranked candidates by skill match percentage",
+        "Generated LLM explanations for the top candidates only"
+    ]
+    if add_to_pool:
+        from core.resume_store import add_candidates
+
+        pooled = add_candidates({"id": n, "resume_text": t} for n, t in zip(names, texts))
+        reasoning.append(f"Added {len(pooled['added'])} candidates to the pool ({pooled['pool_size']} total)")
+
+    return {"results": results, "failed": failed, "reasoning": reasoning}
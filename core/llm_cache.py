@@ -0,0 +1,289 @@
+"""
+LLM response cache.
+
+Entries are keyed on a hash of (model, temperature, prompt) and live in an
+in-memory LRU in front of an on-disk SQLite tier. Both tiers honour a TTL;
+the disk tier is additionally capped at a maximum number of entries.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from core import call_policy, config, tracing
+from core.concurrency import acquire_slot, allm_slot, hold_while_open, llm_slot
+
+_TRIM_EVERY = 256
+
+
+def _llm_identity(llm):
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", "") or type(llm).__name__
+    temperature = getattr(llm, "temperature", None)
+    return str(model), temperature
+
+
+def model_name(llm) -> str:
+    return _llm_identity(llm)[0]
+
+
+def make_key(model: str, temperature, prompt: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, repr(temperature), prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def key_for(llm, prompt: str) -> str:
+    model, temperature = _llm_identity(llm)
+    return make_key(model, temperature, prompt)
+
+
+class LLMCache:
+    """Two-tier (memory LRU + SQLite) cache of completion text."""
+
+    def __init__(self, path=None, memory_entries=512, max_entries=50000, ttl_seconds=None):
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expired": 0
+        }
+
+        self._db = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+            self._db.commit()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created > self.ttl_seconds
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self._expired(created, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created = row
+                    if not self._expired(created, now):
+                        self._db.execute(
+                            "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+                        )
+                        self._db.commit()
+                        self._remember(key, value, created)
+                        self._stats["disk_hits"] += 1
+                        return value
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._stats["expired"] += 1
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._stats["writes"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, created, accessed) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                self._db.commit()
+                self._puts += 1
+                if self._puts % _TRIM_EVERY == 0:
+                    self._trim(now)
+
+    def _remember(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _trim(self, now):
+        if self.ttl_seconds is not None:
+            cur = self._db.execute(
+                "DELETE FROM entries WHERE created < ?", (now - self.ttl_seconds,)
+            )
+            self._stats["expired"] += cur.rowcount
+        (count,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (overflow,)
+            )
+            self._stats["evictions"] += overflow
+        self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["memory_entries"] = len(self._memory)
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(
+                    path=config.CACHE_DIR / "llm_cache.sqlite",
+                    memory_entries=config.LLM_CACHE_MEMORY_ENTRIES,
+                    max_entries=config.LLM_CACHE_MAX_ENTRIES,
+                    ttl_seconds=config.LLM_CACHE_TTL_SECONDS
+                )
+    return _cache
+
+
+def set_cache(cache):
+    """Install a specific cache instance (None restores the lazy default)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def lookup(llm, prompt: str):
+    """Cached completion for (llm, prompt), or None (also when caching is off)."""
+    if not config.LLM_CACHE_ENABLED:
+        return None
+    return get_cache().get(key_for(llm, prompt))
+
+
+def store(llm, prompt: str, content: str):
+    if config.LLM_CACHE_ENABLED:
+        get_cache().put(key_for(llm, prompt), content)
+
+
+def cached_invoke(llm, prompt: str, use_cache: bool = True) -> str:
+    """
+    `llm.invoke(prompt).content`, served from the cache when possible.
+
+    Pass `use_cache=False` for calls where a fresh completion matters; the
+    fresh result still refreshes the cache for later callers.
+    """
+    if use_cache:
+        hit = lookup(llm, prompt)
+        if hit is not None:
+            tracing.event("llm.cache_hit")
+            return hit
+
+    with llm_slot():
+        with tracing.span("llm", model=model_name(llm), prompt_chars=len(prompt)) as span:
+            message = call_policy.policy("llm").call(llm.invoke, prompt)
+            span.set(**tracing.usage(message))
+    content = message.content
+    store(llm, prompt, content)
+    return content
+
+
+async def acached_invoke(llm, prompt: str, use_cache: bool = True) -> str:
+    """Async counterpart of `cached_invoke` built on `llm.ainvoke`."""
+    if use_cache:
+        hit = lookup(llm, prompt)
+        if hit is not None:
+            tracing.event("llm.cache_hit")
+            return hit
+
+    async with allm_slot():
+        with tracing.span("llm", model=model_name(llm), prompt_chars=len(prompt)) as span:
+            message = await call_policy.policy("llm").acall(llm.ainvoke, prompt)
+            span.set(**tracing.usage(message))
+    content = message.content
+    store(llm, prompt, content)
+    return content
+
+
+def cached_stream(llm, prompt: str, use_cache: bool = True):
+    """
+    Streaming counterpart of `cached_invoke`: yields text chunks as the
+    model produces them. A cached completion is yielded as one chunk. The
+    full text is cached only if the stream ran to completion.
+
+    Upstream calls go through `call_policy` and raise `UpstreamUnavailable`
+    on a missed deadline or an open circuit.
+    """
+    if use_cache:
+        hit = lookup(llm, prompt)
+        if hit is not None:
+            tracing.event("llm.cache_hit")
+            yield hit
+            return
+
+    if not hasattr(llm, "stream"):
+        content = cached_invoke(llm, prompt, use_cache=False)
+        yield content
+        return
+
+    parts = []
+    # The slot goes back when the upstream stream ends (on the thread reading
+    # it), not when the caller stops iterating this generator.
+    slot = acquire_slot()
+    try:
+        with tracing.span("llm.stream", model=model_name(llm), prompt_chars=len(prompt)) as span:
+            stream = call_policy.policy("llm").stream(hold_while_open(slot, llm.stream), prompt)
+            try:
+                for chunk in stream:
+                    if chunk.content:
+                        if not parts:
+                            span.mark("first_chunk_ms")
+                        parts.append(chunk.content)
+                        yield chunk.content
+                    span.set(**tracing.usage(chunk))
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+    finally:
+        slot.release()  # no-op unless the call failed before the stream opened
+    store(llm, prompt, "".join(parts))
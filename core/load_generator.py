@@ -0,0 +1,429 @@
+"""
+Open-loop load generator for the agent.
+
+Replays a JSONL mix of `{"intent": ..., "payload": {...}}` records (the
+batch runner's input format) round-robin at a fixed or linearly ramping
+request rate against one agent path:
+
+- "sync": `run_agent` on a pool of `concurrency` threads, like Streamlit
+  sessions or batch workers sharing one process
+- "async": `arun_agent` on one event loop (at most `concurrency` in flight
+  when set)
+- "stream": `stream_agent` on the thread pool; the time to the first event
+  is reported next to the full latency
+- "http": POST /v1/<intent> to a running serve.py at `target`, one
+  keep-alive connection per pool thread; any status but 200 is an error
+
+Arrivals follow the schedule whether or not earlier requests have
+finished, and latency is measured from each request's scheduled start.
+A saturated agent therefore shows up as growing latency, not as a
+generator that quietly slows down (coordinated omission).
+
+`run_load` returns a JSON-safe report: throughput, error rate and latency
+percentiles (log-linear histograms, see `tracing.Histogram`) overall and
+per intent, a per-second timeline, and the call-policy and coalescing
+counters. `compare` lines two reports up.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+
+from core import tracing
+from core.batch_runner import _parse
+
+REPORT_VERSION = 1
+MODES = ("sync", "async", "stream", "http")
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+# =================================================
+# Workload
+# =================================================
+def load_mix(path) -> list:
+    """`(intent, payload)` pairs of a JSONL request file; raises ValueError on bad lines."""
+    mix = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            parsed, error = _parse(line)
+            if error:
+                raise ValueError(f"{path}:{line_no}: {error}")
+            intent, payload, _ = parsed
+            mix.append((intent, payload))
+    if not mix:
+        raise ValueError(f"{path} contains no requests")
+    return mix
+
+
+def arrival_times(qps: float, duration: float, ramp_to: float = None,
+                  poisson: bool = False, seed: int = 0) -> list:
+    """
+    Offsets in seconds of every request in a run of `duration` seconds.
+
+    The rate is `qps` throughout, or changes linearly from `qps` to
+    `ramp_to`. Arrivals are evenly spaced, or a Poisson process with that
+    rate when `poisson` is set.
+    """
+    end_qps = qps if ramp_to is None else ramp_to
+    if qps < 0 or end_qps < 0 or duration <= 0:
+        raise ValueError("Rates must be non-negative and the duration positive")
+
+    # Expected arrivals by time t: qps * t + slope * t^2, inverted per arrival
+    slope = (end_qps - qps) / (2 * duration)
+    total = qps * duration + slope * duration ** 2
+
+    def _offset(n):
+        if abs(slope) < 1e-12:
+            return n / qps
+        return (-qps + math.sqrt(qps * qps + 4 * slope * n)) / (2 * slope)
+
+    rng = random.Random(seed)
+    offsets = []
+    n = rng.expovariate(1.0) if poisson else 0.0
+    while n < total:
+        offsets.append(_offset(n))
+        n += rng.expovariate(1.0) if poisson else 1.0
+    return offsets
+
+
+# =================================================
+# Recording
+# =================================================
+def _latency(hist) -> dict:
+    summary = {"count": hist.count}
+    if hist.count:
+        summary["mean_ms"] = round(hist.total / hist.count * 1000, 3)
+        for q in PERCENTILES:
+            summary[f"p{q:g}_ms".replace(".", "_")] = round(hist.percentile(q) * 1000, 3)
+        summary["max_ms"] = round(hist.max * 1000, 3)
+    return summary
+
+
+class _Stats:
+    __slots__ = ("latency", "first_event", "errors", "error_kinds")
+
+    def __init__(self):
+        self.latency = tracing.Histogram()
+        self.first_event = tracing.Histogram()
+        self.errors = 0
+        self.error_kinds = {}
+
+    def record(self, seconds, error, first_event):
+        self.latency.record(seconds)
+        if first_event is not None:
+            self.first_event.record(first_event)
+        if error is not None:
+            self.errors += 1
+            kind = error[:80]
+            self.error_kinds[kind] = self.error_kinds.get(kind, 0) + 1
+
+    def report(self, seconds: float) -> dict:
+        count = self.latency.count
+        report = {
+            "requests": count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / seconds, 3) if seconds else 0.0,
+            "latency_ms": _latency(self.latency)
+        }
+        if self.first_event.count:
+            report["first_event_ms"] = _latency(self.first_event)
+        if self.error_kinds:
+            top = sorted(self.error_kinds.items(), key=lambda kv: -kv[1])[:5]
+            report["top_errors"] = dict(top)
+        return report
+
+
+class Recorder:
+    """Thread-safe per-intent and per-second outcome histograms."""
+
+    def __init__(self, warmup: float = 0.0):
+        self.warmup = warmup
+        self.overall = _Stats()
+        self.intents = {}
+        self.seconds = {}
+        self.skipped = 0
+        self.max_lag = 0.0
+        self._lock = threading.Lock()
+
+    def dispatched(self, lag: float):
+        with self._lock:
+            self.max_lag = max(self.max_lag, lag)
+
+    def record(self, intent: str, offset: float, seconds: float, error=None, first_event=None):
+        with self._lock:
+            if offset < self.warmup:
+                self.skipped += 1
+                return
+            self.overall.record(seconds, error, first_event)
+            self.intents.setdefault(intent, _Stats()).record(seconds, error, first_event)
+            self.seconds.setdefault(int(offset), _Stats()).record(seconds, error, None)
+
+    def timeline(self) -> list:
+        rows = []
+        for second in sorted(self.seconds):
+            stats = self.seconds[second]
+            rows.append({
+                "second": second,
+                "requests": stats.latency.count,
+                "errors": stats.errors,
+                "p50_ms": round(stats.latency.percentile(50) * 1000, 3),
+                "p99_ms": round(stats.latency.percentile(99) * 1000, 3)
+            })
+        return rows
+
+
+# =================================================
+# Drivers
+# =================================================
+def _error_of(result):
+    if isinstance(result, dict) and "error" in result:
+        return str(result["error"])
+    return None
+
+
+_http = threading.local()
+
+
+def _call_http(target: str, intent: str, payload: dict):
+    """Error of one POST /v1/<intent> over this thread's keep-alive connection."""
+    import http.client
+    from urllib.parse import urlsplit
+
+    connection = getattr(_http, "connection", None)
+    if connection is None:
+        url = urlsplit(target)
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=300)
+        _http.connection = connection
+    try:
+        connection.request(
+            "POST", f"/v1/{intent}", json.dumps(payload).encode("utf-8"),
+            {"Content-Type": "application/json"}
+        )
+        response = connection.getresponse()
+        body = response.read()
+    except (OSError, http.client.HTTPException) as e:
+        connection.close()
+        _http.connection = None
+        return f"{type(e).__name__}: {e}"
+    if response.status != 200:
+        return f"HTTP {response.status}"
+    return _error_of(json.loads(body))
+
+
+def _call_sync(intent: str, payload: dict, mode: str, started: float, target: str = None):
+    """`(error, first_event_seconds)` of one request on the calling thread."""
+    from core.agent import Intent, run_agent, stream_agent
+
+    if mode == "http":
+        return _call_http(target, intent, payload), None
+    if mode == "stream":
+        first_event = None
+        result = None
+        for event in stream_agent(Intent(intent), payload):
+            if first_event is None:
+                first_event = time.perf_counter() - started
+            if event["type"] == "result":
+                result = event["result"]
+        return _error_of(result), first_event
+    return _error_of(run_agent(Intent(intent), payload)), None
+
+
+def _drive_threads(schedule, mode, concurrency, recorder, progress, target=None):
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="load")
+    t0 = time.perf_counter()
+
+    def one(intent, payload, offset):
+        scheduled = t0 + offset
+        try:
+            error, first_event = _call_sync(intent, payload, mode, scheduled, target)
+        except Exception as e:
+            error, first_event = f"{type(e).__name__}: {e}", None
+        recorder.record(intent, offset, time.perf_counter() - scheduled, error, first_event)
+
+    try:
+        for n, (offset, intent, payload) in enumerate(schedule):
+            delay = t0 + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            recorder.dispatched(time.perf_counter() - t0 - offset)
+            pool.submit(one, intent, payload, offset)
+            if progress is not None:
+                progress(n + 1, len(schedule))
+    finally:
+        pool.shutdown(wait=True)
+    return time.perf_counter() - t0
+
+
+async def _drive_loop(schedule, concurrency, recorder, progress):
+    import asyncio
+
+    from core.agent import Intent, arun_agent
+
+    limit = asyncio.Semaphore(concurrency) if concurrency else None
+    t0 = time.perf_counter()
+
+    async def one(intent, payload, offset):
+        scheduled = t0 + offset
+        try:
+            if limit is None:
+                result = await arun_agent(Intent(intent), payload)
+            else:
+                async with limit:
+                    result = await arun_agent(Intent(intent), payload)
+            error = _error_of(result)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        recorder.record(intent, offset, time.perf_counter() - scheduled, error)
+
+    tasks = []
+    for n, (offset, intent, payload) in enumerate(schedule):
+        delay = t0 + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        recorder.dispatched(time.perf_counter() - t0 - offset)
+        tasks.append(asyncio.create_task(one(intent, payload, offset)))
+        if progress is not None:
+            progress(n + 1, len(schedule))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - t0
+
+
+def _install_fakes(fake: dict):
+    from core.fakes import install_fakes, lognormal_latency
+
+    llm_latency = fake.get("llm_latency", 0.0)
+    if fake.get("llm_p99") and llm_latency:
+        llm_latency = lognormal_latency(llm_latency, fake["llm_p99"], seed=fake.get("seed"))
+    install_fakes(
+        llm_latency=llm_latency,
+        embed_latency=fake.get("embed_latency", 0.0),
+        chunk_latency=fake.get("chunk_latency", 0.0),
+        failure_rate=fake.get("failure_rate", 0.0)
+    )
+
+
+# =================================================
+# Entry points
+# =================================================
+def run_load(mix, qps: float, duration: float, mode: str = "sync", ramp_to: float = None,
+             concurrency: int = 32, poisson: bool = False, warmup: float = 0.0,
+             fake: dict = None, seed: int = 0, target: str = None, progress=None) -> dict:
+    """
+    Replay `mix` (see `load_mix`) against the agent and return the report.
+
+    Args:
+        mode: "sync", "async", "stream" or "http" (see the module docstring)
+        ramp_to: final rate of a linear ramp starting at `qps`
+        concurrency: worker threads ("sync"/"stream"/"http") or the in-flight cap
+            ("async"; 0 for none)
+        warmup: requests scheduled in the first `warmup` seconds are run but
+            left out of the report
+        fake: run against local stand-ins: `llm_latency` (median when
+            `llm_p99` is given, for a lognormal distribution),
+            `embed_latency`, `chunk_latency` and `failure_rate`
+        target: base URL of the server for mode "http"
+        progress: optional callable(dispatched, total)
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    if mode == "http" and (not target or fake is not None):
+        raise ValueError('Mode "http" needs a target URL; start the server with --fake instead')
+    if fake is not None:
+        _install_fakes(fake)
+
+    from core import call_policy, singleflight
+
+    offsets = arrival_times(qps, duration, ramp_to, poisson, seed)
+    schedule = [(offset, *mix[n % len(mix)]) for n, offset in enumerate(offsets)]
+    recorder = Recorder(warmup)
+    call_policy.reset()
+    singleflight.reset()
+
+    started_at = time.time()
+    if mode == "async":
+        import asyncio
+
+        wall = asyncio.run(_drive_loop(schedule, concurrency, recorder, progress))
+    else:
+        wall = _drive_threads(schedule, mode, concurrency, recorder, progress, target)
+
+    measured = max(wall - warmup, 1e-9)
+    report = {
+        "version": REPORT_VERSION,
+        "started_at": round(started_at, 3),
+        "config": {
+            "mode": mode,
+            "qps": qps,
+            "ramp_to": ramp_to,
+            "duration_s": duration,
+            "concurrency": concurrency,
+            "poisson": poisson,
+            "warmup_s": warmup,
+            "mix_size": len(mix),
+            "fake": fake,
+            "target": target
+        },
+        "wall_seconds": round(wall, 3),
+        "offered": len(schedule) - recorder.skipped,
+        "offered_qps": round((len(schedule) - recorder.skipped) / max(duration - warmup, 1e-9), 3),
+        "overall": recorder.overall.report(measured),
+        "intents": {
+            intent: stats.report(measured) for intent, stats in sorted(recorder.intents.items())
+        },
+        "timeline": recorder.timeline(),
+        "generator": {"max_dispatch_lag_ms": round(recorder.max_lag * 1000, 3)},
+        "upstream": call_policy.stats(),
+        "singleflight": {k: v for k, v in singleflight.stats().items() if k != "by_intent"}
+    }
+    if mode == "http":
+        # The agent ran in the server process; report its view instead.
+        report["upstream"] = report["singleflight"] = None
+        report["server"] = _server_health(target)
+    return report
+
+
+def _server_health(target: str):
+    from urllib.request import urlopen
+
+    try:
+        with urlopen(target.rstrip("/") + "/health", timeout=10) as response:
+            return json.load(response)
+    except OSError as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+
+def save_report(report: dict, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def compare(baseline: dict, current: dict) -> list:
+    """
+    Rows `{"scope", "metric", "baseline", "current", "change"}` for the
+    overall and per-intent throughput, error rate and p50/p95/p99 of two
+    reports; `change` is relative (None when the baseline is 0).
+    """
+    scopes = [("overall", baseline.get("overall", {}), current.get("overall", {}))]
+    for intent in sorted(set(baseline.get("intents", {})) | set(current.get("intents", {}))):
+        scopes.append((intent, baseline["intents"].get(intent, {}), current["intents"].get(intent, {})))
+
+    rows = []
+    for scope, old, new in scopes:
+        for metric in ("throughput_rps", "error_rate", "p50_ms", "p95_ms", "p99_ms"):
+            source_old = old if metric in ("throughput_rps", "error_rate") else old.get("latency_ms", {})
+            source_new = new if metric in ("throughput_rps", "error_rate") else new.get("latency_ms", {})
+            before, after = source_old.get(metric), source_new.get(metric)
+            change = None
+            if before and after is not None:
+                change = round((after - before) / before, 4)
+            rows.append({"scope": scope, "metric": metric, "baseline": before,
+                         "current": after, "change": change})
+    return rows
@@ -0,0 +1,284 @@
+"""
+In-memory vector index backed by numpy.
+
+Embeddings are stored L2-normalized as one contiguous float32 matrix in
+`vectors.npy` and memory-mapped on load. Chunk text and metadata live in
+`records.jsonl` with a row offset table, so opening the index touches no
+text at all and a query only reads the rows it returns. Search is exact:
+a matrix-vector product followed by `argpartition` for the top k.
+
+Adding rows appends: the records go to the end of `records.jsonl` and the
+vectors into spare rows of `vectors.npy`, which is grown geometrically, so
+a build that flushes in batches stays linear in the number of chunks. The
+number of live rows is kept in `meta.json`, written last, so rows of an
+append that crashed halfway are ignored and overwritten by the next one.
+Replacing existing ids and deleting rewrite the files.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+
+import numpy as np
+from langchain_core.documents import Document
+
+VECTORS_FILE = "vectors.npy"
+RECORDS_FILE = "records.jsonl"
+OFFSETS_FILE = "offsets.npy"
+META_FILE = "meta.json"
+
+# Spare rows reserved when `vectors.npy` has to grow, as a share of its rows
+GROWTH_FACTOR = 2
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _write_meta(directory: str, rows: int):
+    tmp = os.path.join(directory, META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"rows": rows}, f)
+    os.replace(tmp, os.path.join(directory, META_FILE))
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+class NumpyVectorStore:
+    """Exact cosine-similarity search over a memory-mapped float32 matrix."""
+
+    def __init__(self, directory: str, embeddings):
+        self.directory = directory
+        self.embeddings = embeddings
+        self._load()
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        if os.path.exists(self._path(VECTORS_FILE)):
+            vectors = np.load(self._path(VECTORS_FILE), mmap_mode="r")
+            offsets = np.load(self._path(OFFSETS_FILE), mmap_mode="r")
+            rows = self._stored_rows(vectors)
+            self._capacity = vectors.shape[0]
+            self._vectors = vectors[:rows]
+            self._offsets = offsets[:rows + 1]
+        else:
+            self._capacity = 0
+            self._vectors = np.empty((0, 0), dtype=np.float32)
+            self._offsets = np.zeros(1, dtype=np.int64)
+        self._ids = None
+
+    def _stored_rows(self, vectors) -> int:
+        try:
+            with open(self._path(META_FILE), "r", encoding="utf-8") as f:
+                return int(json.load(f)["rows"])
+        except FileNotFoundError:
+            return vectors.shape[0]
+
+
+    def _read_records(self, rows) -> list:
+        records = []
+        with open(self._path(RECORDS_FILE), "rb") as f:
+            for row in rows:
+                f.seek(int(self._offsets[row]))
+                records.append(json.loads(f.readline()))
+        return records
+
+    def _all_records(self) -> list:
+        if not len(self):
+            return []
+        with open(self._path(RECORDS_FILE), "rb") as f:
+            return [json.loads(f.readline()) for _ in range(len(self))]
+
+    def _row_of_id(self) -> dict:
+        # Built on the first write of the process, then kept up to date by `_append`
+        if self._ids is None:
+            self._ids = {r["id"]: row for row, r in enumerate(self._all_records())}
+        return self._ids
+
+    @classmethod
+    def write(cls, directory: str, vectors, records):
+        """
+        Write an index from precomputed vectors.
+
+        `records` is a list of {"id", "text", "metadata"} dicts aligned with
+        the rows of `vectors`.
+        """
+        os.makedirs(directory, exist_ok=True)
+        matrix = _normalize(vectors) if len(records) else np.empty((0, 0), dtype=np.float32)
+
+        offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        tmp_records = os.path.join(directory, RECORDS_FILE + ".tmp")
+        with open(tmp_records, "wb") as f:
+            for i, record in enumerate(records):
+                line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                f.write(line)
+                offsets[i + 1] = offsets[i] + len(line)
+
+        for name, array in ((VECTORS_FILE, matrix), (OFFSETS_FILE, offsets)):
+            tmp = os.path.join(directory, name + ".tmp.npy")
+            np.save(tmp, array)
+            os.replace(tmp, os.path.join(directory, name))
+        os.replace(tmp_records, os.path.join(directory, RECORDS_FILE))
+        _write_meta(directory, len(records))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    # -----------------------------
+    # Write path
+    # -----------------------------
+    def _rewrite(self, vectors, records):
+        # Release the memory map before the files are replaced
+        self._vectors = None
+        self.write(self.directory, vectors, records)
+        self._load()
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [f"{len(self) + i}" for i in range(len(texts))]
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        return self.add_embeddings(ids, texts, vectors, metadatas)
+
+    def add_embeddings(self, ids, texts, vectors, metadatas=None):
+        """Insert or replace rows with precomputed embeddings."""
+        metadatas = metadatas or [{} for _ in texts]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(ids):
+            return []
+        replaced = set(ids)
+        if not len(self) or not replaced & self._row_of_id().keys():
+            self._append(ids, texts, vectors, metadatas)
+            return list(ids)
+
+        records = self._all_records()
+        keep = [i for i, r in enumerate(records) if r["id"] not in replaced]
+        new_records = [records[i] for i in keep] + [
+            {"id": i, "text": t, "metadata": m} for i, t, m in zip(ids, texts, metadatas)
+        ]
+
+        old = np.asarray(self._vectors[keep]) if keep else np.empty((0, vectors.shape[1]), np.float32)
+        self._rewrite(np.vstack([old, vectors]), new_records)
+        return list(ids)
+
+    def _append(self, ids, texts, vectors, metadatas):
+        rows, count = len(self), len(ids)
+        dim = vectors.shape[1]
+        if rows + count > self._capacity or (not rows and self._vectors.shape[1] != dim):
+            self._grow(max(rows + count, GROWTH_FACTOR * self._capacity), dim)
+
+        offsets = [int(self._offsets[rows])]
+        with open(self._path(RECORDS_FILE), "r+b") as f:
+            # Drop whatever an append that crashed before updating meta.json left behind
+            f.truncate(offsets[0])
+            f.seek(offsets[0])
+            for i, t, m in zip(ids, texts, metadatas):
+                record = {"id": i, "text": t, "metadata": m}
+                line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+
+        matrix = np.load(self._path(VECTORS_FILE), mmap_mode="r+")
+        matrix[rows:rows + count] = _normalize(vectors)
+        matrix.flush()
+        table = np.load(self._path(OFFSETS_FILE), mmap_mode="r+")
+        table[rows:rows + count + 1] = offsets
+        table.flush()
+        del matrix, table
+
+        known = self._row_of_id()
+        _write_meta(self.directory, rows + count)
+        self._load()
+        self._ids = known
+        known.update((i, rows + n) for n, i in enumerate(ids))
+
+    def _grow(self, capacity: int, dim: int):
+        """Copy the live rows into files with room for `capacity` rows."""
+        rows = len(self)
+        os.makedirs(self.directory, exist_ok=True)
+        known = self._ids
+        for name, shape, dtype, live in (
+            (VECTORS_FILE, (capacity, dim), np.float32, self._vectors),
+            (OFFSETS_FILE, (capacity + 1,), np.int64, self._offsets),
+        ):
+            tmp = self._path(name + ".tmp.npy")
+            grown = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+            if rows:
+                grown[:len(live)] = live
+            grown.flush()
+            del grown
+            os.replace(tmp, self._path(name))
+        if not rows:
+            open(self._path(RECORDS_FILE), "wb").close()
+        self._vectors = None
+        self._load()
+        self._ids = known
+
+    def delete(self, ids=None):
+        if not ids:
+            return
+        removed = set(ids)
+        records = self._all_records()
+        keep = [i for i, r in enumerate(records) if r["id"] not in removed]
+        if len(keep) == len(records):
+            return
+        self._rewrite(np.asarray(self._vectors[keep]), [records[i] for i in keep])
+
+    def delete_collection(self):
+        self._vectors = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._load()
+
+    # -----------------------------
+    # Read path
+    # -----------------------------
+    def _documents(self, rows) -> list:
+        return [
+            Document(page_content=r["text"], metadata=r.get("metadata") or {})
+            for r in self._read_records(rows)
+        ]
+
+    def similarity_search_by_vector(self, embedding, k: int = 4):
+        if not len(self):
+            return []
+        query = _normalize(np.asarray(embedding, dtype=np.float32)[None, :])[0]
+        return self._documents(_top_k(self._vectors @ query, k))
+
+    def similarity_search(self, query: str, k: int = 4):
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+
+    async def asimilarity_search(self, query: str, k: int = 4):
+        if hasattr(self.embeddings, "aembed_query"):
+            embedding = await self.embeddings.aembed_query(query)
+        else:
+            embedding = await asyncio.to_thread(self.embeddings.embed_query, query)
+        return self.similarity_search_by_vector(embedding, k)
+
+    def similarity_search_many(self, queries, k: int = 4) -> list:
+        """Answer several queries with one embedding call and one matmul."""
+        queries = list(queries)
+        if not queries:
+            return []
+        if not len(self):
+            return [[] for _ in queries]
+        matrix = _normalize(self.embeddings.embed_documents(queries))
+        scores = matrix @ self._vectors.T
+        return [self._documents(_top_k(row, k)) for row in scores]
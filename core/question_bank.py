@@ -0,0 +1,364 @@
+"""
+Interview question bank keyed by (job description fingerprint, role level).
+
+Job descriptions are fingerprinted with MinHash over word 3-shingles
+(`NUM_PERM` permutations). Fingerprints are indexed by locality-sensitive
+hashing (`BANDS` bands of `ROWS` rows, so pairs above roughly 0.7 Jaccard
+similarity collide with high probability), and a new description reuses
+the fingerprint of an earlier one when their estimated Jaccard similarity
+reaches `config.QUESTION_BANK_SIMILARITY` and both name the same skills
+from the skill dictionary. Postings that differ only in location or a line
+of boilerplate therefore share one entry, found without an embedding call,
+while descriptions that share boilerplate but ask for other skills do not.
+
+Entries live in SQLite next to the LLM cache, so the warmup script
+(`warm_question_bank.py`) and the app share them; fingerprints added by
+another process are picked up on the next lookup. Each entry records the
+knowledge-base and prompt version it was generated with
+(`current_version()`) and is only served while both are unchanged; entries
+of other versions are dropped on the next store, and the oldest entries
+beyond `config.QUESTION_BANK_MAX_ENTRIES` are evicted.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from core import config, tracing
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+SEED = 1729
+
+_PRIME = (1 << 31) - 1
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_rng = np.random.RandomState(SEED)
+_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+
+
+# =================================================
+# MinHash
+# =================================================
+def shingles(text: str) -> set:
+    """Word `SHINGLE_WORDS`-grams of the lowercased alphanumeric tokens."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) <= SHINGLE_WORDS:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)}
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature (`NUM_PERM` uint64 values) of the shingle set."""
+    hashes = np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+            for s in shingles(text)
+        ),
+        dtype=np.uint64
+    ) % np.uint64(_PRIME)
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % np.uint64(_PRIME)).min(axis=1)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(a == b))
+
+
+def _bands(sig: np.ndarray):
+    for band in range(BANDS):
+        yield band, sig[band * ROWS:(band + 1) * ROWS].tobytes()
+
+
+def _skills(text: str) -> list:
+    from core.skills import get_matcher
+
+    return sorted(get_matcher().extract(text))
+
+
+def current_version() -> str:
+    """Knowledge-base and prompt version that banked questions must match."""
+    from core.tools.interview_generator import PROMPT_VERSION
+    from core.vector_store import corpus_version
+
+    return f"{corpus_version()}:{PROMPT_VERSION}"
+
+
+class Match:
+    """A job description resolved to a bank fingerprint."""
+
+    __slots__ = ("fingerprint", "similarity", "signature", "skills", "known", "version")
+
+    def __init__(self, fingerprint, similarity, signature, skills, known, version=""):
+        self.fingerprint = fingerprint
+        self.similarity = similarity  # to the matched fingerprint; 1.0 for a new one
+        self.signature = signature
+        self.skills = skills
+        self.known = known
+        self.version = version  # of the questions it may be served
+
+
+# =================================================
+# Bank
+# =================================================
+class QuestionBank:
+    """LSH index of job description fingerprints plus their banked questions."""
+
+    def __init__(self, path=None, threshold: float = 0.7, max_entries: int = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._signatures = {}  # fingerprint -> signature
+        self._skills = {}      # fingerprint -> sorted skill list
+        self._buckets = {}     # (band, bytes) -> {fingerprint}
+        self._loaded_rowid = 0
+        self._stats = {"hits": 0, "near_duplicate_hits": 0, "misses": 0, "stores": 0, "evicted": 0}
+
+        path = ":memory:" if path is None else str(path)
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "fingerprint TEXT PRIMARY KEY, signature BLOB NOT NULL, "
+            "skills TEXT NOT NULL, preview TEXT, created REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "fingerprint TEXT NOT NULL, role_level TEXT NOT NULL, result TEXT NOT NULL, "
+            "created REAL NOT NULL, version TEXT NOT NULL DEFAULT '', "
+            "PRIMARY KEY (fingerprint, role_level))"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(questions)")}
+        if "version" not in columns:
+            # Banks written before entries were versioned: their entries never match
+            self._db.execute("ALTER TABLE questions ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+        self._db.execute("CREATE INDEX IF NOT EXISTS questions_created ON questions (created)")
+        self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM questions").fetchone()
+        return count
+
+    def _index(self, fingerprint, sig, skills):
+        self._signatures[fingerprint] = sig
+        self._skills[fingerprint] = skills
+        for key in _bands(sig):
+            self._buckets.setdefault(key, set()).add(fingerprint)
+
+    def _sync(self):
+        """Index fingerprints written since the last sync (must hold `_lock`)."""
+        rows = self._db.execute(
+            "SELECT rowid, fingerprint, signature, skills FROM fingerprints WHERE rowid > ? ORDER BY rowid",
+            (self._loaded_rowid,)
+        ).fetchall()
+        for rowid, fingerprint, blob, skills in rows:
+            self._index(fingerprint, np.frombuffer(blob, dtype=np.uint64), json.loads(skills))
+            self._loaded_rowid = rowid
+
+    # -----------------------------
+    # Fingerprints
+    # -----------------------------
+    def match(self, job_description: str, version: str = "") -> Match:
+        """
+        The fingerprint of the closest known near-duplicate, or a new one;
+        `version` is the `current_version()` its questions are looked up and
+        stored under.
+        """
+        sig = signature(job_description)
+        skills = _skills(job_description)
+        with self._lock:
+            self._sync()
+            candidates = set()
+            for key in _bands(sig):
+                candidates |= self._buckets.get(key, set())
+
+            best, best_similarity = None, 0.0
+            for fingerprint in candidates:
+                if self._skills[fingerprint] != skills:
+                    continue
+                score = similarity(sig, self._signatures[fingerprint])
+                if (best is None or score > best_similarity
+                        or (score == best_similarity and fingerprint < best)):
+                    best, best_similarity = fingerprint, score
+
+        if best is not None and best_similarity >= self.threshold:
+            return Match(best, best_similarity, sig, skills, True, version)
+        fingerprint = hashlib.blake2b(sig.tobytes(), digest_size=8).hexdigest()
+        return Match(fingerprint, 1.0, sig, skills, False, version)
+
+    def register(self, match: Match, job_description: str = ""):
+        """Record a new fingerprint so later near-duplicates resolve to it."""
+        if match.known:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO fingerprints (fingerprint, signature, skills, preview, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (match.fingerprint, match.signature.tobytes(), json.dumps(match.skills),
+                 " ".join(job_description.split())[:120], time.time())
+            )
+            self._db.commit()
+            self._sync()
+        match.known = True
+
+    # -----------------------------
+    # Questions
+    # -----------------------------
+    def get(self, match: Match, role_level: str):
+        """Banked result for (fingerprint, role_level) of the match's version, or None."""
+        row = None
+        if match.known:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT result FROM questions WHERE fingerprint = ? AND role_level = ? AND version = ?",
+                    (match.fingerprint, role_level, match.version)
+                ).fetchone()
+        with self._lock:
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            if match.similarity < 1.0:
+                self._stats["near_duplicate_hits"] += 1
+        return json.loads(row[0])
+
+    def put(self, match: Match, role_level: str, result: dict, job_description: str = ""):
+        self.register(match, job_description)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO questions (fingerprint, role_level, result, created, version) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (match.fingerprint, role_level, json.dumps(result, ensure_ascii=False), time.time(),
+                 match.version)
+            )
+            self._evict(match.version)
+            self._db.commit()
+            self._stats["stores"] += 1
+
+    def _evict(self, version: str):
+        """Drop entries of other versions and the oldest beyond `max_entries` (must hold `_lock`)."""
+        evicted = self._db.execute("DELETE FROM questions WHERE version != ?", (version,)).rowcount
+        if self.max_entries is not None:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM questions").fetchone()
+            if count > self.max_entries:
+                evicted += self._db.execute(
+                    "DELETE FROM questions WHERE rowid IN "
+                    "(SELECT rowid FROM questions ORDER BY created LIMIT ?)",
+                    (count - self.max_entries,)
+                ).rowcount
+        self._stats["evicted"] += evicted
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM questions")
+            self._db.execute("DELETE FROM fingerprints")
+            self._db.commit()
+            self._signatures.clear()
+            self._skills.clear()
+            self._buckets.clear()
+            self._loaded_rowid = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM questions").fetchone()
+            return dict(self._stats, entries=entries, fingerprints=len(self._signatures))
+
+
+_bank = None
+_bank_lock = threading.Lock()
+
+
+def get_bank() -> QuestionBank:
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = QuestionBank(
+                    path=config.CACHE_DIR / "question_bank.sqlite",
+                    threshold=config.QUESTION_BANK_SIMILARITY,
+                    max_entries=config.QUESTION_BANK_MAX_ENTRIES
+                )
+    return _bank
+
+
+def set_bank(bank):
+    """Install a specific bank instance (None restores the lazy default)."""
+    global _bank
+    with _bank_lock:
+        _bank = bank
+
+
+# =================================================
+# Warmup
+# =================================================
+def warm(postings, role_levels=("Junior", "Mid", "Senior"), workers: int = 4,
+         refresh: bool = False, progress=None) -> dict:
+    """
+    Generate and bank questions for every (posting, role level) ahead of time.
+
+    `postings` is an iterable of `(posting_id, job_description)`. All
+    postings are fingerprinted first, so near-duplicates collapse onto one
+    fingerprint and cost one generation per role level. With `refresh`,
+    banked entries are regenerated. `progress` is an optional
+    callable(done, total).
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    from core.tools.interview_generator import generate_interview_questions
+
+    bank = get_bank()
+    version = current_version()
+    started = time.perf_counter()
+    summary = {"postings": 0, "fingerprints": 0, "near_duplicates": 0, "already_banked": 0,
+               "generated": 0, "failed": 0}
+
+    representatives = {}
+    with tracing.span("question_bank.fingerprint"):
+        for _, job_description in postings:
+            summary["postings"] += 1
+            match = bank.match(job_description, version)
+            if match.fingerprint in representatives:
+                summary["near_duplicates"] += 1
+                continue
+            bank.register(match, job_description)
+            representatives[match.fingerprint] = (match, job_description)
+    summary["fingerprints"] = len(representatives)
+
+    tasks = []
+    for match, job_description in representatives.values():
+        for role_level in role_levels:
+            if not refresh and bank.get(match, role_level) is not None:
+                summary["already_banked"] += 1
+            else:
+                tasks.append((job_description, role_level))
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = [
+            pool.submit(
+                tracing.propagate(generate_interview_questions), job_description, role_level,
+                use_cache=not refresh
+            )
+            for job_description, role_level in tasks
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                result = future.result()
+                summary["generated" if result.get("questions") else "failed"] += 1
+            except Exception:
+                summary["failed"] += 1
+            if progress is not None:
+                progress(done, len(tasks))
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
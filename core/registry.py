@@ -0,0 +1,149 @@
+"""
+Process-wide resource registry.
+
+The embedding client, the vector store and one LLM client per
+(model, temperature) are built lazily on first use and then shared by every
+tool call. Rebuilding `vector_db/` must be followed by
+`invalidate_vector_store()` so the next call reopens the fresh store.
+"""
+
+import threading
+
+from core import tracing
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+def _default_embeddings_factory():
+    import core.config
+
+    core.config.require_openai_key()
+    from langchain_openai import OpenAIEmbeddings
+    from core.vector_store import EMBEDDING_MODEL
+
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL)
+
+
+def _default_vector_store_factory(embeddings):
+    from core.vector_store import load_vector_store
+
+    return load_vector_store(embeddings=embeddings)
+
+
+def _default_llm_factory(model: str, temperature: float):
+    import core.config
+
+    core.config.require_openai_key()
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=model, temperature=temperature)
+
+
+_lock = threading.RLock()
+_factories = {
+    "embeddings": _default_embeddings_factory,
+    "vector_store": _default_vector_store_factory,
+    "llm": _default_llm_factory,
+}
+_embeddings = None
+_vector_store = None
+_vector_store_version = 0
+_llms = {}
+
+
+def configure(embeddings=None, vector_store=None, llm=None):
+    """
+    Replace resource factories (e.g. with local stand-ins).
+
+    Args:
+        embeddings: callable() -> embeddings client
+        vector_store: callable(embeddings) -> vector store
+        llm: callable(model, temperature) -> chat model
+
+    Cached instances are dropped so the new factories take effect.
+    """
+    with _lock:
+        if embeddings is not None:
+            _factories["embeddings"] = embeddings
+        if vector_store is not None:
+            _factories["vector_store"] = vector_store
+        if llm is not None:
+            _factories["llm"] = llm
+        reset()
+
+
+def reset():
+    """Drop every cached instance. Factories are kept."""
+    global _embeddings, _vector_store, _vector_store_version
+    with _lock:
+        _embeddings = None
+        _vector_store = None
+        _vector_store_version += 1
+        _llms.clear()
+
+
+def restore_defaults():
+    """Reinstate the OpenAI/Chroma factories and drop cached instances."""
+    configure(
+        embeddings=_default_embeddings_factory,
+        vector_store=_default_vector_store_factory,
+        llm=_default_llm_factory
+    )
+
+
+def get_embeddings():
+    global _embeddings
+    if _embeddings is None:
+        with _lock:
+            if _embeddings is None:
+                with tracing.span("registry.embeddings_init"):
+                    _embeddings = _factories["embeddings"]()
+    return _embeddings
+
+
+def get_vector_store():
+    global _vector_store
+    if _vector_store is None:
+        with _lock:
+            if _vector_store is None:
+                embeddings = get_embeddings()
+                with tracing.span("registry.vector_store_load"):
+                    _vector_store = _factories["vector_store"](embeddings)
+    return _vector_store
+
+
+def get_llm(model: str = DEFAULT_MODEL, temperature: float = 0.2):
+    key = (model, float(temperature))
+    llm = _llms.get(key)
+    if llm is None:
+        with _lock:
+            llm = _llms.get(key)
+            if llm is None:
+                with tracing.span("registry.llm_init", model=model):
+                    llm = _factories["llm"](model, temperature)
+                _llms[key] = llm
+    return llm
+
+
+def invalidate_vector_store():
+    """Forget the open vector store; call after `vector_db/` is rebuilt."""
+    global _vector_store, _vector_store_version
+    with _lock:
+        _vector_store = None
+        _vector_store_version += 1
+
+
+def vector_store_version() -> int:
+    """Monotonic counter bumped whenever the vector store is invalidated."""
+    return _vector_store_version
+
+
+def status() -> dict:
+    """Report which shared resources are already built (warm)."""
+    with _lock:
+        return {
+            "embeddings": _embeddings is not None,
+            "vector_store": _vector_store is not None,
+            "vector_store_version": _vector_store_version,
+            "llms": sorted(f"{m}@{t}" for m, t in _llms)
+        }
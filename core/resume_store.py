@@ -0,0 +1,441 @@
+"""
+Persistent pool of parsed candidates with an inverted skill index.
+
+Each skill owns a posting list of candidate rows stored as a compact
+uint32 array. Searching a job description sums the posting lists of its
+skills into one per-candidate match counter and ranks with
+`argpartition`, using the same `match_percentage` formula as
+`run_resume_screening`. Removal marks a row dead; dead rows are compacted
+away once they make up half of the pool. Memory is ~4 bytes per
+(candidate, skill) pair plus the candidate id table.
+
+On disk the pool is a snapshot (`index.json` + `postings.npz`) plus an
+append-only change log (`changes.jsonl`, one add or remove per line), so
+adding or removing candidates costs the size of the change, not of the
+pool. The log is folded into a new snapshot once it holds
+`config.RESUME_POOL_COMPACT_CHANGES` entries. Writers from several
+processes (batch workers, the server, the UI) serialize on an advisory
+file lock, and `get_store()` picks up their changes when the files move.
+"""
+
+import json
+import os
+import threading
+from array import array
+from contextlib import contextmanager
+
+import numpy as np
+
+from core import config
+from core.tools.resume_tool import recommendation_for, screening_skills, skill_match_percentage
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer only
+    fcntl = None
+
+_COMPACT_RATIO = 0.5
+_SNAPSHOT = "index.json"
+_POSTINGS = "postings.npz"
+_LOG = "changes.jsonl"
+_LOCK = "pool.lock"
+
+
+@contextmanager
+def _locked(directory: str, exclusive: bool = True):
+    """Advisory lock on a pool directory, shared with other processes."""
+    if not exclusive and not os.path.isdir(directory):
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, _LOCK), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _stat(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ResumeStore:
+    """Skill -> candidate posting lists over a pool of parsed resumes."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._skill_ids = {}
+        self._skills = []
+        self._postings = []
+        self._candidate_ids = []
+        self._rows = {}
+        self._alive = bytearray()
+        self._dead = 0
+        # Persistence: the directory this pool mirrors and how much of it is applied
+        self._directory = None
+        self._snapshot_stat = None
+        self._log_offset = 0
+        self._log_entries = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, candidate_id):
+        return candidate_id in self._rows
+
+    # -----------------------------
+    # Incremental updates
+    # -----------------------------
+    def add(self, candidate_id: str, resume_text: str = None, skills=None) -> set:
+        """Add (or replace) a candidate; returns the indexed skills."""
+        if skills is None:
+            skills = screening_skills(resume_text or "")
+        skills = {s for s in skills if s}
+
+        with self._lock:
+            if candidate_id in self._rows:
+                self.remove(candidate_id)
+
+            row = len(self._candidate_ids)
+            self._candidate_ids.append(candidate_id)
+            self._rows[candidate_id] = row
+            self._alive.append(1)
+
+            for skill in skills:
+                skill_id = self._skill_ids.get(skill)
+                if skill_id is None:
+                    skill_id = len(self._skills)
+                    self._skill_ids[skill] = skill_id
+                    self._skills.append(skill)
+                    self._postings.append(array("I"))
+                self._postings[skill_id].append(row)
+
+        return skills
+
+    def remove(self, candidate_id: str) -> bool:
+        with self._lock:
+            row = self._rows.pop(candidate_id, None)
+            if row is None:
+                return False
+            self._alive[row] = 0
+            self._dead += 1
+            if self._dead > _COMPACT_RATIO * len(self._candidate_ids):
+                self.compact()
+            return True
+
+    def compact(self):
+        """Drop dead rows and renumber the survivors."""
+        with self._lock:
+            alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+            new_row = np.cumsum(alive, dtype=np.int64) - 1
+
+            for skill_id, posting in enumerate(self._postings):
+                rows = np.frombuffer(posting, dtype=np.uint32)
+                kept = new_row[rows[alive[rows]]].astype(np.uint32)
+                self._postings[skill_id] = array("I", kept.tobytes())
+
+            self._candidate_ids = [c for c, a in zip(self._candidate_ids, alive) if a]
+            self._rows = {c: i for i, c in enumerate(self._candidate_ids)}
+            self._alive = bytearray(b"\x01" * len(self._candidate_ids))
+            self._dead = 0
+
+    # -----------------------------
+    # Search
+    # -----------------------------
+    def search(self, job_description: str, top_n: int = 10) -> list:
+        """Top candidates for a job description, best match first."""
+        jd_skills = screening_skills(job_description)
+
+        with self._lock:
+            counts = np.zeros(len(self._candidate_ids), dtype=np.uint16)
+            matched_by = []
+            for skill in jd_skills:
+                skill_id = self._skill_ids.get(skill)
+                if skill_id is not None:
+                    rows = np.frombuffer(self._postings[skill_id], dtype=np.uint32)
+                    counts[rows] += 1
+                    matched_by.append((skill, rows))
+
+            if self._dead:
+                counts[np.frombuffer(bytes(self._alive), dtype=np.uint8) == 0] = 0
+
+            candidates = np.flatnonzero(counts)
+            if top_n < len(candidates):
+                part = np.argpartition(-counts[candidates], top_n - 1)[:top_n]
+                candidates = candidates[part]
+            order = candidates[np.lexsort((candidates, -counts[candidates].astype(np.int64)))]
+
+            results = []
+            for rank, row in enumerate(order, start=1):
+                match_percentage = skill_match_percentage(int(counts[row]), len(jd_skills))
+                results.append({
+                    "rank": rank,
+                    "candidate_id": self._candidate_ids[row],
+                    "match_percentage": match_percentage,
+                    "recommendation": recommendation_for(match_percentage),
+                    "matched_skills": sorted(
+                        s for s, rows in matched_by
+                        if rows.size and _contains(rows, row)
+                    )
+                })
+            return results
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, directory=None):
+        """Write a full snapshot and start an empty change log."""
+        directory = str(directory or self._directory or config.RESUME_POOL_DIR)
+        with self._lock, _locked(directory):
+            self._write_snapshot(directory)
+
+    def _write_snapshot(self, directory: str):
+        self.compact()
+
+        lengths = np.array([len(p) for p in self._postings], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        flat = np.frombuffer(b"".join(p.tobytes() for p in self._postings), dtype=np.uint32)
+
+        tmp = os.path.join(directory, "postings.tmp.npz")
+        np.savez(tmp, postings=flat, offsets=offsets)
+        os.replace(tmp, os.path.join(directory, _POSTINGS))
+
+        tmp = os.path.join(directory, _SNAPSHOT + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"skills": self._skills, "candidates": self._candidate_ids}, f)
+        os.replace(tmp, os.path.join(directory, _SNAPSHOT))
+        # Everything logged so far is in the snapshot now
+        open(os.path.join(directory, _LOG), "wb").close()
+
+        self._directory = directory
+        self._snapshot_stat = _stat(os.path.join(directory, _SNAPSHOT))
+        self._log_offset = 0
+        self._log_entries = 0
+
+    @classmethod
+    def load(cls, directory=None) -> "ResumeStore":
+        """The pool in `directory`: its snapshot with the change log replayed."""
+        store = cls()
+        store._directory = str(directory or config.RESUME_POOL_DIR)
+        with _locked(store._directory, exclusive=False):
+            store._reload()
+        return store
+
+    def _reload(self):
+        """Rebuild from the snapshot and the whole log (must hold the file lock)."""
+        directory = self._directory
+        fresh = ResumeStore()
+        index_path = os.path.join(directory, _SNAPSHOT)
+        snapshot_stat = _stat(index_path)
+        if snapshot_stat is not None:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            arrays = np.load(os.path.join(directory, _POSTINGS))
+            flat, offsets = arrays["postings"], arrays["offsets"]
+
+            fresh._skills = index["skills"]
+            fresh._skill_ids = {s: i for i, s in enumerate(fresh._skills)}
+            fresh._postings = [
+                array("I", flat[offsets[i]:offsets[i + 1]].tobytes())
+                for i in range(len(fresh._skills))
+            ]
+            fresh._candidate_ids = index["candidates"]
+            fresh._rows = {c: i for i, c in enumerate(fresh._candidate_ids)}
+            fresh._alive = bytearray(b"\x01" * len(fresh._candidate_ids))
+
+        with self._lock:
+            for name in ("_skill_ids", "_skills", "_postings", "_candidate_ids", "_rows",
+                         "_alive", "_dead"):
+                setattr(self, name, getattr(fresh, name))
+            self._snapshot_stat = snapshot_stat
+            self._log_offset = 0
+            self._log_entries = 0
+            self._replay_log()
+
+    def _replay_log(self):
+        """Apply log entries past `_log_offset` (must hold both locks)."""
+        try:
+            with open(os.path.join(self._directory, _LOG), "rb") as f:
+                f.seek(self._log_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # A torn final line (writer killed mid-append) is left for later
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            self._apply(json.loads(line))
+            self._log_entries += 1
+        self._log_offset += len(complete)
+
+    def _apply(self, change: dict):
+        if change["op"] == "add":
+            self.add(change["id"], skills=change["skills"])
+        else:
+            self.remove(change["id"])
+
+    def refresh(self) -> bool:
+        """Pick up changes other processes made on disk; True if there were any."""
+        if self._directory is None:
+            return False
+        log_stat = _stat(os.path.join(self._directory, _LOG))
+        snapshot_stat = _stat(os.path.join(self._directory, _SNAPSHOT))
+        log_size = log_stat[1] if log_stat else 0
+        if snapshot_stat == self._snapshot_stat and log_size == self._log_offset:
+            return False
+
+        with self._lock, _locked(self._directory, exclusive=False):
+            self._sync()
+        return True
+
+    def _sync(self):
+        """Catch up with the files (must hold both locks)."""
+        snapshot_stat = _stat(os.path.join(self._directory, _SNAPSHOT))
+        log_stat = _stat(os.path.join(self._directory, _LOG))
+        if snapshot_stat != self._snapshot_stat or (log_stat and log_stat[1] < self._log_offset):
+            self._reload()
+        else:
+            self._replay_log()
+
+    def commit(self, changes, directory=None):
+        """
+        Apply `{"op": "add", "id", "skills"}` / `{"op": "remove", "id"}`
+        changes and append them to the change log, compacting it into a new
+        snapshot once it is long enough.
+        """
+        changes = list(changes)
+        if self._directory is None:
+            self._directory = str(directory or config.RESUME_POOL_DIR)
+        with self._lock, _locked(self._directory):
+            self._sync()
+            for change in changes:
+                self._apply(change)
+
+            if self._log_entries + len(changes) >= config.RESUME_POOL_COMPACT_CHANGES:
+                self._write_snapshot(self._directory)
+                return
+            data = b"".join(
+                (json.dumps(change, ensure_ascii=False) + "\n").encode("utf-8") for change in changes
+            )
+            log_path = os.path.join(self._directory, _LOG)
+            fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                # Drop a torn line left by a writer that died mid-append
+                os.ftruncate(fd, self._log_offset)
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._log_offset += len(data)
+            self._log_entries += len(changes)
+            if self._snapshot_stat is None:
+                self._snapshot_stat = _stat(os.path.join(self._directory, _SNAPSHOT))
+
+
+def _contains(sorted_rows: np.ndarray, row) -> bool:
+    i = np.searchsorted(sorted_rows, row)
+    return i < sorted_rows.size and sorted_rows[i] == row
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ResumeStore:
+    """Process-wide pool mirroring `config.RESUME_POOL_DIR`, refreshed from disk."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResumeStore.load()
+                return _store
+    _store.refresh()
+    return _store
+
+
+def add_candidates(candidates, save: bool = True) -> dict:
+    """
+    Add (or replace) candidates in the pool and persist it.
+
+    `candidates` is a list of `{"id": ..., "resume_text": ...}` records; a
+    record may give `"skills"` instead of the resume text.
+    """
+    candidates = list(candidates or [])
+    if not candidates:
+        return {"error": "Candidates required."}
+    for n, candidate in enumerate(candidates):
+        if not isinstance(candidate, dict) or candidate.get("id") in (None, ""):
+            return {"error": f"Candidate {n} has no id."}
+        if not candidate.get("resume_text") and not candidate.get("skills"):
+            return {"error": f"Candidate {candidate['id']} has no resume_text or skills."}
+
+    changes = []
+    for candidate in candidates:
+        skills = candidate.get("skills")
+        if skills is None:
+            skills = screening_skills(candidate.get("resume_text") or "")
+        skills = sorted({s for s in skills if s})
+        changes.append({"op": "add", "id": str(candidate["id"]), "skills": skills})
+
+    store = get_store()
+    if save:
+        store.commit(changes)
+    else:
+        for change in changes:
+            store.add(change["id"], skills=change["skills"])
+    added = [{"candidate_id": c["id"], "skills": c["skills"]} for c in changes]
+    return {
+        "added": added,
+        "pool_size": len(store),
+        "reasoning": [
+            f"Extracted skills from {len(added)} resumes",
+            "Appended candidates to the skill posting lists",
+            "Appended the changes to the pool's log" if save else "Kept the changes in memory"
+        ]
+    }
+
+
+def remove_candidates(candidate_ids, save: bool = True) -> dict:
+    """Drop candidates from the pool and persist it; unknown ids are reported."""
+    candidate_ids = [str(c) for c in candidate_ids or []]
+    if not candidate_ids:
+        return {"error": "Candidate ids required."}
+
+    store = get_store()
+    removed = [c for c in dict.fromkeys(candidate_ids) if c in store]
+    if save and removed:
+        store.commit({"op": "remove", "id": c} for c in removed)
+    else:
+        for candidate_id in removed:
+            store.remove(candidate_id)
+    return {
+        "removed": removed,
+        "not_found": [c for c in candidate_ids if c not in removed],
+        "pool_size": len(store),
+        "reasoning": [
+            f"Marked {len(removed)} candidates as removed",
+            "Appended the changes to the pool's log" if save and removed else "Nothing to save"
+        ]
+    }
+
+
+def search_candidates(job_description: str, top_n: int = 10) -> dict:
+    if not job_description:
+        return {"error": "Job Description required."}
+
+    store = get_store()
+    results = store.search(job_description, top_n=top_n)
+    return {
+        "results": results,
+        "reasoning": [
+            "Extracted skills from job description",
+            f"Looked up skill posting lists across {len(store)} stored candidates",
+            "Ranked candidates by skill match percentage"
+        ]
+    }
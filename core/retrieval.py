@@ -0,0 +1,255 @@
+"""
+Memoized vector-store retrieval shared by all tools.
+
+Results are keyed on the normalized query text and always fetched with at
+least `config.RETRIEVAL_PREFETCH_K` documents, so a k=2 request is served
+from an earlier k=4 result for the same job description. The memo is
+dropped whenever the vector store version changes: an in-process
+`registry.invalidate_vector_store()` or a rebuild by another process
+(detected through the manifest's modification time).
+
+With `config.RETRIEVAL_MODE = "hybrid"` and a BM25 index built next to the
+vector store, results are the reciprocal-rank fusion of the vector and
+BM25 rankings. When BM25 alone is confident (see `BM25Index.confidence`)
+the vector search is skipped, along with the query embedding unless the
+caller already had one (HR Q&A embeds questions for its semantic cache).
+
+Vector searches run under `call_policy` ("vector_search"). When one misses
+its deadline or the circuit is open, the BM25 ranking is served alone if
+there is one, otherwise no documents (tools then use their LLM-only
+fallbacks). Such results come back as `DegradedResult`: they are not
+memoized, and callers should not cache answers built from them.
+"""
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+
+from core import call_policy, config, registry, tracing
+from core.vector_store import BM25_PATH, MANIFEST_PATH
+
+_lock = threading.Lock()
+_memo = OrderedDict()
+_memo_version = None
+_manifest_mtime = None
+_stats = {"hits": 0, "misses": 0, "hybrid": 0, "lexical_fast_path": 0, "degraded": 0}
+
+_bm25 = None
+_bm25_mtime = None
+_bm25_lock = threading.Lock()
+
+# Reciprocal-rank fusion constant (Cormack et al.)
+RRF_K = 60
+
+
+class DegradedResult(list):
+    """Documents served while the vector search was unavailable."""
+
+
+def _normalize(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def store_version():
+    """Vector store version, reopening the store if it was rebuilt elsewhere."""
+    global _manifest_mtime
+    try:
+        mtime = os.stat(MANIFEST_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    if mtime != _manifest_mtime:
+        if _manifest_mtime is not None:
+            registry.invalidate_vector_store()
+        _manifest_mtime = mtime
+
+    return registry.vector_store_version()
+
+
+def _lookup(key: str, k: int, version):
+    global _memo_version
+    with _lock:
+        if version != _memo_version:
+            _memo.clear()
+            _memo_version = version
+
+        entry = _memo.get(key)
+        if entry is not None:
+            fetched_k, docs = entry
+            # A short result means the store holds fewer than fetched_k docs
+            if k <= fetched_k or len(docs) < fetched_k:
+                _memo.move_to_end(key)
+                _stats["hits"] += 1
+                return docs[:k]
+
+        _stats["misses"] += 1
+        return None
+
+
+def lexical_index():
+    """The BM25 index built with the vector store, reloaded when rebuilt; None if absent."""
+    global _bm25, _bm25_mtime
+    try:
+        mtime = os.stat(BM25_PATH).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    if mtime != _bm25_mtime:
+        with _bm25_lock:
+            if mtime != _bm25_mtime:
+                from core.bm25 import BM25Index
+
+                with tracing.span("bm25_load"):
+                    _bm25 = BM25Index.load(BM25_PATH) if mtime is not None else None
+                _bm25_mtime = mtime
+    return _bm25
+
+
+def _doc_id(doc) -> str:
+    return doc.metadata.get("chunk_id") or doc.page_content
+
+
+def _lexical_documents(index, ranked) -> list:
+    from langchain_core.documents import Document
+
+    return [
+        Document(page_content=index.text(chunk_id), metadata=dict(index.metadata(chunk_id)))
+        for chunk_id, _ in ranked
+    ]
+
+
+def fuse(rankings, k: int) -> list:
+    """Reciprocal-rank fusion of several ranked document lists."""
+    scores = {}
+    first_seen = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            doc_id = _doc_id(doc)
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+            first_seen.setdefault(doc_id, doc)
+    best = sorted(scores, key=lambda doc_id: -scores[doc_id])[:k]
+    return [first_seen[doc_id] for doc_id in best]
+
+
+def _lexical(query: str, fetch_k: int):
+    """
+    BM25 side of a hybrid query: `(final_docs, lexical_docs, candidates)`.
+
+    `final_docs` is set when the lexical fast path answers alone;
+    `lexical_docs` is None when hybrid retrieval is off or has no index.
+    """
+    if config.RETRIEVAL_MODE != "hybrid":
+        return None, None, fetch_k
+    index = lexical_index()
+    if not index:
+        return None, None, fetch_k
+
+    candidates = max(fetch_k, config.HYBRID_CANDIDATES)
+    with tracing.span("bm25_search") as span:
+        ranked = index.search(query, k=candidates)
+        confidence = index.confidence(query, ranked)
+        span.set(confidence=round(confidence, 3))
+
+    if config.LEXICAL_FAST_PATH and confidence >= config.LEXICAL_CONFIDENCE:
+        tracing.event("retrieval.lexical_fast_path", confidence=round(confidence, 3))
+        with _lock:
+            _stats["lexical_fast_path"] += 1
+        return _lexical_documents(index, ranked[:fetch_k]), None, candidates
+
+    with _lock:
+        _stats["hybrid"] += 1
+    return None, _lexical_documents(index, ranked), candidates
+
+
+def _store(key: str, fetched_k: int, docs, version):
+    with _lock:
+        if version != _memo_version:
+            return
+        _memo[key] = (fetched_k, list(docs))
+        _memo.move_to_end(key)
+        while len(_memo) > config.RETRIEVAL_CACHE_ENTRIES:
+            _memo.popitem(last=False)
+
+
+def _degraded(lexical_docs, k: int, error) -> list:
+    """Result when the vector search is unavailable: BM25 alone, or nothing."""
+    tracing.event("retrieval.degraded", error=str(error), lexical=lexical_docs is not None)
+    with _lock:
+        _stats["degraded"] += 1
+    return DegradedResult((lexical_docs or [])[:k])
+
+
+def retrieve(query: str, k: int = 4, embedding=None) -> list:
+    """
+    `similarity_search(query, k)` with memoization across tools and calls.
+
+    Pass `embedding` when the caller already embedded the query; a memo
+    miss then searches by vector instead of embedding the text again.
+    """
+    version = store_version()
+    key = _normalize(query)
+
+    docs = _lookup(key, k, version)
+    if docs is not None:
+        tracing.event("retrieval.memo_hit", k=k)
+        return docs
+
+    fetch_k = max(k, config.RETRIEVAL_PREFETCH_K)
+    docs, lexical_docs, candidates = _lexical(query, fetch_k)
+    if docs is None:
+        vectordb = registry.get_vector_store()
+        search = call_policy.policy("vector_search")
+        try:
+            with tracing.span("similarity_search", k=candidates, by_vector=embedding is not None):
+                if embedding is not None:
+                    docs = search.call(vectordb.similarity_search_by_vector, embedding, k=candidates)
+                else:
+                    docs = search.call(vectordb.similarity_search, query, k=candidates)
+        except call_policy.UpstreamUnavailable as e:
+            return _degraded(lexical_docs, k, e)
+        if lexical_docs is not None:
+            docs = fuse([docs, lexical_docs], fetch_k)
+    _store(key, fetch_k, docs, version)
+    return list(docs[:k])
+
+
+async def aretrieve(query: str, k: int = 4, embedding=None) -> list:
+    """Async variant of `retrieve`."""
+    version = store_version()
+    key = _normalize(query)
+
+    docs = _lookup(key, k, version)
+    if docs is not None:
+        tracing.event("retrieval.memo_hit", k=k)
+        return docs
+
+    fetch_k = max(k, config.RETRIEVAL_PREFETCH_K)
+    docs, lexical_docs, candidates = _lexical(query, fetch_k)
+    if docs is None:
+        vectordb = registry.get_vector_store()
+        search = call_policy.policy("vector_search")
+        try:
+            with tracing.span("similarity_search", k=candidates, by_vector=embedding is not None):
+                if embedding is not None:
+                    docs = await search.acall(
+                        asyncio.to_thread, vectordb.similarity_search_by_vector, embedding, k=candidates
+                    )
+                else:
+                    docs = await search.acall(vectordb.asimilarity_search, query, k=candidates)
+        except call_policy.UpstreamUnavailable as e:
+            return _degraded(lexical_docs, k, e)
+        if lexical_docs is not None:
+            docs = fuse([docs, lexical_docs], fetch_k)
+    _store(key, fetch_k, docs, version)
+    return list(docs[:k])
+
+
+def clear():
+    with _lock:
+        _memo.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_stats, entries=len(_memo))
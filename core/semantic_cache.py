@@ -0,0 +1,111 @@
+"""
+Semantic answer cache.
+
+Stores previously answered questions as normalized embeddings in a
+fixed-capacity float32 matrix. A lookup is one matrix-vector product; the
+best match above the similarity threshold returns the stored answer. When
+full, the least recently used entry is overwritten. Entries are tied to a
+vector store version and dropped as soon as the corpus changes.
+"""
+
+import copy
+import threading
+
+import numpy as np
+
+from core import config
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of answers keyed by question embedding."""
+
+    def __init__(self, threshold: float = 0.92, capacity: int = 1024):
+        self.threshold = threshold
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._values = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._size = 0
+        self._clock = 0
+        self._version = None
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _sync_version(self, version):
+        if version != self._version:
+            self._size = 0
+            self._values = [None] * self.capacity
+            self._last_used[:] = 0
+            self._version = version
+
+    def lookup(self, embedding, version):
+        """Return (value, similarity) for the closest entry, or None."""
+        vec = self._normalize(embedding)
+        with self._lock:
+            self._sync_version(version)
+            if not self._size:
+                self._stats["misses"] += 1
+                return None
+
+            scores = self._vectors[:self._size] @ vec
+            best = int(np.argmax(scores))
+            similarity = float(scores[best])
+            if similarity < self.threshold:
+                self._stats["misses"] += 1
+                return None
+
+            self._clock += 1
+            self._last_used[best] = self._clock
+            self._stats["hits"] += 1
+            return copy.deepcopy(self._values[best]), similarity
+
+    def store(self, embedding, value, version):
+        vec = self._normalize(embedding)
+        with self._lock:
+            self._sync_version(version)
+            if self._vectors is None or self._vectors.shape[1] != vec.shape[0]:
+                self._vectors = np.zeros((self.capacity, vec.shape[0]), dtype=np.float32)
+                self._size = 0
+
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._stats["evictions"] += 1
+
+            self._clock += 1
+            self._vectors[slot] = vec
+            self._values[slot] = copy.deepcopy(value)
+            self._last_used[slot] = self._clock
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._sync_version(None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=self._size)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SemanticCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache(
+                    threshold=config.SEMANTIC_CACHE_THRESHOLD,
+                    capacity=config.SEMANTIC_CACHE_CAPACITY
+                )
+    return _cache
@@ -0,0 +1,524 @@
+"""
+Headless HTTP/JSON front end for the agent (started by serve.py).
+
+Routes:
+
+- `POST /v1/<intent>`: JSON payload in, `run_agent` result out (results
+  carrying an "error" key are still 200, as in run_batch.py output);
+  with `?stream=1` the `stream_agent` events come back as NDJSON over a
+  chunked response
+- `GET /v1/explanation/<handle>`: a deferred explanation (`?wait=0` to poll)
+- `GET /health`: liveness, warm/cold state of the shared clients, queue
+  and circuit breaker state; `GET /ready` is 200 only once warm
+- `GET /metrics`: Prometheus text (`tracing.prometheus` plus server metrics)
+
+Connections are HTTP/1.1 keep-alive, each served by a thread that only
+parses requests and writes responses. Agent work runs on a fixed pool of
+`SERVER_WORKERS` threads; at most `SERVER_QUEUE_DEPTH` requests wait for
+a free worker, and a request arriving when that queue is full is answered
+429 right away, so overload is shed at the door instead of piling up in
+front of the LLM. A `deadline_seconds` in the payload (or an
+`X-Deadline-Seconds` header) counts from arrival: time spent queued is
+taken off it, and a request whose deadline passes in the queue gets 504
+without running.
+"""
+
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from core import config, tracing
+
+_STREAM_END = object()
+
+
+class Overloaded(Exception):
+    """Every worker is busy and the wait queue is full."""
+
+
+class QueueDeadlineExceeded(Exception):
+    """The request's deadline passed before a worker picked it up."""
+
+
+def _seconds(value, name: str, allow_zero: bool = False) -> float:
+    """`value` as a finite number of seconds above zero (or at least zero); ValueError otherwise."""
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number of seconds, got {value!r}") from None
+    if not math.isfinite(seconds) or seconds < 0 or (seconds == 0 and not allow_zero):
+        raise ValueError(f"{name} out of range: {value!r}")
+    return seconds
+
+
+# =================================================
+# Worker pool
+# =================================================
+class Dispatcher:
+    """Fixed pool of agent worker threads behind a bounded wait queue."""
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = max(workers, 1)
+        self.queue_depth = max(queue_depth, 0)
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._admitted = 0  # running + waiting
+        self._running = 0
+        self._wait = tracing.Histogram()
+        self._stats = {"accepted": 0, "rejected": 0, "completed": 0}
+        self._threads = [
+            threading.Thread(target=self._work, name=f"agent-worker-{n}", daemon=True)
+            for n in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args) -> Future:
+        """Queue `fn(*args)`; raises Overloaded when the queue is full."""
+        with self._lock:
+            if self._admitted >= self.workers + self.queue_depth:
+                self._stats["rejected"] += 1
+                raise Overloaded(f"{self._admitted} requests in progress or queued")
+            self._admitted += 1
+            self._stats["accepted"] += 1
+        future = Future()
+        self._queue.put((future, fn, args, time.perf_counter()))
+        return future
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, enqueued = item
+            with self._lock:
+                self._running += 1
+                self._wait.record(time.perf_counter() - enqueued)
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._admitted -= 1
+                    self._stats["completed"] += 1
+
+    def close(self):
+        """Let the workers finish what is queued, then stop them."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                self._stats,
+                workers=self.workers,
+                queue_depth=self.queue_depth,
+                running=self._running,
+                queued=self._admitted - self._running,
+                queue_wait_ms=self._wait.summary()
+            )
+
+    def wait_histogram(self) -> tracing.Histogram:
+        return self._wait
+
+
+# =================================================
+# Warmup
+# =================================================
+def warm_up(intents=None):
+    """Import the tools and build the shared clients ahead of the first request."""
+    from core import agent, registry
+
+    agent.preload(intents)
+    registry.get_embeddings()
+    registry.get_vector_store()
+    registry.get_llm()
+
+
+# =================================================
+# HTTP
+# =================================================
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "hr-agent"
+
+    def log_message(self, format, *args):
+        if self.server.access_log:
+            super().log_message(format, *args)
+
+    # -----------------------------
+    # Responses
+    # -----------------------------
+    def _send(self, status: int, body: bytes, content_type: str, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_json(self, status: int, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self._send(status, data, "application/json; charset=utf-8", headers)
+
+    def _error(self, status: int, message: str, headers=None):
+        self._send_json(status, {"error": message}, headers)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+    # -----------------------------
+    # Routing
+    # -----------------------------
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/health":
+            return self._send_json(200, self.server.health())
+        if url.path == "/ready":
+            health = self.server.health()
+            return self._send_json(200 if health["state"] == "warm" else 503, health)
+        if url.path == "/metrics":
+            return self._send(200, self.server.metrics().encode("utf-8"), "text/plain; version=0.0.4")
+        if url.path.startswith("/v1/explanation/"):
+            payload = {"handle": url.path[len("/v1/explanation/"):]}
+            if "wait" in query:
+                payload["wait"] = query["wait"][0] not in ("0", "false")
+            if "timeout" in query:
+                try:
+                    payload["timeout"] = _seconds(query["timeout"][0], "timeout", allow_zero=True)
+                except ValueError as e:
+                    return self._error(400, str(e))
+            return self._run("explanation", payload, time.perf_counter())
+        if url.path.startswith("/v1/"):
+            return self._error(405, "Use POST for agent requests", {"Allow": "POST"})
+        self._error(404, f"No route for {url.path}")
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        arrived = time.perf_counter()
+        url = urlsplit(self.path)
+        if not url.path.startswith("/v1/"):
+            return self._error(404, f"No route for {url.path}")
+
+        # The body is not read on these errors, so the connection cannot be reused
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self.close_connection = True
+            return self._error(411, "Content-Length required")
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            return self._error(400, f"Invalid Content-Length: {self.headers['Content-Length']!r}")
+        if length > self.server.max_body_bytes:
+            self.close_connection = True
+            return self._error(413, f"Body larger than {self.server.max_body_bytes} bytes")
+        body = self.rfile.read(length)
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError as e:
+            return self._error(400, f"Invalid JSON: {e}")
+        if not isinstance(payload, dict):
+            return self._error(400, "Payload must be a JSON object")
+        try:
+            if payload.get("deadline_seconds") is not None:
+                payload["deadline_seconds"] = _seconds(payload["deadline_seconds"], "deadline_seconds")
+            elif self.headers.get("X-Deadline-Seconds"):
+                payload["deadline_seconds"] = _seconds(
+                    self.headers["X-Deadline-Seconds"], "X-Deadline-Seconds"
+                )
+        except ValueError as e:
+            return self._error(400, str(e))
+
+        stream = parse_qs(url.query).get("stream", ["0"])[0] not in ("0", "false")
+        self._run(url.path[len("/v1/"):], payload, arrived, stream)
+
+    # -----------------------------
+    # Agent calls
+    # -----------------------------
+    def _run(self, name: str, payload: dict, arrived: float, stream: bool = False):
+        from core.agent import Intent
+
+        try:
+            intent = Intent(name)
+        except ValueError:
+            return self._error(404, f"Unknown intent: {name}; expected one of {[i.value for i in Intent]}")
+
+        started = time.perf_counter()
+        status = 200
+        try:
+            if stream:
+                status = self._stream(intent, payload, arrived)
+            else:
+                future = self.server.dispatcher.submit(_call, intent, payload, arrived)
+                self._send_json(200, future.result())
+        except Overloaded:
+            status = 429
+            self._error(429, "Server busy, retry later", {"Retry-After": "1"})
+        except QueueDeadlineExceeded as e:
+            status = 504
+            self._error(504, str(e))
+        except OSError:
+            status = 499  # client went away
+            self.close_connection = True
+        except Exception as e:
+            status = 500
+            self._error(500, f"Server error: {type(e).__name__}: {e}")
+        finally:
+            self.server.record(intent.value, status, time.perf_counter() - started)
+
+    def _stream(self, intent, payload: dict, arrived: float) -> int:
+        events = queue.SimpleQueue()
+        cancelled = threading.Event()
+
+        def produce():
+            try:
+                for event in _stream_events(intent, payload, arrived):
+                    events.put(event)
+                    if cancelled.is_set():
+                        break
+            except QueueDeadlineExceeded as e:
+                events.put({"type": "result", "result": {"error": str(e)}})
+            finally:
+                events.put(_STREAM_END)
+
+        self.server.dispatcher.submit(produce)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            while True:
+                event = events.get()
+                if event is _STREAM_END:
+                    break
+                self._write_chunk(json.dumps(event, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            cancelled.set()
+            raise
+        return 200
+
+
+def _remaining(payload: dict, arrived: float) -> dict:
+    """`payload` with its deadline reduced by the time already spent queued."""
+    deadline = payload.get("deadline_seconds")
+    if deadline is None:
+        return payload
+    remaining = float(deadline) - (time.perf_counter() - arrived)
+    if remaining <= 0:
+        raise QueueDeadlineExceeded(f"Deadline of {deadline}s passed while queued")
+    return dict(payload, deadline_seconds=remaining)
+
+
+def _call(intent, payload: dict, arrived: float) -> dict:
+    from core.agent import run_agent
+
+    return run_agent(intent, _remaining(payload, arrived))
+
+
+def _stream_events(intent, payload: dict, arrived: float):
+    from core.agent import stream_agent
+
+    yield from stream_agent(intent, _remaining(payload, arrived))
+
+
+class AgentServer(ThreadingHTTPServer):
+    """Threaded keep-alive HTTP server handing agent work to a `Dispatcher`."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, workers: int, queue_depth: int, keepalive: float,
+                 max_connections: int, max_body_bytes: int, access_log: bool = False):
+        handler = type("Handler", (_Handler,), {"timeout": keepalive})
+        super().__init__(address, handler)
+        self.dispatcher = Dispatcher(workers, queue_depth)
+        self.max_connections = max_connections
+        self.max_body_bytes = max_body_bytes
+        self.access_log = access_log
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._refused_connections = 0
+        self._responses = {}  # (intent, status) -> count
+        self._latency = {}    # intent -> Histogram
+        self._warmup = {"running": False, "error": None, "seconds": None}
+
+    # -----------------------------
+    # Connections
+    # -----------------------------
+    def process_request(self, request, client_address):
+        with self._lock:
+            refused = self._connections >= self.max_connections
+            if refused:
+                self._refused_connections += 1
+            else:
+                self._connections += 1
+        if refused:
+            try:
+                request.sendall(
+                    b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n"
+                    b"Retry-After: 1\r\nConnection: close\r\n\r\n"
+                )
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        super().process_request(request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            with self._lock:
+                self._connections -= 1
+
+    def close(self):
+        """Stop accepting, then drain the queued agent work."""
+        self.server_close()
+        self.dispatcher.close()
+
+    # -----------------------------
+    # State
+    # -----------------------------
+    def warm_up_async(self, intents=None) -> threading.Thread:
+        def run():
+            started = time.perf_counter()
+            try:
+                warm_up(intents)
+            except Exception as e:
+                self._warmup["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                self._warmup["seconds"] = round(time.perf_counter() - started, 3)
+                self._warmup["running"] = False
+
+        self._warmup["running"] = True
+        thread = threading.Thread(target=run, name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def record(self, intent: str, status: int, seconds: float):
+        with self._lock:
+            key = (intent, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+            if status == 200:
+                self._latency.setdefault(intent, tracing.Histogram()).record(seconds)
+
+    def health(self) -> dict:
+        from core import agent, call_policy, registry
+
+        warmup = dict(self._warmup)
+        if warmup["running"]:
+            # The registry holds its lock while a client is being built.
+            state, resources = "warming", None
+        else:
+            resources = registry.status()
+            warm = resources["embeddings"] and resources["vector_store"] and bool(resources["llms"])
+            state = "warm" if warm else "cold"
+
+        breakers = {name: stats["breaker"] for name, stats in call_policy.stats().items()}
+        with self._lock:
+            connections = self._connections
+        return {
+            "status": "degraded" if any(b != "closed" for b in breakers.values()) else "ok",
+            "state": state,
+            "uptime_s": round(time.time() - self.started, 3),
+            "resources": resources,
+            "tools_loaded": len(agent.loaded_tools()),
+            "warmup": warmup,
+            "breakers": breakers,
+            "queue": self.dispatcher.stats(),
+            "connections": connections
+        }
+
+    def metrics(self) -> str:
+        lines = [
+            "# HELP hr_agent_http_responses_total HTTP responses by intent and status "
+            "(429: queue full, 504: deadline passed while queued).",
+            "# TYPE hr_agent_http_responses_total counter"
+        ]
+        with self._lock:
+            for (intent, status), count in sorted(self._responses.items()):
+                lines.append(
+                    f'hr_agent_http_responses_total{{intent="{tracing.prometheus_label(intent)}",'
+                    f'status="{status}"}} {count}'
+                )
+            lines += [
+                "# HELP hr_agent_http_request_seconds Server-side latency of successful "
+                "requests, queue wait included.",
+                "# TYPE hr_agent_http_request_seconds summary"
+            ]
+            for intent, hist in sorted(self._latency.items()):
+                lines += tracing.summary_lines(
+                    "hr_agent_http_request_seconds", f'intent="{tracing.prometheus_label(intent)}"', hist
+                )
+            connections, refused = self._connections, self._refused_connections
+
+        queue_stats = self.dispatcher.stats()
+        lines += [
+            "# HELP hr_agent_http_queue_wait_seconds Time requests waited for an agent worker.",
+            "# TYPE hr_agent_http_queue_wait_seconds summary"
+        ]
+        lines += tracing.summary_lines(
+            "hr_agent_http_queue_wait_seconds", 'pool="agent"', self.dispatcher.wait_histogram()
+        )
+        lines += [
+            "# HELP hr_agent_http_queue Agent requests running and waiting for a worker.",
+            "# TYPE hr_agent_http_queue gauge",
+            f'hr_agent_http_queue{{kind="running"}} {queue_stats["running"]}',
+            f'hr_agent_http_queue{{kind="queued"}} {queue_stats["queued"]}',
+            "# HELP hr_agent_http_connections Open client connections.",
+            "# TYPE hr_agent_http_connections gauge",
+            f"hr_agent_http_connections {connections}",
+            "# HELP hr_agent_http_refused_connections_total Connections refused at the cap.",
+            "# TYPE hr_agent_http_refused_connections_total counter",
+            f"hr_agent_http_refused_connections_total {refused}"
+        ]
+        return tracing.prometheus() + "\n".join(lines) + "\n"
+
+
+# =================================================
+# Entry points
+# =================================================
+def make_server(host: str = None, port: int = None, workers: int = None, queue_depth: int = None,
+                keepalive: float = None, max_connections: int = None,
+                access_log: bool = False) -> AgentServer:
+    """An `AgentServer` bound to (host, port); unset arguments come from config (port 0 picks one)."""
+    return AgentServer(
+        (host if host is not None else config.SERVER_HOST,
+         port if port is not None else config.SERVER_PORT),
+        workers=workers if workers is not None else config.SERVER_WORKERS,
+        queue_depth=queue_depth if queue_depth is not None else config.SERVER_QUEUE_DEPTH,
+        keepalive=keepalive if keepalive is not None else config.SERVER_KEEPALIVE_SECONDS,
+        max_connections=max_connections if max_connections is not None else config.SERVER_MAX_CONNECTIONS,
+        max_body_bytes=config.SERVER_MAX_BODY_BYTES,
+        access_log=access_log
+    )
+
+
+def start(server: AgentServer, warm: bool = True) -> threading.Thread:
+    """Serve on a background thread (benchmarks, embedding); returns the thread."""
+    if warm:
+        server.warm_up_async()
+    thread = threading.Thread(target=server.serve_forever, name="http-server", daemon=True)
+    thread.start()
+    return thread
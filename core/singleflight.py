@@ -0,0 +1,222 @@
+"""
+Single-flight coalescing of identical in-flight agent requests.
+
+Requests are keyed on intent plus the normalized tool arguments (strings
+whitespace-collapsed, dict keys sorted). While one execution of a key is
+running, identical requests wait for it instead of repeating its retrieval
+and LLM calls; each waiter gets a deep copy of the result (or the same
+exception). Nothing is kept once the execution finishes: this is not a
+cache, it only merges calls that overlap in time.
+
+Deadlines (`call_policy.budget`) are respected on both sides: a request
+only joins an execution whose budget is at least as long as its own, so
+it never receives an answer degraded by someone else's shorter deadline,
+and a waiter gives up with `DeadlineExceeded` when its own budget runs out.
+
+The sync path coalesces across threads (Streamlit sessions, batch
+workers); the async path coalesces coroutines on the same event loop.
+The shared async execution runs as its own task, so cancelling one
+waiter never cancels it for the others.
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+
+from core import call_policy, config, tracing
+
+_lock = threading.Lock()
+_flights = {}
+_stats = {}
+
+
+class _Flight:
+    __slots__ = ("deadline", "done", "error", "followers", "snapshot", "task")
+
+    def __init__(self, deadline):
+        self.deadline = deadline  # the leader's budget; None when unbounded
+        self.done = threading.Event()
+        self.error = None
+        self.followers = 0
+        self.snapshot = None
+        self.task = None  # async path: the shared execution
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def request_key(intent: str, kwargs: dict) -> str:
+    """Stable key of one request: intent plus a hash of its normalized arguments."""
+    blob = json.dumps(_normalize(kwargs), sort_keys=True, ensure_ascii=False, default=str)
+    return f"{intent}:{hashlib.sha256(blob.encode('utf-8')).hexdigest()}"
+
+
+def _counters(intent: str) -> dict:
+    counters = _stats.get(intent)
+    if counters is None:
+        counters = _stats[intent] = {"calls": 0, "executions": 0, "coalesced": 0}
+    return counters
+
+
+def _covers(flight: _Flight, deadline) -> bool:
+    """Whether the flight's budget is at least as long as a caller's `deadline`."""
+    return flight.deadline is None or (deadline is not None and flight.deadline >= deadline)
+
+
+def _join(key, intent: str, deadline):
+    """
+    `(flight, leader)` for a caller with budget `deadline` (must hold
+    `_lock`). The flight is None when one is running under a shorter
+    budget: the caller then executes on its own, outside any flight.
+    """
+    counters = _counters(intent)
+    counters["calls"] += 1
+    flight = _flights.get(key)
+    if flight is None:
+        flight = _flights[key] = _Flight(deadline)
+        counters["executions"] += 1
+        return flight, True
+    if not _covers(flight, deadline):
+        counters["executions"] += 1
+        return None, False
+    flight.followers += 1
+    counters["coalesced"] += 1
+    return flight, False
+
+
+def _wait_seconds(deadline):
+    return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+
+def _waited_too_long(intent: str):
+    return call_policy.DeadlineExceeded(
+        f"{intent}: request budget exhausted waiting on an identical request"
+    )
+
+
+def _land(key, flight: _Flight, result=None, error=None):
+    """Publish the leader's outcome; no follower can join afterwards."""
+    with _lock:
+        _flights.pop(key, None)
+        followers = flight.followers
+    if error is None and followers:
+        # Followers copy from a snapshot the leader's caller never sees
+        flight.snapshot = copy.deepcopy(result)
+    flight.error = error
+    flight.done.set()
+
+
+def _follow(flight: _Flight):
+    if flight.error is not None:
+        raise flight.error
+    return copy.deepcopy(flight.snapshot)
+
+
+# =================================================
+# Sync
+# =================================================
+def do(intent: str, kwargs: dict, fn):
+    """
+    Run `fn()` once for all concurrent callers with the same key.
+
+    Returns `(result, shared)`; `shared` is True for callers that waited
+    on another caller's execution.
+    """
+    if not config.SINGLEFLIGHT_ENABLED:
+        return fn(), False
+
+    key = request_key(intent, kwargs)
+    deadline = call_policy.budget_deadline()
+    with _lock:
+        flight, leader = _join(key, intent, deadline)
+
+    if flight is None:
+        return fn(), False
+    if not leader:
+        with tracing.span("singleflight.wait", intent=intent):
+            landed = flight.done.wait(_wait_seconds(deadline))
+        if not landed:
+            raise _waited_too_long(intent)
+        return _follow(flight), True
+
+    try:
+        result = fn()
+    except BaseException as e:
+        _land(key, flight, error=e)
+        raise
+    _land(key, flight, result)
+    return result, False
+
+
+# =================================================
+# Async
+# =================================================
+async def ado(intent: str, kwargs: dict, fn):
+    """Async counterpart of `do`; `fn` is a coroutine function."""
+    import asyncio
+
+    if not config.SINGLEFLIGHT_ENABLED:
+        return await fn(), False
+
+    loop = asyncio.get_running_loop()
+    key = (id(loop), request_key(intent, kwargs))
+    deadline = call_policy.budget_deadline()
+    with _lock:
+        flight, leader = _join(key, intent, deadline)
+        if leader:
+            async def _lead():
+                try:
+                    result = await fn()
+                except BaseException as e:
+                    _land(key, flight, error=e)
+                    raise
+                _land(key, flight, result)
+                return result
+
+            flight.task = loop.create_task(_lead())
+
+    if flight is None:
+        return await fn(), False
+    task = flight.task
+    if leader:
+        return await asyncio.shield(task), False
+
+    with tracing.span("singleflight.wait", intent=intent):
+        try:
+            await asyncio.wait_for(asyncio.shield(task), _wait_seconds(deadline))
+        except asyncio.TimeoutError:
+            if not task.done():
+                raise _waited_too_long(intent) from None
+        except Exception:
+            pass
+    return _follow(flight), True
+
+
+# =================================================
+# Counters
+# =================================================
+def stats() -> dict:
+    """Calls, executions and calls saved by coalescing, overall and per intent."""
+    with _lock:
+        by_intent = {intent: dict(c) for intent, c in _stats.items()}
+        in_flight = len(_flights)
+    totals = {
+        name: sum(c[name] for c in by_intent.values())
+        for name in ("calls", "executions", "coalesced")
+    }
+    return dict(totals, in_flight=in_flight, by_intent=by_intent)
+
+
+def reset():
+    """Zero the counters (flights in progress are unaffected)."""
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,144 @@
+"""
+Skill extraction from free text.
+
+`data/skills/skills.json` maps each canonical skill to its surface forms
+("k8s" -> kubernetes, "py" -> python). All surface forms are compiled into
+one Aho-Corasick automaton, stored as a complete transition table, so a
+resume is scanned in a single linear pass regardless of dictionary size.
+Matches must sit on word boundaries. The compiled automaton is pickled
+under `config.CACHE_DIR` and reused while the dictionary is unchanged.
+"""
+
+import hashlib
+import json
+import pickle
+import threading
+from collections import deque
+from pathlib import Path
+
+from core import config
+
+SKILLS_PATH = config.ROOT_DIR / "data" / "skills" / "skills.json"
+AUTOMATON_VERSION = 1
+
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+# Characters that glue an alias to the preceding token ("node.js" is not "js")
+_LEFT_JOINERS = _WORD_CHARS | frozenset("._")
+_RIGHT_JOINERS = _WORD_CHARS | frozenset("_")
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over skill aliases."""
+
+    def __init__(self, delta, outputs, aliases):
+        self._delta = delta
+        self._outputs = outputs
+        self._aliases = aliases
+
+    @classmethod
+    def compile(cls, dictionary: dict) -> "SkillMatcher":
+        aliases = {}
+        for skill, forms in dictionary.items():
+            for form in forms:
+                aliases[" ".join(form.lower().split())] = skill.lower()
+
+        # Trie
+        goto = [{}]
+        outputs = [[]]
+        for alias, skill in aliases.items():
+            state = 0
+            for ch in alias:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append((len(alias), alias[0] in _WORD_CHARS,
+                                   alias[-1] in _WORD_CHARS, skill))
+
+        # Failure links folded into a complete transition table (BFS order)
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                queue.append(nxt)
+
+        return cls(delta, [tuple(o) for o in outputs], aliases)
+
+    def extract(self, text: str) -> set:
+        """Canonical skills mentioned in `text`."""
+        text = " ".join(text.lower().split())
+        delta = self._delta
+        outputs = self._outputs
+        last = len(text) - 1
+        found = set()
+
+        state = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                for length, word_start, word_end, skill in outputs[state]:
+                    start = i - length + 1
+                    if word_start and start > 0 and text[start - 1] in _LEFT_JOINERS:
+                        continue
+                    if word_end and i < last and text[i + 1] in _RIGHT_JOINERS:
+                        continue
+                    found.add(skill)
+        return found
+
+    def canonical(self, term: str) -> str:
+        """Canonical name for a single term (unknown terms pass through)."""
+        term = " ".join(term.lower().split())
+        return self._aliases.get(term, term)
+
+
+def load_matcher(path: Path = SKILLS_PATH, cache_dir: Path = None) -> SkillMatcher:
+    """Compile the dictionary at `path`, reusing the on-disk cache if valid."""
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw + str(AUTOMATON_VERSION).encode()).hexdigest()
+    cache_path = Path(cache_dir or config.CACHE_DIR) / "skills_automaton.pkl"
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached_digest, matcher = pickle.load(f)
+        if cached_digest == digest:
+            return matcher
+    except (OSError, pickle.PickleError, EOFError, ValueError, AttributeError):
+        pass
+
+    matcher = SkillMatcher.compile(json.loads(raw))
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump((digest, matcher), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(cache_path)
+    except OSError:
+        pass
+
+    return matcher
+
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+
+def get_matcher() -> SkillMatcher:
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = load_matcher()
+    return _matcher
+
+
+def extract_skills(text: str) -> set:
+    return get_matcher().extract(text)
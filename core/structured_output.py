@@ -0,0 +1,481 @@
+"""
+Structured (JSON) output from the LLM.
+
+- `IncrementalJSONParser` consumes the token stream and reports when the
+  top-level object closes, so generation can stop right there.
+- `repair_json` fixes the usual defects locally: code fences, prose around
+  the object, smart quotes, trailing commas and truncated output.
+- `validate` checks the parsed object against a small type schema.
+
+`structured_invoke` ties them together; a second LLM call is made only
+when both the clean parse and the repair fail. `stream_structured` does the
+same while yielding the fields parsed so far. Outcomes are counted in
+`metrics()`.
+"""
+
+import json
+import re
+import threading
+
+from core import call_policy, llm_cache, tracing
+from core.concurrency import acquire_slot, allm_slot, hold_while_open, llm_slot
+
+RETRY_PREFIX = "RETURN JSON ONLY. NO TEXT.\n"
+
+_FENCE_RE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_SMART_QUOTES = str.maketrans({
+    "“": '"', "”": '"', "„": '"', "‟": '"',
+    "‘": "'", "’": "'"
+})
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StructuredOutputError(ValueError):
+    """The model output could not be parsed or validated, even after repair."""
+
+
+# =================================================
+# Incremental parsing
+# =================================================
+class IncrementalJSONParser:
+    """
+    Tracks string/nesting state of a streamed JSON object.
+
+    Text before the first `{` is ignored. `feed()` returns True once the
+    top-level object has closed; anything after it is not consumed.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.started = False
+        self.done = False
+
+    def feed(self, chunk: str) -> bool:
+        if self.done or not chunk:
+            return self.done
+
+        start = 0
+        if not self.started:
+            start = chunk.find("{")
+            if start < 0:
+                return False
+            self.started = True
+
+        for i in range(start, len(chunk)):
+            ch = chunk[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:i + 1])
+                    self.done = True
+                    return True
+
+        self._parts.append(chunk[start:])
+        return False
+
+    @property
+    def text(self) -> str:
+        """The object text consumed so far (from the first `{`)."""
+        return "".join(self._parts)
+
+    def partial(self):
+        """Best-effort parse of the object so far (closed up), or None."""
+        if not self.started:
+            return None
+        try:
+            data = repair_json(self.text)
+        except StructuredOutputError:
+            return None
+        return data if isinstance(data, dict) else None
+
+
+# =================================================
+# Local repair
+# =================================================
+def _scan(text: str):
+    """Open-bracket stack, in-string flag and positions of commas outside strings."""
+    stack = []
+    commas = []
+    in_string = escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+        elif ch == ",":
+            commas.append(i)
+    return stack, in_string, commas
+
+
+def _complete(text: str) -> str:
+    """Close an unterminated string and every open bracket."""
+    stack, in_string, _ = _scan(text)
+    if in_string:
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(_CLOSERS[c] for c in reversed(stack))
+
+
+def _drop_trailing_commas(text: str) -> str:
+    out = []
+    in_string = escape = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            rest = text[i + 1:].lstrip()
+            if not rest or rest[0] in "}]":
+                continue
+        out.append(ch)
+    return "".join(out)
+
+
+def extract_object(raw: str) -> str:
+    """The first top-level JSON object in `raw` (possibly unterminated)."""
+    parser = IncrementalJSONParser()
+    parser.feed(_FENCE_RE.sub("", raw))
+    if not parser.started:
+        raise StructuredOutputError("No JSON found")
+    return parser.text
+
+
+def repair_json(raw: str):
+    """Best-effort parse of a defective JSON object; raises on failure."""
+    text = extract_object(raw.translate(_SMART_QUOTES))
+
+    try:
+        return json.loads(_drop_trailing_commas(_complete(text)))
+    except ValueError:
+        pass
+
+    # Truncated mid-element: drop the partial element and close up
+    _, _, commas = _scan(text)
+    for pos in reversed(commas[-8:]):
+        try:
+            return json.loads(_drop_trailing_commas(_complete(text[:pos])))
+        except ValueError:
+            continue
+
+    raise StructuredOutputError("JSON repair failed")
+
+
+# =================================================
+# Validation
+# =================================================
+def _is_instance(value, expected) -> bool:
+    # bool is an int subclass; only accept it where bool is asked for
+    if isinstance(value, bool):
+        allowed = expected if isinstance(expected, tuple) else (expected,)
+        return bool in allowed
+    return isinstance(value, expected)
+
+
+def validate(data, schema: dict):
+    """
+    Check `data` against `schema`, a mapping of key -> expected type.
+
+    Expected types may be a type, a tuple of types, or a one-element list
+    `[type]` meaning "list whose items are of that type".
+    """
+    if not isinstance(data, dict):
+        raise StructuredOutputError("Expected a JSON object")
+
+    problems = []
+    for key, expected in schema.items():
+        if key not in data:
+            problems.append(f"missing '{key}'")
+            continue
+        value = data[key]
+        if isinstance(expected, list):
+            if not isinstance(value, list) or not all(_is_instance(v, expected[0]) for v in value):
+                problems.append(f"'{key}' is not a list of {expected[0].__name__}")
+        elif not _is_instance(value, expected):
+            problems.append(f"'{key}' has type {type(value).__name__}")
+
+    if problems:
+        raise StructuredOutputError("; ".join(problems))
+    return data
+
+
+def parse_structured(raw: str, schema: dict = None):
+    """Parse model output; returns (data, repaired)."""
+    repaired = False
+    try:
+        data = json.loads(extract_object(raw))
+    except ValueError:
+        data = repair_json(raw)
+        repaired = True
+
+    if schema is not None:
+        validate(data, schema)
+    return data, repaired
+
+
+# =================================================
+# Metrics
+# =================================================
+_metrics_lock = threading.Lock()
+_metrics = {
+    "calls": 0,
+    "cache_hits": 0,
+    "clean": 0,
+    "repaired": 0,
+    "retried": 0,
+    "failed": 0,
+    "early_stops": 0
+}
+
+
+def _count(name: str):
+    with _metrics_lock:
+        _metrics[name] += 1
+
+
+def metrics() -> dict:
+    with _metrics_lock:
+        stats = dict(_metrics)
+    calls = stats["calls"] or 1
+    stats["repair_rate"] = round(stats["repaired"] / calls, 4)
+    stats["retry_rate"] = round(stats["retried"] / calls, 4)
+    stats["failure_rate"] = round(stats["failed"] / calls, 4)
+    return stats
+
+
+# =================================================
+# LLM calls
+# =================================================
+def _chunks(llm, prompt: str):
+    """Text chunks of one completion, holding an LLM slot while the upstream streams."""
+    model = llm_cache.model_name(llm)
+    if not hasattr(llm, "stream"):
+        with llm_slot():
+            with tracing.span("llm", model=model, prompt_chars=len(prompt)) as span:
+                message = call_policy.policy("llm").call(llm.invoke, prompt)
+                span.set(**tracing.usage(message))
+        yield message.content
+        return
+
+    slot = acquire_slot()
+    try:
+        with tracing.span("llm.stream", model=model, prompt_chars=len(prompt)) as span:
+            stream = call_policy.policy("llm").stream(hold_while_open(slot, llm.stream), prompt)
+            try:
+                first = True
+                for chunk in stream:
+                    if first:
+                        span.mark("first_chunk_ms")
+                        first = False
+                    span.set(**tracing.usage(chunk))
+                    yield chunk.content
+            finally:
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+    finally:
+        slot.release()  # no-op unless the call failed before the stream opened
+
+
+def _stream_object(llm, prompt: str) -> str:
+    parser = IncrementalJSONParser()
+    parts = []
+    chunks = _chunks(llm, prompt)
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            if parser.feed(chunk):
+                _count("early_stops")
+                break
+    finally:
+        chunks.close()
+    return "".join(parts)
+
+
+async def _astream_object(llm, prompt: str) -> str:
+    model = llm_cache.model_name(llm)
+    if not hasattr(llm, "astream"):
+        async with allm_slot():
+            with tracing.span("llm", model=model, prompt_chars=len(prompt)) as span:
+                message = await call_policy.policy("llm").acall(llm.ainvoke, prompt)
+                span.set(**tracing.usage(message))
+            return message.content
+
+    parser = IncrementalJSONParser()
+    parts = []
+    async with allm_slot():
+        with tracing.span("llm.stream", model=model, prompt_chars=len(prompt)) as span:
+            stream = call_policy.policy("llm").astream(llm.astream, prompt)
+            try:
+                async for chunk in stream:
+                    if not parts:
+                        span.mark("first_chunk_ms")
+                    span.set(**tracing.usage(chunk))
+                    parts.append(chunk.content)
+                    if parser.feed(chunk.content):
+                        _count("early_stops")
+                        span.set(early_stop=True)
+                        break
+            finally:
+                await stream.aclose()
+    return "".join(parts)
+
+
+def _attempt(raw, schema):
+    with tracing.span("json_parse", chars=len(raw)) as span:
+        try:
+            data, repaired = parse_structured(raw, schema)
+        except StructuredOutputError as e:
+            span.set(ok=False, problem=str(e))
+            return None
+        span.set(ok=True, repaired=repaired)
+    _count("repaired" if repaired else "clean")
+    return data
+
+
+def _fresh(llm, prompt, raw, schema, original=None):
+    data = _attempt(raw, schema)
+    if data is not None:
+        # Only output that parsed is worth serving again
+        llm_cache.store(llm, prompt, raw)
+        if original is not None:
+            # A retry that worked also answers the original prompt next time
+            llm_cache.store(llm, original, raw)
+    return data
+
+
+def structured_invoke(llm, prompt: str, schema: dict = None, use_cache: bool = True) -> dict:
+    """
+    Call the LLM for a JSON object and return it parsed and validated.
+
+    The response is streamed and cut off once the object closes. Defective
+    output is repaired locally; only if that fails is the prompt retried
+    once with a JSON-only instruction. Raises StructuredOutputError, or
+    `call_policy.UpstreamUnavailable` when the LLM cannot be reached in time.
+    """
+    _count("calls")
+
+    if use_cache:
+        hit = llm_cache.lookup(llm, prompt)
+        if hit is not None:
+            data = _attempt(hit, schema)
+            if data is not None:
+                _count("cache_hits")
+                return data
+
+    data = _fresh(llm, prompt, _stream_object(llm, prompt), schema)
+    if data is not None:
+        return data
+
+    _count("retried")
+    retry_prompt = RETRY_PREFIX + prompt
+    data = _fresh(llm, retry_prompt, _stream_object(llm, retry_prompt), schema, original=prompt)
+    if data is not None:
+        return data
+
+    _count("failed")
+    raise StructuredOutputError("Model did not return valid JSON after repair and retry")
+
+
+def stream_structured(llm, prompt: str, schema: dict = None, use_cache: bool = True):
+    """
+    Like `structured_invoke`, but a generator of `(kind, data)` pairs:
+    `("partial", fields)` whenever another field or list item has arrived,
+    then one `("final", data)`. Raises StructuredOutputError.
+    """
+    _count("calls")
+
+    if use_cache:
+        hit = llm_cache.lookup(llm, prompt)
+        if hit is not None:
+            data = _attempt(hit, schema)
+            if data is not None:
+                _count("cache_hits")
+                yield "final", data
+                return
+
+    parser = IncrementalJSONParser()
+    parts = []
+    last = None
+    chunks = _chunks(llm, prompt)
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            if parser.feed(chunk):
+                _count("early_stops")
+                break
+            # Re-parse only at element boundaries; partial strings are noise
+            if any(c in chunk for c in ",]}"):
+                fields = parser.partial()
+                if fields and fields != last:
+                    last = fields
+                    yield "partial", fields
+    finally:
+        chunks.close()
+
+    data = _fresh(llm, prompt, "".join(parts), schema)
+    if data is None:
+        _count("retried")
+        retry_prompt = RETRY_PREFIX + prompt
+        data = _fresh(llm, retry_prompt, _stream_object(llm, retry_prompt), schema, original=prompt)
+    if data is None:
+        _count("failed")
+        raise StructuredOutputError("Model did not return valid JSON after repair and retry")
+    yield "final", data
+
+
+async def astructured_invoke(llm, prompt: str, schema: dict = None, use_cache: bool = True) -> dict:
+    """Async variant of `structured_invoke`."""
+    _count("calls")
+
+    if use_cache:
+        hit = llm_cache.lookup(llm, prompt)
+        if hit is not None:
+            data = _attempt(hit, schema)
+            if data is not None:
+                _count("cache_hits")
+                return data
+
+    data = _fresh(llm, prompt, await _astream_object(llm, prompt), schema)
+    if data is not None:
+        return data
+
+    _count("retried")
+    retry_prompt = RETRY_PREFIX + prompt
+    data = _fresh(llm, retry_prompt, await _astream_object(llm, retry_prompt), schema, original=prompt)
+    if data is not None:
+        return data
+
+    _count("failed")
+    raise StructuredOutputError("Model did not return valid JSON after repair and retry")
@@ -1,40 +1,24 @@
 import core.config  # forces env load
 
-from langchain_openai import ChatOpenAI
-from core.vector_store import load_vector_store
+from core import call_policy, semantic_cache, tracing
+from core.llm_cache import acached_invoke, cached_invoke, cached_stream
+from core.registry import get_embeddings, get_llm
+from core.retrieval import DegradedResult, aretrieve, retrieve, store_version
 
 
-def answer_hr_question(question: str) -> dict:
-    """
-    Answer HR-related questions using:
-    1. Vector DB + LLM (preferred)
-    2. LLM-only fallback (never silent fail)
-    """
-
-    if not question.strip():
-        return {
-            "answer": "Please enter a valid HR-related question.",
-            "confidence": "Low",
-            "source": "Validation",
-            "reasoning": ["Empty input provided"]
-        }
-
-    # Initialize Vector DB and LLM
-    vectordb = load_vector_store()
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.2
-    )
+def _empty_question_result() -> dict:
+    return {
+        "answer": "Please enter a valid HR-related question.",
+        "confidence": "Low",
+        "source": "Validation",
+        "reasoning": ["Empty input provided"]
+    }
 
-    # -----------------------------
-    # 1. Try Vector DB Retrieval
-    # -----------------------------
-    docs = vectordb.similarity_search(question, k=4)
 
-    if docs and len(docs) > 0:
-        context = "\n\n".join(doc.page_content for doc in docs)
+def _grounded_prompt(docs, question: str) -> str:
+    context = "\n\n".join(doc.page_content for doc in docs)
 
-        answer = llm.invoke(f"""
+    return f"""
 You are an HR assistant.
 
 Use the following internal HR policy context to answer the question.
@@ -46,22 +30,11 @@ HR Policy Context:
 
 Question:
 {question}
-""").content
-
-        return {
-            "answer": answer,
-            "confidence": "High",
-            "source": "Vector DB + LLM",
-            "reasoning": [
-                "Retrieved relevant HR policy documents using vector similarity search",
-                "Used LLM to generate a grounded response based on retrieved context"
-            ]
-        }
+"""
 
-    # -----------------------------
-    # 2. Controlled LLM Fallback
-    # -----------------------------
-    answer = llm.invoke(f"""
+
+def _fallback_prompt(question: str) -> str:
+    return f"""
 You are an HR assistant.
 
 No internal HR policy documents were retrieved for this question.
@@ -70,8 +43,22 @@ Clearly state that the response is based on general knowledge.
 
 Question:
 {question}
-""").content
+"""
 
+
+def _grounded_result(answer: str) -> dict:
+    return {
+        "answer": answer,
+        "confidence": "High",
+        "source": "Vector DB + LLM",
+        "reasoning": [
+            "Retrieved relevant HR policy documents using vector similarity search",
+            "Used LLM to generate a grounded response based on retrieved context"
+        ]
+    }
+
+
+def _fallback_result(answer: str) -> dict:
     return {
         "answer": answer,
         "confidence": "Medium",
@@ -81,3 +68,187 @@ Question:
             "Used LLM with general HR domain knowledge as a safe fallback"
         ]
     }
+
+
+def _unavailable_result(docs, error) -> dict:
+    """Deterministic answer when the LLM cannot be reached: the best policy passage."""
+    if not docs:
+        return {"error": f"The HR assistant is temporarily unavailable ({error}). Please try again shortly."}
+    return {
+        "answer": docs[0].page_content,
+        "confidence": "Low",
+        "source": "Vector DB (LLM unavailable)",
+        "reasoning": [
+            "Retrieved relevant HR policy documents using vector similarity search",
+            f"LLM unavailable ({error}); returned the most relevant policy passage verbatim"
+        ]
+    }
+
+
+def _embed_question(question: str):
+    """Question embedding for the semantic cache, or None when embeddings are unavailable."""
+    with tracing.span("embedding"):
+        try:
+            return call_policy.policy("embeddings").call(get_embeddings().embed_query, question)
+        except call_policy.UpstreamUnavailable:
+            return None
+
+
+async def _aembed_question(question: str):
+    with tracing.span("embedding"):
+        try:
+            return await call_policy.policy("embeddings").acall(get_embeddings().aembed_query, question)
+        except call_policy.UpstreamUnavailable:
+            return None
+
+
+def _semantic_hit_result(hit) -> dict:
+    result, similarity = hit
+    result["source"] = f"Semantic Cache ({result['source']})"
+    result["reasoning"] = [
+        f"Served from semantic cache: question matched a previous one "
+        f"(cosine similarity {similarity:.2f})"
+    ] + result["reasoning"]
+    return result
+
+
+def answer_hr_question(question: str, use_cache: bool = True) -> dict:
+    """
+    Answer HR-related questions using:
+    1. Vector DB + LLM (preferred)
+    2. LLM-only fallback (never silent fail)
+    3. The best retrieved passage when the LLM is unavailable
+    """
+
+    if not question.strip():
+        return _empty_question_result()
+
+    # -----------------------------
+    # 0. Semantic cache of past answers
+    # -----------------------------
+    embedding = None
+    if core.config.SEMANTIC_CACHE_ENABLED:
+        embedding = _embed_question(question)
+        if use_cache and embedding is not None:
+            with tracing.span("semantic_cache") as span:
+                hit = semantic_cache.get_cache().lookup(embedding, store_version())
+                span.set(hit=hit is not None)
+            if hit is not None:
+                return _semantic_hit_result(hit)
+
+    # Shared LLM client
+    llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+
+    # -----------------------------
+    # 1. Try Vector DB Retrieval
+    # -----------------------------
+    docs = retrieve(question, k=4, embedding=embedding)
+
+    try:
+        if docs and len(docs) > 0:
+            answer = cached_invoke(llm, _grounded_prompt(docs, question), use_cache=use_cache)
+            result = _grounded_result(answer)
+        else:
+            # -----------------------------
+            # 2. Controlled LLM Fallback
+            # -----------------------------
+            answer = cached_invoke(llm, _fallback_prompt(question), use_cache=use_cache)
+            result = _fallback_result(answer)
+    except call_policy.UpstreamUnavailable as e:
+        # -----------------------------
+        # 3. LLM unavailable: no caching of the stand-in
+        # -----------------------------
+        return _unavailable_result(docs, e)
+
+    # An answer without the vector search would outlive the outage in the cache
+    if embedding is not None and not isinstance(docs, DegradedResult):
+        semantic_cache.get_cache().store(embedding, result, store_version())
+    return result
+
+
+async def aanswer_hr_question(question: str, use_cache: bool = True) -> dict:
+    """Async variant of `answer_hr_question`."""
+
+    if not question.strip():
+        return _empty_question_result()
+
+    embedding = None
+    if core.config.SEMANTIC_CACHE_ENABLED:
+        embedding = await _aembed_question(question)
+        if use_cache and embedding is not None:
+            with tracing.span("semantic_cache") as span:
+                hit = semantic_cache.get_cache().lookup(embedding, store_version())
+                span.set(hit=hit is not None)
+            if hit is not None:
+                return _semantic_hit_result(hit)
+
+    llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+
+    docs = await aretrieve(question, k=4, embedding=embedding)
+
+    try:
+        if docs and len(docs) > 0:
+            answer = await acached_invoke(llm, _grounded_prompt(docs, question), use_cache=use_cache)
+            result = _grounded_result(answer)
+        else:
+            answer = await acached_invoke(llm, _fallback_prompt(question), use_cache=use_cache)
+            result = _fallback_result(answer)
+    except call_policy.UpstreamUnavailable as e:
+        return _unavailable_result(docs, e)
+
+    # An answer without the vector search would outlive the outage in the cache
+    if embedding is not None and not isinstance(docs, DegradedResult):
+        semantic_cache.get_cache().store(embedding, result, store_version())
+    return result
+
+
+def stream_hr_question(question: str, use_cache: bool = True):
+    """
+    Streaming variant of `answer_hr_question`.
+
+    Yields `{"type": "token", "text": ...}` events as the answer is
+    generated, then one `{"type": "result", "result": ...}` event carrying
+    the same dict `answer_hr_question` returns. Cached answers arrive as a
+    single token event.
+    """
+
+    if not question.strip():
+        yield {"type": "result", "result": _empty_question_result()}
+        return
+
+    embedding = None
+    if core.config.SEMANTIC_CACHE_ENABLED:
+        embedding = _embed_question(question)
+        if use_cache and embedding is not None:
+            with tracing.span("semantic_cache") as span:
+                hit = semantic_cache.get_cache().lookup(embedding, store_version())
+                span.set(hit=hit is not None)
+            if hit is not None:
+                result = _semantic_hit_result(hit)
+                yield {"type": "token", "text": result["answer"]}
+                yield {"type": "result", "result": result}
+                return
+
+    llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+
+    docs = retrieve(question, k=4, embedding=embedding)
+
+    if docs and len(docs) > 0:
+        prompt, build = _grounded_prompt(docs, question), _grounded_result
+    else:
+        prompt, build = _fallback_prompt(question), _fallback_result
+
+    parts = []
+    try:
+        for chunk in cached_stream(llm, prompt, use_cache=use_cache):
+            parts.append(chunk)
+            yield {"type": "token", "text": chunk}
+    except call_policy.UpstreamUnavailable as e:
+        yield {"type": "result", "result": _unavailable_result(docs, e)}
+        return
+
+    result = build("".join(parts))
+    # An answer without the vector search would outlive the outage in the cache
+    if embedding is not None and not isinstance(docs, DegradedResult):
+        semantic_cache.get_cache().store(embedding, result, store_version())
+    yield {"type": "result", "result": result}
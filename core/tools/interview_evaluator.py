@@ -1,9 +1,18 @@
 import core.config
-import json
-import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 
-from langchain_openai import ChatOpenAI
-from core.vector_store import load_vector_store
+from core import tracing
+from core.call_policy import UpstreamUnavailable
+from core.registry import get_llm
+from core.retrieval import aretrieve, retrieve
+from core.structured_output import (
+    StructuredOutputError,
+    astructured_invoke,
+    stream_structured,
+    structured_invoke,
+    validate,
+)
 
 ROLE_ADJUSTMENT = {
     "Junior": 0,
@@ -11,34 +20,42 @@ ROLE_ADJUSTMENT = {
     "Senior": -30
 }
 
+EVALUATION_SCHEMA = {
+    "base_score": (int, float),
+    "strengths": [str],
+    "weaknesses": [str],
+    "reasoning": str
+}
+
+PACKED_SCHEMA = {
+    "evaluations": [dict]
+}
 
 
-def _clean_json(raw: str):
-    raw = raw.strip()
-    raw = re.sub(r"```json|```", "", raw)
-    match = re.search(r"\{[\s\S]*\}", raw)
-    if not match:
-        raise ValueError("No JSON found")
-    return json.loads(match.group())
+def _empty_answer_result() -> dict:
+    return {
+        "overall_score": 0,
+        "verdict": "Fail",
+        "strengths": [],
+        "weaknesses": ["No answer provided"],
+        "reasoning": ["Empty answer detected"]
+    }
 
 
-def evaluate_interview(question, answer, job_description, role_level):
-    if not answer.strip():
-        return {
-            "overall_score": 0,
-            "verdict": "Fail",
-            "strengths": [],
-            "weaknesses": ["No answer provided"],
-            "reasoning": ["Empty answer detected"]
-        }
-
-    vectordb = load_vector_store()
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
-
-    docs = vectordb.similarity_search(job_description, k=4)
+def _invalid_output_result(cause: str = "JSON parsing failed safely") -> dict:
+    return {
+        "overall_score": 0,
+        "verdict": "Fail",
+        "strengths": [],
+        "weaknesses": ["Invalid model output"],
+        "reasoning": [cause]
+    }
+
+
+def _build_prompt(docs, question, answer) -> str:
     context = "\n".join(d.page_content for d in docs)
 
-    base_prompt = f"""
+    return f"""
 You are an HR interviewer.
 
 Evaluate the answer as if it was given by a JUNIOR-level candidate.
@@ -69,32 +86,59 @@ Return ONLY valid JSON:
 """
 
 
-    for attempt in range(2):
-        raw = llm.invoke(base_prompt).content
-        try:
-            data = _clean_json(raw)
-            break
-        except Exception:
-            if attempt == 1:
-                return {
-                    "overall_score": 0,
-                    "verdict": "Fail",
-                    "strengths": [],
-                    "weaknesses": ["Invalid model output"],
-                    "reasoning": ["JSON parsing failed safely"]
-                }
-            base_prompt = "RETURN JSON ONLY. NO TEXT.\n" + base_prompt
+def _build_packed_prompt(docs, pairs) -> str:
+    context = "\n".join(d.page_content for d in docs)
+    numbered = "\n\n".join(
+        f"Pair {i}:\nInterview Question:\n{p['question']}\n\nCandidate Answer:\n{p['answer']}"
+        for i, p in enumerate(pairs, start=1)
+    )
+
+    return f"""
+You are an HR interviewer.
+
+Evaluate EACH answer below independently, as if it was given by a
+JUNIOR-level candidate.
+
+Scoring Rules:
+- 70–85 → Good Junior answer
+- 50–69 → Weak Junior answer
+- <50 → Poor Junior answer
+
+Do NOT apply senior expectations.
+
+Context:
+{context}
+
+{numbered}
+
+Return ONLY valid JSON with one entry per pair, in order:
+{{
+  "evaluations": [
+    {{
+      "pair": number,
+      "base_score": number,
+      "strengths": [string],
+      "weaknesses": [string],
+      "reasoning": string
+    }}
+  ]
+}}
+"""
+
+
+def _verdict(score) -> str:
+    return "Pass" if score >= 70 else "Borderline" if score >= 50 else "Fail"
 
+
+def _build_result(data: dict, role_level: str) -> dict:
     adjusted = max(
         0,
         min(100, data["base_score"] + ROLE_ADJUSTMENT.get(role_level, 0))
     )
 
-    verdict = "Pass" if adjusted >= 70 else "Borderline" if adjusted >= 50 else "Fail"
-
     return {
         "overall_score": adjusted,
-        "verdict": verdict,
+        "verdict": _verdict(adjusted),
         "strengths": data["strengths"],
         "weaknesses": data["weaknesses"],
         "reasoning": [
@@ -103,3 +147,273 @@ Return ONLY valid JSON:
             data["reasoning"]
         ]
     }
+
+
+def _score_answer(llm, docs, question, answer, role_level, use_cache=True) -> dict:
+    base_prompt = _build_prompt(docs, question, answer)
+
+    try:
+        data = structured_invoke(llm, base_prompt, EVALUATION_SCHEMA, use_cache=use_cache)
+    except StructuredOutputError:
+        return _invalid_output_result()
+    except UpstreamUnavailable as e:
+        return _invalid_output_result(f"LLM unavailable ({e}); evaluation failed safely")
+
+    return _build_result(data, role_level)
+
+
+async def _ascore_answer(llm, docs, question, answer, role_level, use_cache=True) -> dict:
+    base_prompt = _build_prompt(docs, question, answer)
+
+    try:
+        data = await astructured_invoke(llm, base_prompt, EVALUATION_SCHEMA, use_cache=use_cache)
+    except StructuredOutputError:
+        return _invalid_output_result()
+    except UpstreamUnavailable as e:
+        return _invalid_output_result(f"LLM unavailable ({e}); evaluation failed safely")
+
+    return _build_result(data, role_level)
+
+
+def evaluate_interview(question, answer, job_description, role_level, use_cache=True):
+    if not answer.strip():
+        return _empty_answer_result()
+
+    llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+
+    docs = retrieve(job_description, k=4)
+    return _score_answer(llm, docs, question, answer, role_level, use_cache)
+
+
+async def aevaluate_interview(question, answer, job_description, role_level, use_cache=True):
+    """Async variant of `evaluate_interview`."""
+    if not answer.strip():
+        return _empty_answer_result()
+
+    llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+
+    docs = await aretrieve(job_description, k=4)
+    return await _ascore_answer(llm, docs, question, answer, role_level, use_cache)
+
+
+def _partial_fields(data: dict, role_level: str) -> dict:
+    """Result-shaped view of a partially generated evaluation."""
+    fields = {}
+    if isinstance(data.get("base_score"), (int, float)):
+        adjusted = max(0, min(100, data["base_score"] + ROLE_ADJUSTMENT.get(role_level, 0)))
+        fields["overall_score"] = adjusted
+        fields["verdict"] = _verdict(adjusted)
+    for key in ("strengths", "weaknesses"):
+        if isinstance(data.get(key), list):
+            fields[key] = [v for v in data[key] if isinstance(v, str)]
+    return fields
+
+
+def stream_interview_evaluation(question, answer, job_description, role_level, use_cache=True):
+    """
+    Streaming variant of `evaluate_interview`.
+
+    Yields `partial` events with the score, strengths and weaknesses parsed
+    so far, then one `result` event with the full evaluation.
+    """
+    if not answer.strip():
+        yield {"type": "result", "result": _empty_answer_result()}
+        return
+
+    llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+    docs = retrieve(job_description, k=4)
+    prompt = _build_prompt(docs, question, answer)
+
+    try:
+        for kind, data in stream_structured(llm, prompt, EVALUATION_SCHEMA, use_cache=use_cache):
+            if kind == "partial":
+                fields = _partial_fields(data, role_level)
+                if fields:
+                    yield {"type": "partial", "fields": fields}
+            else:
+                yield {"type": "result", "result": _build_result(data, role_level)}
+    except StructuredOutputError:
+        yield {"type": "result", "result": _invalid_output_result()}
+    except UpstreamUnavailable as e:
+        yield {"type": "result", "result": _invalid_output_result(
+            f"LLM unavailable ({e}); evaluation failed safely"
+        )}
+
+
+# =================================================
+# Batch evaluation (one interview round)
+# =================================================
+def _normalize_pairs(pairs) -> list:
+    normalized = []
+    for pair in pairs:
+        if isinstance(pair, dict):
+            normalized.append({"question": pair.get("question", ""), "answer": pair.get("answer", "")})
+        else:
+            question, answer = pair
+            normalized.append({"question": question, "answer": answer})
+    return normalized
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _unpack(data, chunk, role_level: str) -> dict:
+    """Map a packed response onto pair positions; invalid entries are left out."""
+    if data is None:
+        return {}
+
+    results = {}
+    for position, entry in enumerate(data["evaluations"]):
+        try:
+            slot = int(entry.get("pair", position + 1)) - 1
+            if 0 <= slot < len(chunk):
+                results[chunk[slot]] = _build_result(validate(entry, EVALUATION_SCHEMA), role_level)
+        except (StructuredOutputError, TypeError, ValueError):
+            continue
+    return results
+
+
+def _packed(llm, docs, pairs, use_cache):
+    try:
+        return structured_invoke(llm, _build_packed_prompt(docs, pairs), PACKED_SCHEMA, use_cache=use_cache)
+    except (StructuredOutputError, UpstreamUnavailable):
+        return None
+
+
+async def _apacked(llm, docs, pairs, use_cache):
+    try:
+        return await astructured_invoke(
+            llm, _build_packed_prompt(docs, pairs), PACKED_SCHEMA, use_cache=use_cache
+        )
+    except (StructuredOutputError, UpstreamUnavailable):
+        return None
+
+
+def _batch_result(pairs, results, packed: bool) -> dict:
+    per_question = [
+        dict(result, question=pair["question"])
+        for pair, result in zip(pairs, results)
+    ]
+    scores = [r["overall_score"] for r in results]
+    average = round(sum(scores) / len(scores), 2) if scores else 0
+
+    return {
+        "results": per_question,
+        "aggregate": {
+            "overall_score": average,
+            "verdict": _verdict(average),
+            "questions": len(results),
+            "passed": sum(1 for r in results if r["verdict"] == "Pass"),
+            "borderline": sum(1 for r in results if r["verdict"] == "Borderline"),
+            "failed": sum(1 for r in results if r["verdict"] == "Fail")
+        },
+        "reasoning": [
+            "Retrieved interview context from vector database once for the round",
+            "Scored several answers per LLM call" if packed
+            else "Scored answers with concurrent LLM calls",
+            "Aggregated per-question scores into a round score"
+        ]
+    }
+
+
+def evaluate_interview_batch(pairs, job_description, role_level, packed=False,
+                             pack_size=5, max_concurrency=None, use_cache=True) -> dict:
+    """
+    Evaluate a full interview round.
+
+    `pairs` is a list of {"question", "answer"} dicts (or tuples). Retrieval
+    runs once; the LLM calls run concurrently, capped by `max_concurrency`.
+    With `packed=True` up to `pack_size` answers are scored per LLM call;
+    answers missing from a packed response are re-scored individually.
+    """
+    pairs = _normalize_pairs(pairs)
+    if not pairs:
+        return {"error": "At least one question/answer pair required."}
+
+    results = [None] * len(pairs)
+    pending = []
+    for i, pair in enumerate(pairs):
+        if pair["answer"].strip():
+            pending.append(i)
+        else:
+            results[i] = _empty_answer_result()
+
+    if pending:
+        llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+        docs = retrieve(job_description, k=4)
+        workers = max(1, min(len(pending), max_concurrency or core.config.LLM_MAX_CONCURRENCY))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            if packed:
+                chunks = _chunks(pending, max(pack_size, 1))
+                packed_data = pool.map(
+                    tracing.propagate(
+                        lambda chunk: _packed(llm, docs, [pairs[i] for i in chunk], use_cache)
+                    ),
+                    chunks
+                )
+                for chunk, data in zip(chunks, packed_data):
+                    for i, result in _unpack(data, chunk, role_level).items():
+                        results[i] = result
+                pending = [i for i in pending if results[i] is None]
+
+            scored = pool.map(
+                tracing.propagate(
+                    lambda i: _score_answer(
+                        llm, docs, pairs[i]["question"], pairs[i]["answer"], role_level, use_cache
+                    )
+                ),
+                pending
+            )
+            for i, result in zip(pending, scored):
+                results[i] = result
+
+    return _batch_result(pairs, results, packed)
+
+
+async def aevaluate_interview_batch(pairs, job_description, role_level, packed=False,
+                                    pack_size=5, max_concurrency=None, use_cache=True) -> dict:
+    """Async variant of `evaluate_interview_batch`."""
+    pairs = _normalize_pairs(pairs)
+    if not pairs:
+        return {"error": "At least one question/answer pair required."}
+
+    results = [None] * len(pairs)
+    pending = []
+    for i, pair in enumerate(pairs):
+        if pair["answer"].strip():
+            pending.append(i)
+        else:
+            results[i] = _empty_answer_result()
+
+    if pending:
+        llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+        docs = await aretrieve(job_description, k=4)
+        limit = asyncio.Semaphore(max_concurrency or core.config.LLM_MAX_CONCURRENCY)
+
+        async def _capped(coro):
+            async with limit:
+                return await coro
+
+        if packed:
+            chunks = _chunks(pending, max(pack_size, 1))
+            packed_data = await asyncio.gather(*(
+                _capped(_apacked(llm, docs, [pairs[i] for i in chunk], use_cache))
+                for chunk in chunks
+            ))
+            for chunk, data in zip(chunks, packed_data):
+                for i, result in _unpack(data, chunk, role_level).items():
+                    results[i] = result
+            pending = [i for i in pending if results[i] is None]
+
+        scored = await asyncio.gather(*(
+            _capped(_ascore_answer(
+                llm, docs, pairs[i]["question"], pairs[i]["answer"], role_level, use_cache
+            ))
+            for i in pending
+        ))
+        for i, result in zip(pending, scored):
+            results[i] = result
+
+    return _batch_result(pairs, results, packed)
@@ -1,28 +1,23 @@
-import core.config
-import json
-import re
-
-from langchain_openai import ChatOpenAI
-from core.vector_store import load_vector_store
+import hashlib
 
+import core.config
 
-def _clean_json(raw: str):
-    raw = raw.strip()
-    raw = re.sub(r"```json|```", "", raw)
-    match = re.search(r"\{[\s\S]*\}", raw)
-    if not match:
-        raise ValueError("No JSON found")
-    return json.loads(match.group())
+from core import tracing
+from core.call_policy import UpstreamUnavailable
+from core.registry import get_llm
+from core.retrieval import DegradedResult, aretrieve, retrieve
+from core.structured_output import StructuredOutputError, astructured_invoke, structured_invoke
 
+QUESTIONS_SCHEMA = {
+    "technical": [str],
+    "behavioral": [str]
+}
 
-def generate_interview_questions(job_description: str, role_level: str) -> dict:
-    vectordb = load_vector_store()
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
 
-    docs = vectordb.similarity_search(job_description, k=4)
+def _build_prompt(docs, job_description: str, role_level: str) -> str:
     context = "\n".join(d.page_content for d in docs)
 
-    base_prompt = f"""
+    return f"""
 You are a professional interviewer.
 
 Role Level: {role_level}
@@ -47,22 +42,22 @@ Return ONLY valid JSON:
 }}
 """
 
-    for attempt in range(2):
-        raw = llm.invoke(base_prompt).content
-        try:
-            data = _clean_json(raw)
-            break
-        except Exception:
-            if attempt == 1:
-                return {
-                    "questions": [],
-                    "reasoning": [
-                        "LLM failed to produce valid JSON after retry",
-                        "Generation aborted safely"
-                    ]
-                }
-            base_prompt = "RETURN JSON ONLY. NO TEXT.\n" + base_prompt
 
+# Banked questions are only served for the prompt they were generated with
+PROMPT_VERSION = hashlib.sha256(_build_prompt([], "", "").encode("utf-8")).hexdigest()[:12]
+
+
+def _failed_result(cause: str = "LLM failed to produce valid JSON after repair and retry") -> dict:
+    return {
+        "questions": [],
+        "reasoning": [
+            cause,
+            "Generation aborted safely"
+        ]
+    }
+
+
+def _build_result(data: dict, role_level: str) -> dict:
     questions = []
 
     for q in data.get("technical", []):
@@ -86,3 +81,88 @@ Return ONLY valid JSON:
             f"Generated role-specific questions for {role_level} using LLM"
         ]
     }
+
+
+# =================================================
+# Question bank (near-duplicate postings share questions)
+# =================================================
+def _bank_lookup(job_description: str, role_level: str, use_cache: bool):
+    """`(banked_result, match)`; the match is None when the bank is off."""
+    if not core.config.QUESTION_BANK_ENABLED:
+        return None, None
+
+    from core.question_bank import current_version, get_bank
+
+    bank = get_bank()
+    with tracing.span("question_bank") as span:
+        match = bank.match(job_description, current_version())
+        result = bank.get(match, role_level) if use_cache else None
+        span.set(hit=result is not None, similarity=round(match.similarity, 3))
+    if result is None:
+        return None, match
+
+    result["reasoning"] = [
+        f"Served from question bank: job description matched posting fingerprint "
+        f"{match.fingerprint} (estimated similarity {match.similarity:.2f})"
+    ] + result["reasoning"]
+    return result, match
+
+
+def _bank_store(match, job_description: str, role_level: str, result: dict, docs):
+    # Questions generated without the vector search are not banked
+    if match is not None and result["questions"] and not isinstance(docs, DegradedResult):
+        from core.question_bank import get_bank
+
+        get_bank().put(match, role_level, result, job_description)
+
+
+def generate_interview_questions(job_description: str, role_level: str, use_cache: bool = True) -> dict:
+    """
+    Technical and behavioral questions for a posting and role level.
+
+    Near-duplicate postings (see `core.question_bank`) are served from the
+    question bank; `use_cache=False` generates afresh and refreshes the bank.
+    """
+    banked, match = _bank_lookup(job_description, role_level, use_cache)
+    if banked is not None:
+        return banked
+
+    llm = get_llm(model="gpt-4o-mini", temperature=0.3)
+
+    docs = retrieve(job_description, k=4)
+    base_prompt = _build_prompt(docs, job_description, role_level)
+
+    try:
+        data = structured_invoke(llm, base_prompt, QUESTIONS_SCHEMA, use_cache=use_cache)
+    except StructuredOutputError:
+        return _failed_result()
+    except UpstreamUnavailable as e:
+        return _failed_result(f"LLM unavailable: {e}")
+
+    result = _build_result(data, role_level)
+    _bank_store(match, job_description, role_level, result, docs)
+    return result
+
+
+async def agenerate_interview_questions(job_description: str, role_level: str,
+                                        use_cache: bool = True) -> dict:
+    """Async variant of `generate_interview_questions`."""
+    banked, match = _bank_lookup(job_description, role_level, use_cache)
+    if banked is not None:
+        return banked
+
+    llm = get_llm(model="gpt-4o-mini", temperature=0.3)
+
+    docs = await aretrieve(job_description, k=4)
+    base_prompt = _build_prompt(docs, job_description, role_level)
+
+    try:
+        data = await astructured_invoke(llm, base_prompt, QUESTIONS_SCHEMA, use_cache=use_cache)
+    except StructuredOutputError:
+        return _failed_result()
+    except UpstreamUnavailable as e:
+        return _failed_result(f"LLM unavailable: {e}")
+
+    result = _build_result(data, role_level)
+    _bank_store(match, job_description, role_level, result, docs)
+    return result
@@ -5,11 +5,12 @@ Generates role-based interview questions with difficulty levels
 
 import logging
 import json
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List
 from pathlib import Path
 import core.config
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +18,7 @@ logger = logging.getLogger(__name__)
 class InterviewTool:
     """Tool for generating interview questions"""
 
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: "ChatOpenAI"):
         self.llm = llm
         self.last_reasoning = ""
         self._load_prompt()
@@ -84,6 +85,8 @@ Ensure questions are:
             logger.warning(f"Invalid difficulty level, defaulting to medium")
 
         try:
+            from langchain_core.prompts import PromptTemplate
+
             # Create prompt
             prompt = PromptTemplate(
                 template=self.prompt_template,
@@ -1,42 +1,86 @@
 import core.config  # noqa
 
-from langchain_openai import ChatOpenAI
-from core.vector_store import load_vector_store
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from core import call_policy, explanations, tracing
+from core.llm_cache import acached_invoke, cached_invoke, cached_stream
+from core.skills import get_matcher
+from core.registry import get_llm
+from core.retrieval import aretrieve, retrieve
 
 USE_LLM = True
+EXPLAIN_MAX_WORKERS = 8
+LIST_TERM_MAX_WORDS = 4
 
-def run_resume_screening(resume_text: str, job_description: str) -> dict:
-    if not resume_text or not job_description:
-        return {"error": "Resume and Job Description required."}
+_TERM_SPLIT_RE = re.compile(r"[,;\n]")
+_BULLET_RE = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)])\s+")
+_SENTENCE_END_RE = re.compile(r"[.!?](?:\s|$)")
 
-    # -----------------------------
-    # Deterministic skill logic
-    # -----------------------------
-    jd_skills = {s.strip().lower() for s in job_description.split(",")}
-    resume_skills = {s.strip().lower() for s in resume_text.split(",")}
+DETERMINISTIC_EXPLANATION = "Resume matched against job skills using deterministic logic."
+
+
+def _list_terms(text: str) -> list:
+    """
+    The items of a skill list ("Python, SQL, Stakeholder Management"), or
+    [] when the text reads as prose: an item longer than
+    `LIST_TERM_MAX_WORDS` words or one that ends a sentence inside it.
+    """
+    terms = []
+    for term in _TERM_SPLIT_RE.split(text):
+        term = _BULLET_RE.sub("", term).strip().rstrip(".")
+        if _SENTENCE_END_RE.search(term):
+            return []
+        term = " ".join(term.lower().split())
+        if len(term.split()) > LIST_TERM_MAX_WORDS:
+            return []
+        if term:
+            terms.append(term)
+    return terms
+
+
+def screening_skills(text: str) -> set:
+    """
+    Canonical skills found by the skill dictionary. When the text is a
+    skill list, its items the dictionary has no entry for ("Stakeholder
+    Management") count too, so a required skill missing from the
+    dictionary is still matched; prose ("Remote friendly team, flexible
+    hours.") only yields dictionary skills.
+    """
+    matcher = get_matcher()
+    skills = matcher.extract(text)
+    for term in _list_terms(text):
+        if not matcher.extract(term):
+            skills.add(matcher.canonical(term))
+    return skills
+
+
+def skill_match_percentage(matched: int, required: int) -> float:
+    """Share of the `required` job skills a resume covers, in percent."""
+    return round((matched / max(required, 1)) * 100, 2)
 
-    matched = jd_skills & resume_skills
-    match_percentage = round((len(matched) / max(len(jd_skills), 1)) * 100, 2)
 
-    recommendation = (
+def recommendation_for(match_percentage: float) -> str:
+    """Shortlist / Hold / Reject for a skill match percentage."""
+    return (
         "Shortlist" if match_percentage >= 75
         else "Hold" if match_percentage >= 50
         else "Reject"
     )
 
-    # -----------------------------
-    # Vector DB context
-    # -----------------------------
-    vectordb = load_vector_store()
-    docs = vectordb.similarity_search(job_description, k=2)
-    context = "\n".join([d.page_content for d in docs])
 
-    # -----------------------------
-    # LLM explanation
-    # -----------------------------
-    if USE_LLM:
-        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
-        explanation = llm.invoke(f"""
+def _retrieve_context(job_description: str) -> str:
+    docs = retrieve(job_description, k=2)
+    return "\n".join([d.page_content for d in docs])
+
+
+async def _aretrieve_context(job_description: str) -> str:
+    docs = await aretrieve(job_description, k=2)
+    return "\n".join([d.page_content for d in docs])
+
+
+def _explain_prompt(context, job_description, resume_text, match_percentage, recommendation) -> str:
+    return f"""
 Explain the resume screening decision.
 
 Context:
@@ -50,19 +94,320 @@ Resume:
 
 Match Percentage: {match_percentage}
 Recommendation: {recommendation}
-""").content
-    else:
-        explanation = "Resume matched against job skills using deterministic logic."
+"""
+
+
+def _explain(context, job_description, resume_text, match_percentage, recommendation,
+             use_cache=True) -> str:
+    llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+    prompt = _explain_prompt(context, job_description, resume_text, match_percentage, recommendation)
+    return cached_invoke(llm, prompt, use_cache=use_cache)
 
-    return {
+
+async def _aexplain(context, job_description, resume_text, match_percentage, recommendation,
+                    use_cache=True) -> str:
+    llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+    prompt = _explain_prompt(context, job_description, resume_text, match_percentage, recommendation)
+    return await acached_invoke(llm, prompt, use_cache=use_cache)
+
+
+def _score(resume_text: str, job_description: str):
+    with tracing.span("skill_extraction"):
+        jd_skills = screening_skills(job_description)
+        resume_skills = screening_skills(resume_text)
+
+    matched = jd_skills & resume_skills
+    match_percentage = skill_match_percentage(len(matched), len(jd_skills))
+    return match_percentage, recommendation_for(match_percentage)
+
+
+def _explain_mode(explain: str) -> str:
+    """Effective explain mode; `USE_LLM = False` turns every mode into "none"."""
+    if explain not in explanations.MODES:
+        raise ValueError(f"Unknown explain mode: {explain}")
+    return explain if USE_LLM else "none"
+
+
+def _defer_explanation(explain, job_description, resume_text, match_percentage, recommendation,
+                       use_cache=True) -> str:
+    """Register the retrieval + LLM explanation for later; returns its handle."""
+    def run():
+        context = _retrieve_context(job_description)
+        return _explain(
+            context, job_description, resume_text, match_percentage, recommendation,
+            use_cache=use_cache
+        )
+
+    register = explanations.submit if explain == "background" else explanations.defer
+    return register(run, source="resume_screening")
+
+
+def _explanation_reasoning(explain: str) -> list:
+    if explain == "inline":
+        return ["Retrieved HR evaluation context from vector DB", "Used LLM for explanation"]
+    if explain == "background":
+        return ["LLM explanation started in the background; fetch it by explanation_handle"]
+    if explain == "lazy":
+        return ["LLM explanation deferred until requested by explanation_handle"]
+    if explain == "unavailable":
+        return ["LLM unavailable; used the deterministic explanation"]
+    return ["Skipped LLM explanation"]
+
+
+def _screening_result(match_percentage, recommendation, explanation,
+                      explain: str = "inline", handle: str = None) -> dict:
+    result = {
         "match_percentage": match_percentage,
         "recommendation": recommendation,
         "explanation": explanation,
         "reasoning": [
             "Extracted skills from job description",
             "Extracted skills from resume",
-            "Calculated overlap",
-            "Retrieved HR evaluation context from vector DB",
-            "Used LLM for explanation"
-        ]
+            "Calculated overlap"
+        ] + _explanation_reasoning(explain)
+    }
+    if handle is not None:
+        result["explanation_handle"] = handle
+    return result
+
+
+def _deferred_result(explain, job_description, resume_text, match_percentage, recommendation,
+                     use_cache=True) -> dict:
+    """Result for explain modes other than "inline": no retrieval or LLM call now."""
+    if explain == "none":
+        return _screening_result(match_percentage, recommendation, DETERMINISTIC_EXPLANATION, explain)
+
+    handle = _defer_explanation(
+        explain, job_description, resume_text, match_percentage, recommendation, use_cache
+    )
+    return _screening_result(match_percentage, recommendation, None, explain, handle)
+
+
+def run_resume_screening(resume_text: str, job_description: str, use_cache: bool = True,
+                         explain: str = "inline") -> dict:
+    """
+    Score a resume against a job description and explain the verdict.
+
+    Args:
+        explain: "inline" waits for the LLM explanation; "background" starts
+            it and returns an `explanation_handle` at once; "lazy" returns a
+            handle and only calls the LLM when it is fetched
+            (`core.explanations.get_explanation`); "none" skips it.
+    """
+    if not resume_text or not job_description:
+        return {"error": "Resume and Job Description required."}
+    try:
+        explain = _explain_mode(explain)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    # -----------------------------
+    # Deterministic skill logic
+    # -----------------------------
+    match_percentage, recommendation = _score(resume_text, job_description)
+
+    if explain != "inline":
+        return _deferred_result(
+            explain, job_description, resume_text, match_percentage, recommendation, use_cache
+        )
+
+    # -----------------------------
+    # Vector DB context
+    # -----------------------------
+    context = _retrieve_context(job_description)
+
+    # -----------------------------
+    # LLM explanation
+    # -----------------------------
+    try:
+        explanation = _explain(
+            context, job_description, resume_text, match_percentage, recommendation,
+            use_cache=use_cache
+        )
+    except call_policy.UpstreamUnavailable:
+        return _screening_result(match_percentage, recommendation, DETERMINISTIC_EXPLANATION, "unavailable")
+
+    return _screening_result(match_percentage, recommendation, explanation)
+
+
+async def arun_resume_screening(resume_text: str, job_description: str,
+                                use_cache: bool = True, explain: str = "inline") -> dict:
+    """Async variant of `run_resume_screening`."""
+    if not resume_text or not job_description:
+        return {"error": "Resume and Job Description required."}
+    try:
+        explain = _explain_mode(explain)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    match_percentage, recommendation = _score(resume_text, job_description)
+
+    if explain != "inline":
+        return _deferred_result(
+            explain, job_description, resume_text, match_percentage, recommendation, use_cache
+        )
+
+    context = await _aretrieve_context(job_description)
+    try:
+        explanation = await _aexplain(
+            context, job_description, resume_text, match_percentage, recommendation,
+            use_cache=use_cache
+        )
+    except call_policy.UpstreamUnavailable:
+        return _screening_result(match_percentage, recommendation, DETERMINISTIC_EXPLANATION, "unavailable")
+
+    return _screening_result(match_percentage, recommendation, explanation)
+
+
+def stream_resume_screening(resume_text: str, job_description: str, use_cache: bool = True,
+                            explain: str = "inline"):
+    """
+    Streaming variant of `run_resume_screening`.
+
+    The deterministic score is yielded first as a `partial` event, then the
+    LLM explanation as `token` events, then the full `result`. With a
+    deferred `explain` mode there are no token events.
+    """
+    if not resume_text or not job_description:
+        yield {"type": "result", "result": {"error": "Resume and Job Description required."}}
+        return
+    try:
+        explain = _explain_mode(explain)
+    except ValueError as e:
+        yield {"type": "result", "result": {"error": str(e)}}
+        return
+
+    match_percentage, recommendation = _score(resume_text, job_description)
+    yield {
+        "type": "partial",
+        "fields": {"match_percentage": match_percentage, "recommendation": recommendation}
     }
+
+    if explain != "inline":
+        yield {"type": "result", "result": _deferred_result(
+            explain, job_description, resume_text, match_percentage, recommendation, use_cache
+        )}
+        return
+
+    context = _retrieve_context(job_description)
+
+    llm = get_llm(model="gpt-4o-mini", temperature=0.2)
+    prompt = _explain_prompt(context, job_description, resume_text, match_percentage, recommendation)
+    parts = []
+    try:
+        for chunk in cached_stream(llm, prompt, use_cache=use_cache):
+            parts.append(chunk)
+            yield {"type": "token", "text": chunk}
+    except call_policy.UpstreamUnavailable:
+        yield {"type": "result", "result": _screening_result(
+            match_percentage, recommendation, DETERMINISTIC_EXPLANATION, "unavailable"
+        )}
+        return
+    explanation = "".join(parts)
+
+    yield {"type": "result", "result": _screening_result(match_percentage, recommendation, explanation)}
+
+
+def run_resume_screening_batch(resumes, job_description: str, explain_top_k: int = 5,
+                               use_cache: bool = True, explain: str = "inline"):
+    """
+    Screen many resumes against one job description.
+
+    Returns a generator yielding one result per resume in rank order
+    (highest match first); raises ValueError at once when the input is
+    invalid. The job description is parsed and retrieved
+    once; only the top `explain_top_k` candidates get an LLM explanation,
+    generated concurrently. With `explain` "background" or "lazy" those
+    candidates get an `explanation_handle` instead and the ranking is
+    yielded without waiting on the LLM (see `run_resume_screening`).
+    """
+    resumes = list(resumes)
+    if not resumes or not job_description:
+        raise ValueError("Resumes and Job Description required.")
+    explain = _explain_mode(explain) if explain_top_k > 0 else "none"
+    return _screen_batch(resumes, job_description, max(explain_top_k, 0), use_cache, explain)
+
+
+def _screen_batch(resumes, job_description, explain_top_k, use_cache, explain="inline"):
+    # -----------------------------
+    # Shared JD work (once per batch)
+    # -----------------------------
+    jd_skills = screening_skills(job_description)
+
+    # -----------------------------
+    # Matching (one dictionary pass per resume)
+    # -----------------------------
+    with tracing.span("skill_matching", resumes=len(resumes)):
+        matched = [len(jd_skills & screening_skills(resume_text or "")) for resume_text in resumes]
+        order = sorted(range(len(resumes)), key=lambda i: -matched[i])
+
+    use_llm = explain != "none"
+    context = _retrieve_context(job_description) if explain == "inline" else ""
+
+    def _scored(idx):
+        pct = skill_match_percentage(matched[idx], len(jd_skills))
+        return pct, recommendation_for(pct)
+
+    # -----------------------------
+    # Concurrent explanations for top K
+    # -----------------------------
+    top = [i for i in order[:explain_top_k] if resumes[i]] if use_llm else []
+    handles = {}
+    if explain != "inline":
+        handles = {
+            idx: _defer_explanation(
+                explain, job_description, resumes[idx], *_scored(idx), use_cache=use_cache
+            )
+            for idx in top
+        }
+        top = []
+
+    pool = ThreadPoolExecutor(max_workers=min(len(top), EXPLAIN_MAX_WORKERS)) if top else None
+    futures = {
+        idx: pool.submit(
+            tracing.propagate(_explain), context, job_description, resumes[idx], *_scored(idx),
+            use_cache=use_cache
+        )
+        for idx in top
+    }
+
+    try:
+        for rank, idx in enumerate(order, start=1):
+            match_percentage, recommendation = _scored(idx)
+            reasoning = [
+                "Extracted skills from job description once for the batch",
+                "Extracted skills from resume",
+                "Calculated overlap",
+                f"Ranked {rank} of {len(resumes)}"
+            ]
+
+            handle = handles.get(idx)
+            if idx in futures:
+                try:
+                    explanation = futures.pop(idx).result()
+                    reasoning += _explanation_reasoning("inline")
+                except call_policy.UpstreamUnavailable:
+                    explanation = DETERMINISTIC_EXPLANATION
+                    reasoning += _explanation_reasoning("unavailable")
+            elif handle is not None:
+                explanation = None
+                reasoning += _explanation_reasoning(explain)
+            else:
+                explanation = DETERMINISTIC_EXPLANATION
+
+            result = {
+                "rank": rank,
+                "index": idx,
+                "match_percentage": match_percentage,
+                "recommendation": recommendation,
+                "explanation": explanation,
+                "reasoning": reasoning
+            }
+            if handle is not None:
+                result["explanation_handle"] = handle
+            yield result
+    finally:
+        for future in futures.values():
+            future.cancel()
+        if pool is not None:
+            pool.shutdown(wait=False)
@@ -0,0 +1,436 @@
+"""
+Stage-level tracing and latency metrics.
+
+`trace(intent)` wraps one agent request; `span(name)` times one stage of
+it (registry init, embedding, retrieval, LLM call, JSON parsing, ...) and
+may carry attributes such as token counts. Finished traces feed
+per-intent and per-stage latency histograms, are kept in a short history
+(`recent_traces()`), optionally appended to a JSONL file
+(`config.TRACE_LOG_PATH`) and can be exported in Prometheus text format.
+`last_trace()` is the latest trace finished in the caller's own context
+(thread or task), so concurrent sessions never see each other's.
+
+Tracing is off unless `config.TRACING_ENABLED` is set or `enable()` is
+called; while off, `span()` and `trace()` return a shared no-op object.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from core import config
+
+_enabled = config.TRACING_ENABLED
+_current = contextvars.ContextVar("hr_agent_trace", default=None)
+_last = contextvars.ContextVar("hr_agent_last_trace", default=None)
+
+UNTRACED = "none"
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(flag: bool = True):
+    """Switch tracing on or off at runtime."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+# =================================================
+# Histograms
+# =================================================
+class Histogram:
+    """
+    Log-linear histogram of durations in microseconds.
+
+    Each power of two is split into 16 linear buckets, so a percentile is
+    reported within ~6% of the true value in constant memory.
+    """
+
+    SUB_BUCKETS = 16
+    _SHIFT = 4  # log2(SUB_BUCKETS)
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @classmethod
+    def _index(cls, micros: int) -> int:
+        if micros < cls.SUB_BUCKETS:
+            return micros
+        exponent = micros.bit_length() - cls._SHIFT - 1
+        return (exponent + 1) * cls.SUB_BUCKETS + (micros >> exponent) - cls.SUB_BUCKETS
+
+    @classmethod
+    def _upper(cls, index: int) -> int:
+        if index < cls.SUB_BUCKETS:
+            return index
+        exponent = index // cls.SUB_BUCKETS - 1
+        sub = index % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return ((sub + 1) << exponent) - 1
+
+    def record(self, seconds: float):
+        micros = max(int(seconds * 1e6), 0)
+        index = self._index(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._upper(index) / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p95_ms": round(self.percentile(95) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+
+_lock = threading.Lock()
+_requests = {}
+_stages = {}
+_tokens = {}
+_history = deque(maxlen=config.TRACE_HISTORY)
+
+
+def _record_stage(intent: str, name: str, seconds: float, attrs: dict):
+    with _lock:
+        hist = _stages.get((intent, name))
+        if hist is None:
+            hist = _stages[(intent, name)] = Histogram()
+        hist.record(seconds)
+        for key in ("input_tokens", "output_tokens"):
+            if key in attrs:
+                counters = _tokens.setdefault(intent, {"input_tokens": 0, "output_tokens": 0})
+                counters[key] += attrs[key]
+
+
+# =================================================
+# Spans and traces
+# =================================================
+class _NoOp:
+    """Stand-in returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def mark(self, name: str):
+        pass
+
+
+_NOOP = _NoOp()
+
+
+class Span:
+    __slots__ = ("name", "attrs", "_trace", "_start")
+
+    def __init__(self, name: str, attrs: dict, trace):
+        self.name = name
+        self.attrs = attrs
+        self._trace = trace
+        self._start = 0.0
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def mark(self, name: str):
+        """Record the time since the span started as attribute `name` (ms)."""
+        self.attrs[name] = round((time.perf_counter() - self._start) * 1000, 3)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+
+        trace = self._trace
+        if trace is None:
+            _record_stage(UNTRACED, self.name, seconds, self.attrs)
+        else:
+            trace.spans.append({
+                "name": self.name,
+                "start_ms": round((self._start - trace.started) * 1000, 3),
+                "duration_ms": round(seconds * 1000, 3),
+                **self.attrs
+            })
+        return False
+
+
+class Trace:
+    """All spans of one agent request."""
+
+    __slots__ = ("id", "intent", "attrs", "spans", "started", "timestamp", "duration_ms", "_token")
+
+    def __init__(self, intent: str, attrs: dict):
+        self.id = os.urandom(8).hex()
+        self.intent = intent
+        self.attrs = attrs
+        self.spans = []
+        self.started = 0.0
+        self.timestamp = 0.0
+        self.duration_ms = None
+        self._token = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.timestamp = time.time()
+        self.started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.started
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Exited from another context (e.g. a generator closed elsewhere)
+            pass
+
+        self.duration_ms = round(seconds * 1000, 3)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _finish(self, seconds)
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.id,
+            "intent": self.intent,
+            "timestamp": self.timestamp,
+            "duration_ms": self.duration_ms,
+            "attrs": dict(self.attrs),
+            "spans": list(self.spans)
+        }
+
+
+def _finish(trace: Trace, seconds: float):
+    spans = list(trace.spans)
+    record = trace.to_dict()
+    _last.set(record)
+
+    with _lock:
+        hist = _requests.get(trace.intent)
+        if hist is None:
+            hist = _requests[trace.intent] = Histogram()
+        hist.record(seconds)
+        _history.append(record)
+
+    for s in spans:
+        _record_stage(trace.intent, s["name"], s["duration_ms"] / 1000, s)
+
+    if config.TRACE_LOG_PATH:
+        line = json.dumps(record, default=str) + "\n"
+        with _lock, open(config.TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def span(name: str, **attrs):
+    """Time one stage: `with span("llm", model=...) as s: ...; s.set(...)`."""
+    if not _enabled:
+        return _NOOP
+    return Span(name, attrs, _current.get())
+
+
+def event(name: str, **attrs):
+    """Record a zero-length span, e.g. a cache hit."""
+    if _enabled:
+        with Span(name, attrs, _current.get()):
+            pass
+
+
+def trace(intent: str, **attrs):
+    """Group the spans of one request under `intent`."""
+    if not _enabled:
+        return _NOOP
+    return Trace(intent, attrs)
+
+
+def current_trace():
+    return _current.get() if _enabled else None
+
+
+def propagate(fn):
+    """Wrap `fn` so spans it records on a worker thread join the caller's trace."""
+    current = current_trace()
+    if current is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _current.set(current)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run
+
+
+def usage(message) -> dict:
+    """Token counts reported with an LLM response, if any."""
+    meta = getattr(message, "usage_metadata", None) or {}
+    return {
+        key: meta[key] for key in ("input_tokens", "output_tokens") if key in meta
+    }
+
+
+# =================================================
+# Reporting
+# =================================================
+def last_trace():
+    """The latest trace finished in the calling context, or None."""
+    return _last.get()
+
+
+def recent_traces() -> list:
+    with _lock:
+        return list(_history)
+
+
+def summary() -> dict:
+    """Per-intent request latency and per-stage latency percentiles."""
+    with _lock:
+        return {
+            "requests": {intent: h.summary() for intent, h in sorted(_requests.items())},
+            "stages": {
+                f"{intent}/{name}": h.summary() for (intent, name), h in sorted(_stages.items())
+            },
+            "tokens": {intent: dict(c) for intent, c in sorted(_tokens.items())},
+            "startup": {"config_import_ms": round(config.LOAD_SECONDS * 1000, 3)}
+        }
+
+
+def export_jsonl(path) -> int:
+    """Write the retained traces to `path`, one per line; returns the count."""
+    traces = recent_traces()
+    with open(path, "w", encoding="utf-8") as f:
+        for record in traces:
+            f.write(json.dumps(record, default=str) + "\n")
+    return len(traces)
+
+
+def prometheus_label(value: str) -> str:
+    """`value` escaped for use inside a quoted Prometheus label."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def summary_lines(metric: str, labels: str, hist: Histogram) -> list:
+    """Prometheus summary lines (p50/p95/p99, sum, count) of `hist` under `labels`."""
+    lines = [
+        f'{metric}{{{labels},quantile="{q / 100}"}} {hist.percentile(q):.6f}'
+        for q in (50, 95, 99)
+    ]
+    lines.append(f"{metric}_sum{{{labels}}} {hist.total:.6f}")
+    lines.append(f"{metric}_count{{{labels}}} {hist.count}")
+    return lines
+
+
+def prometheus() -> str:
+    """Current metrics in Prometheus text exposition format."""
+    lines = [
+        "# HELP hr_agent_request_seconds Agent request latency by intent.",
+        "# TYPE hr_agent_request_seconds summary"
+    ]
+    with _lock:
+        for intent, hist in sorted(_requests.items()):
+            lines += summary_lines("hr_agent_request_seconds", f'intent="{prometheus_label(intent)}"', hist)
+
+        lines += [
+            "# HELP hr_agent_stage_seconds Latency of one pipeline stage by intent.",
+            "# TYPE hr_agent_stage_seconds summary"
+        ]
+        for (intent, name), hist in sorted(_stages.items()):
+            labels = f'intent="{prometheus_label(intent)}",stage="{prometheus_label(name)}"'
+            lines += summary_lines("hr_agent_stage_seconds", labels, hist)
+
+        lines += [
+            "# HELP hr_agent_llm_tokens_total LLM tokens reported by the provider.",
+            "# TYPE hr_agent_llm_tokens_total counter"
+        ]
+        for intent, counters in sorted(_tokens.items()):
+            for kind, value in counters.items():
+                lines.append(
+                    f'hr_agent_llm_tokens_total{{intent="{prometheus_label(intent)}",kind="{kind}"}} {value}'
+                )
+
+    from core import singleflight
+
+    lines += [
+        "# HELP hr_agent_singleflight_total Agent requests by intent: calls, executions and "
+        "calls coalesced into an identical in-flight execution.",
+        "# TYPE hr_agent_singleflight_total counter"
+    ]
+    for intent, counters in sorted(singleflight.stats()["by_intent"].items()):
+        for kind, value in counters.items():
+            lines.append(f'hr_agent_singleflight_total{{intent="{prometheus_label(intent)}",kind="{kind}"}} {value}')
+
+    from core import call_policy
+
+    upstreams = call_policy.stats()
+    lines += [
+        "# HELP hr_agent_upstream_calls_total Upstream (LLM, embedding, vector search) calls "
+        "by outcome, including hedged duplicates fired and won and calls rejected by an "
+        "open circuit.",
+        "# TYPE hr_agent_upstream_calls_total counter"
+    ]
+    for upstream, counters in sorted(upstreams.items()):
+        for kind in ("calls", "ok", "errors", "timeouts", "rejected", "hedges_fired", "hedges_won"):
+            lines.append(
+                f'hr_agent_upstream_calls_total{{upstream="{upstream}",kind="{kind}"}} {counters[kind]}'
+            )
+    lines += [
+        "# HELP hr_agent_circuit_open Whether an upstream's circuit breaker is failing fast "
+        "(1 open, 0.5 half-open, 0 closed).",
+        "# TYPE hr_agent_circuit_open gauge"
+    ]
+    for upstream, counters in sorted(upstreams.items()):
+        value = {"open": 1, "half_open": 0.5}.get(counters["breaker"], 0)
+        lines.append(f'hr_agent_circuit_open{{upstream="{upstream}"}} {value}')
+
+    lines += [
+        "# HELP hr_agent_config_import_seconds Time spent loading core.config.",
+        "# TYPE hr_agent_config_import_seconds gauge",
+        f"hr_agent_config_import_seconds {config.LOAD_SECONDS:.6f}"
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Forget all recorded metrics and traces."""
+    with _lock:
+        _requests.clear()
+        _stages.clear()
+        _tokens.clear()
+        _history.clear()
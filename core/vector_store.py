@@ -1,39 +1,256 @@
+import hashlib
+import json
 import os
-from langchain_community.vectorstores import Chroma
-from langchain_text_splitters import CharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
+
+from core import config, registry
 
 
 VECTOR_DB_DIR = "vector_db"
 DATA_DIR = "data/hr_knowledge"
+EMBEDDING_MODEL = "text-embedding-3-small"
+MANIFEST_PATH = os.path.join(VECTOR_DB_DIR, "manifest.json")
+NUMPY_INDEX_DIR = os.path.join(VECTOR_DB_DIR, "numpy")
+JOURNAL_PATH = os.path.join(VECTOR_DB_DIR, "build_journal.jsonl")
+BM25_PATH = os.path.join(VECTOR_DB_DIR, "bm25.json")
+
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+
+_corpus_version = (None, None)  # ((manifest mtime, size), content hash)
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _chunk_id(file: str, chunk: str) -> str:
+    return _sha256(f"{file}\x00{chunk}".encode("utf-8"))
+
+
+def _build_settings() -> dict:
+    return {
+        "backend": config.VECTOR_BACKEND,
+        "embedding_model": EMBEDDING_MODEL,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP
+    }
+
+
+def _load_manifest():
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_manifest(manifest: dict):
+    os.makedirs(VECTOR_DB_DIR, exist_ok=True)
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def corpus_version():
+    """
+    Content hash of the built knowledge base, or None before the first
+    build. Unlike `registry.vector_store_version()` it is the same in every
+    process and across restarts, for caches persisted to disk.
+    """
+    global _corpus_version
+    try:
+        stat = os.stat(MANIFEST_PATH)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    if _corpus_version[0] != key:
+        manifest = _load_manifest()
+        digest = None if manifest is None else _sha256(json.dumps(manifest, sort_keys=True).encode("utf-8"))
+        _corpus_version = (key, digest and digest[:16])
+    return _corpus_version[1]
+
+
+def _source_files() -> dict:
+    return {
+        file: os.path.join(DATA_DIR, file)
+        for file in sorted(os.listdir(DATA_DIR))
+        if file.endswith(".txt")
+    }
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_vector_store(embeddings=None, batch_size: int = None, concurrency: int = None,
+                       progress=None) -> dict:
+    """
+    Incrementally sync `vector_db/` with the `.txt` files in DATA_DIR.
 
+    A manifest of per-file and per-chunk content hashes records what is
+    already embedded; only new or changed chunks are embedded and chunks of
+    changed or removed files are deleted. Changed files are chunked as a
+    stream and embedded in batches by `core.embedding_pipeline`; a build
+    that fails partway resumes from its progress journal. The BM25 index
+    used by hybrid retrieval (`core.bm25`) is updated with the same
+    chunks. Returns a summary of the changes.
 
-def build_vector_store():
-    texts = []
+    Args:
+        embeddings: embedding client (default: the shared registry client)
+        batch_size, concurrency: see `embedding_pipeline.embed_chunks`
+        progress: optional callable(stats) invoked as batches are stored
+    """
+    from core.bm25 import BM25Index
+    from core.embedding_pipeline import PrecomputedEmbeddings, ProgressJournal, embed_chunks, stream_chunks
 
-    for file in os.listdir(DATA_DIR):
-        if file.endswith(".txt"):
-            with open(os.path.join(DATA_DIR, file), "r", encoding="utf-8") as f:
-                texts.append(f.read())
+    manifest = _load_manifest()
+    settings = _build_settings()
 
-    splitter = CharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    docs = splitter.create_documents(texts)
+    full_rebuild = manifest is None or manifest.get("settings") != settings
+    previous = {} if full_rebuild else manifest["files"]
 
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    paths = _source_files()
+    file_hashes = {file: _file_sha256(path) for file, path in paths.items()}
 
-    vectordb = Chroma.from_documents(
-        docs,
-        embedding=embeddings,
-        persist_directory=VECTOR_DB_DIR
+    summary = {
+        "files_unchanged": 0,
+        "files_changed": 0,
+        "files_removed": 0,
+        "chunks_added": 0,
+        "chunks_removed": 0,
+        "chunks_resumed": 0,
+        "full_rebuild": full_rebuild,
+        "bm25_rebuilt": False
+    }
+
+    index = None if full_rebuild else BM25Index.load(BM25_PATH)
+    if index is None:
+        # No (usable) lexical index yet: index unchanged files too
+        index = BM25Index()
+        summary["bm25_rebuilt"] = True
+
+    def _index_file(file):
+        for chunk in stream_chunks(paths[file], CHUNK_SIZE, CHUNK_OVERLAP):
+            chunk_id = _chunk_id(file, chunk)
+            index.add(chunk_id, chunk, {"source": file, "chunk_id": chunk_id})
+
+    # -----------------------------
+    # Fast path: nothing changed
+    # -----------------------------
+    if not full_rebuild and file_hashes == {f: e["sha256"] for f, e in previous.items()}:
+        summary["files_unchanged"] = len(file_hashes)
+        if summary["bm25_rebuilt"]:
+            for file in paths:
+                _index_file(file)
+            index.save(BM25_PATH)
+        return summary
+
+    journal = ProgressJournal(JOURNAL_PATH).open(settings)
+    if embeddings is None:
+        embeddings = registry.get_embeddings()
+    # Stores written through add_texts reuse the vectors embed_chunks computed
+    vectordb = load_vector_store(PrecomputedEmbeddings(embeddings))
+
+    if full_rebuild and not journal.resumed:
+        # Unknown contents (legacy build or changed settings): start clean
+        vectordb.delete_collection()
+        vectordb = load_vector_store(PrecomputedEmbeddings(embeddings))
+
+    files = {}
+    to_remove = set()
+    changed = []
+    for file in paths:
+        entry = previous.get(file)
+        if entry and entry["sha256"] == file_hashes[file]:
+            files[file] = entry
+            summary["files_unchanged"] += 1
+            if summary["bm25_rebuilt"]:
+                _index_file(file)
+        else:
+            changed.append(file)
+
+    def _new_chunks():
+        for file in changed:
+            old_ids = set(previous[file]["chunks"]) if file in previous else set()
+            ids = {}
+            for chunk in stream_chunks(paths[file], CHUNK_SIZE, CHUNK_OVERLAP):
+                chunk_id = _chunk_id(file, chunk)
+                if chunk_id in ids:
+                    continue
+                ids[chunk_id] = None
+                metadata = {"source": file, "chunk_id": chunk_id}
+                index.add(chunk_id, chunk, metadata)
+                if chunk_id not in old_ids:
+                    yield chunk_id, chunk, metadata
+
+            to_remove.update(old_ids - ids.keys())
+            files[file] = {"sha256": file_hashes[file], "chunks": list(ids)}
+            summary["files_changed"] += 1
+
+    # -----------------------------
+    # Embed and store new chunks
+    # -----------------------------
+    stats = embed_chunks(
+        _new_chunks(), vectordb, embeddings, journal=journal,
+        batch_size=batch_size, concurrency=concurrency, progress=progress
     )
+    # Chunks stored by an interrupted earlier build count as resumed, not added
+    summary["chunks_added"] = stats["chunks_embedded"]
+    summary["chunks_resumed"] = stats["chunks_skipped"]
+    summary["embedding"] = stats
+
+    for file, entry in previous.items():
+        if file not in paths:
+            to_remove |= set(entry["chunks"])
+            summary["files_removed"] += 1
 
-    vectordb.persist()
-    return vectordb
+    # Chunks stored by an interrupted build whose source has changed since
+    wanted = {chunk_id for entry in files.values() for chunk_id in entry["chunks"]}
+    to_remove |= journal.done - wanted
 
+    if to_remove:
+        vectordb.delete(ids=sorted(to_remove))
+        for chunk_id in to_remove:
+            index.remove(chunk_id)
+    summary["chunks_removed"] = len(to_remove)
+
+    index.save(BM25_PATH)
+    _save_manifest({"settings": settings, "files": files})
+    journal.clear()
+
+    # Tools hold a shared handle; make them reopen the rebuilt store
+    registry.invalidate_vector_store()
+    return summary
+
+
+def load_vector_store(embeddings=None):
+    """Open the configured backend (`config.VECTOR_BACKEND`)."""
+    if embeddings is None:
+        embeddings = registry.get_embeddings()
+
+    if config.VECTOR_BACKEND == "numpy":
+        from core.numpy_store import NumpyVectorStore
+
+        return NumpyVectorStore(NUMPY_INDEX_DIR, embeddings)
+
+    if config.VECTOR_BACKEND != "chroma":
+        raise ValueError(f"Unknown VECTOR_BACKEND: {config.VECTOR_BACKEND}")
+
+    from langchain_community.vectorstores import Chroma
 
-def load_vector_store():
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
     return Chroma(
         persist_directory=VECTOR_DB_DIR,
         embedding_function=embeddings
     )
+
+
+def similarity_search_many(vectordb, queries, k: int = 4) -> list:
+    """Batched search; backends without a batched call answer one by one."""
+    if hasattr(vectordb, "similarity_search_many"):
+        return vectordb.similarity_search_many(queries, k)
+    return [vectordb.similarity_search(q, k=k) for q in queries]
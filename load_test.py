@@ -0,0 +1,133 @@
+"""
+Replay a JSONL mix of agent requests at a target request rate.
+
+Each input line is {"intent": "<intent>", "payload": {...}}, the format
+run_batch.py reads. Requests are sent open-loop at --qps (or ramping to
+--ramp-to) for --duration seconds; the JSON report holds throughput,
+error rate and latency percentiles overall, per intent and per second.
+
+    python load_test.py data/load_mix.jsonl --qps 20 --duration 60 --mode async --fake --llm-latency 0.4 --llm-p99 2
+    python load_test.py traffic.jsonl --qps 5 --ramp-to 50 --duration 120 --concurrency 64 --output ramp.json
+    python load_test.py traffic.jsonl --qps 20 --duration 60 --output new.json --baseline ramp.json
+    python load_test.py data/load_mix.jsonl --qps 50 --duration 30 --mode http --target http://127.0.0.1:8080
+"""
+
+import argparse
+import json
+import sys
+
+from core import config
+from core.load_generator import MODES, compare, load_mix, run_load, save_report
+
+
+def _progress(every):
+    def report(dispatched, total):
+        if dispatched % every == 0 or dispatched == total:
+            print(f"  {dispatched}/{total} requests sent", file=sys.stderr)
+    return report
+
+
+def _print_summary(report):
+    overall = report["overall"]
+    print(
+        f"{report['offered']} requests at {report['offered_qps']} req/s offered "
+        f"({report['config']['mode']}): {overall['throughput_rps']} req/s done, "
+        f"{overall['error_rate']:.1%} errors"
+    )
+    print(f"{'intent':<28}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in [("(all)", overall)] + list(report["intents"].items()):
+        latency = stats["latency_ms"]
+        print(
+            f"{name:<28}{stats['requests']:>9}{stats['errors']:>8}"
+            f"{latency.get('p50_ms', 0):>10.1f}{latency.get('p95_ms', 0):>10.1f}"
+            f"{latency.get('p99_ms', 0):>10.1f}{latency.get('max_ms', 0):>10.1f}"
+        )
+    lag = report["generator"]["max_dispatch_lag_ms"]
+    if lag > 50:
+        print(f"warning: the generator fell up to {lag:.0f}ms behind its schedule", file=sys.stderr)
+
+
+def _print_comparison(rows):
+    print(f"\n{'scope':<28}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>9}")
+    for row in rows:
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "-"
+        print(
+            f"{row['scope']:<28}{row['metric']:<16}"
+            f"{str(row['baseline']):>12}{str(row['current']):>12}{change:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("mix", help="JSONL file of {intent, payload} records, replayed round-robin")
+    parser.add_argument("--qps", type=float, required=True, help="request rate (start rate when ramping)")
+    parser.add_argument("--ramp-to", type=float, default=None, help="final rate of a linear ramp")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic")
+    parser.add_argument("--mode", choices=MODES, default="sync")
+    parser.add_argument("--target", default=None, help="server URL for --mode http (see serve.py)")
+    parser.add_argument("--concurrency", type=int, default=32,
+                        help="worker threads (sync/stream/http) or in-flight cap (async, 0 for none)")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of evenly spaced")
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds left out of the report")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="disable the LLM and semantic answer caches")
+    parser.add_argument("--fake", action="store_true", help="use local stand-ins instead of OpenAI")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="fake LLM latency (median) in s")
+    parser.add_argument("--llm-p99", type=float, default=None, help="fake LLM p99 latency (lognormal) in s")
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--chunk-latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of fake calls that fail")
+    parser.add_argument("--output", default=None, help="write the JSON report here (default stdout)")
+    parser.add_argument("--baseline", default=None, help="earlier report to compare against")
+    args = parser.parse_args()
+
+    if args.mode == "http" and (args.fake or not args.target):
+        parser.error("--mode http needs --target; pass --fake and latencies to serve.py instead")
+
+    if args.no_cache:
+        config.LLM_CACHE_ENABLED = False
+        config.SEMANTIC_CACHE_ENABLED = False
+
+    fake = None
+    if args.fake:
+        fake = {
+            "llm_latency": args.llm_latency,
+            "llm_p99": args.llm_p99,
+            "embed_latency": args.embed_latency,
+            "chunk_latency": args.chunk_latency,
+            "failure_rate": args.failure_rate,
+            "seed": args.seed
+        }
+
+    report = run_load(
+        load_mix(args.mix),
+        qps=args.qps,
+        duration=args.duration,
+        mode=args.mode,
+        ramp_to=args.ramp_to,
+        concurrency=args.concurrency,
+        poisson=args.poisson,
+        warmup=args.warmup,
+        fake=fake,
+        seed=args.seed,
+        target=args.target,
+        progress=_progress(max(int(args.qps * 10), 1))
+    )
+    report["config"]["mix"] = args.mix
+    report["config"]["caches"] = not args.no_cache
+
+    if args.output:
+        save_report(report, args.output)
+        _print_summary(report)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        _print_comparison(compare(baseline, report))
+
+
+if __name__ == "__main__":
+    main()
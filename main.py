@@ -9,7 +9,8 @@ ROOT_DIR = os.path.abspath(os.path.dirname(__file__))
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
-from core.agent import run_agent, Intent
+from core import tracing
+from core.agent import run_agent, stream_agent, Intent
 
 # -------------------------------------------------
 # Streamlit Config
@@ -35,6 +36,9 @@ page = st.sidebar.radio(
     ]
 )
 
+debug = st.sidebar.checkbox("Debug: trace requests", value=tracing.enabled())
+tracing.enable(debug)
+
 # =================================================
 # Feature 1: Resume Screening
 # =================================================
@@ -46,33 +50,105 @@ if page == "Resume Screening":
         height=200
     )
 
+    uploaded_files = st.file_uploader(
+        "...or upload resumes (PDF, DOCX, TXT)",
+        type=["pdf", "docx", "txt"],
+        accept_multiple_files=True
+    )
+
     job_description = st.text_area(
         "Paste Job Description",
         height=200
     )
 
-    if st.button("Analyze Resume"):
-        result = run_agent(
+    add_to_pool = st.checkbox("Add uploaded resumes to the candidate pool", value=False)
+
+    analyze = st.button("Analyze Resume")
+
+    if analyze and uploaded_files:
+        from core.ingestion import screen_documents
+
+        with st.spinner(f"Reading {len(uploaded_files)} documents..."):
+            # The ranking returns at once; explanations are generated only
+            # for the candidates someone asks about
+            st.session_state["screening"] = screen_documents(
+                [(f.name, f.getvalue()) for f in uploaded_files],
+                job_description,
+                explain="lazy",
+                add_to_pool=add_to_pool
+            )
+
+    elif analyze:
+        score_box = st.empty()
+        explanation_box = st.empty()
+        explanation = ""
+
+        # Score is deterministic and shown at once; the explanation streams in
+        for event in stream_agent(
             intent=Intent.RESUME_SCREENING,
             payload={
                 "resume_text": resume_text,
                 "job_description": job_description
             }
-        )
+        ):
+            if event["type"] == "partial":
+                with score_box.container():
+                    st.metric("Skill Match Percentage", f"{event['fields']['match_percentage']}%")
+                    st.write("**AI Recommendation:**", event["fields"]["recommendation"])
+                    st.subheader("Explanation")
+            elif event["type"] == "token":
+                explanation += event["text"]
+                explanation_box.write(explanation + "▌")
+            else:
+                result = event["result"]
 
         if "error" in result:
+            score_box.empty()
+            explanation_box.empty()
             st.error(result["error"])
         else:
-            st.metric("Skill Match Percentage", f"{result['match_percentage']}%")
-            st.write("**AI Recommendation:**", result["recommendation"])
-
-            st.subheader("Explanation")
-            st.write(result["explanation"])
+            explanation_box.write(result["explanation"])
 
             st.subheader("Reasoning Trace")
             for r in result["reasoning"]:
                 st.write("•", r)
 
+    # Kept across reruns so "Explain" clicks do not lose the ranking
+    screening = st.session_state.get("screening") if uploaded_files else None
+    if screening is not None:
+        for failure in screening.get("failed", []):
+            st.warning(f"Could not read {failure['name']}: {failure['error']}")
+
+        if "error" in screening:
+            st.error(screening["error"])
+        else:
+            st.subheader("Ranked Candidates")
+            st.dataframe(
+                [
+                    {
+                        "rank": r["rank"],
+                        "file": r["name"],
+                        "match %": r["match_percentage"],
+                        "recommendation": r["recommendation"]
+                    }
+                    for r in screening["results"]
+                ],
+                hide_index=True
+            )
+
+            explained = st.session_state.setdefault("explanations", {})
+            for r in screening["results"]:
+                handle = r.get("explanation_handle")
+                if handle is None:
+                    continue
+                with st.expander(f"#{r['rank']} {r['name']}"):
+                    if handle not in explained and st.button("Explain this decision", key=handle):
+                        with st.spinner("Generating explanation..."):
+                            fetched = run_agent(Intent.EXPLANATION, {"handle": handle})
+                        explained[handle] = fetched.get("explanation") or fetched.get("error")
+                    if handle in explained:
+                        st.write(explained[handle])
+
 # =================================================
 # Feature 2: Interview Question Generator
 # =================================================
@@ -140,7 +216,9 @@ elif page == "Interview Evaluation":
     )
 
     if st.button("Evaluate Interview"):
-        result = run_agent(
+        progress_box = st.empty()
+
+        for event in stream_agent(
             intent=Intent.INTERVIEW_EVALUATION,
             payload={
                 "question": question,
@@ -148,7 +226,18 @@ elif page == "Interview Evaluation":
                 "job_description": job_description,
                 "role_level": role_level       # ✅ FIXED
             }
-        )
+        ):
+            if event["type"] == "partial":
+                fields = event["fields"]
+                with progress_box.container():
+                    if "overall_score" in fields:
+                        st.metric("Overall Score", f"{fields['overall_score']}/100")
+                    for s in fields.get("strengths", []):
+                        st.write("•", s)
+            elif event["type"] == "result":
+                result = event["result"]
+
+        progress_box.empty()
 
         if "error" in result:
             st.error(result["error"])
@@ -186,16 +275,25 @@ elif page == "HR Q&A Chatbot":
     )
 
     if st.button("Ask"):
-        result = run_agent(
+        st.subheader("Answer")
+        answer_box = st.empty()
+        answer = ""
+
+        for event in stream_agent(
             intent=Intent.HR_QA,
             payload={"question": question}
-        )
+        ):
+            if event["type"] == "token":
+                answer += event["text"]
+                answer_box.write(answer + "▌")
+            elif event["type"] == "result":
+                result = event["result"]
 
         if "error" in result:
+            answer_box.empty()
             st.error(result["error"])
         else:
-            st.subheader("Answer")
-            st.write(result["answer"])
+            answer_box.write(result["answer"])
 
             st.metric("Confidence", result["confidence"])
             st.write("**Source:**", result["source"])
@@ -203,3 +301,44 @@ elif page == "HR Q&A Chatbot":
             st.subheader("Reasoning")
             for r in result["reasoning"]:
                 st.write("•", r)
+
+# =================================================
+# Debug panel: spans of the last traced request
+# =================================================
+if debug:
+    # Kept per session: a rerun without a request shows the previous trace
+    last = tracing.last_trace() or st.session_state.get("last_trace")
+    st.session_state["last_trace"] = last
+    with st.sidebar.expander("Last request trace", expanded=True):
+        if last is None:
+            st.caption("No traced request yet.")
+        else:
+            st.write(f"**{last['intent']}** · {last['duration_ms']} ms")
+            st.dataframe(
+                [
+                    {
+                        "stage": s["name"],
+                        "start (ms)": s["start_ms"],
+                        "duration (ms)": s["duration_ms"],
+                        "details": ", ".join(
+                            f"{k}={v}" for k, v in s.items()
+                            if k not in ("name", "start_ms", "duration_ms")
+                        )
+                    }
+                    for s in last["spans"]
+                ],
+                hide_index=True
+            )
+
+    with st.sidebar.expander("Latency by intent"):
+        st.json(tracing.summary()["requests"])
+
+    with st.sidebar.expander("Coalesced requests"):
+        from core import singleflight
+
+        st.json(singleflight.stats())
+
+    with st.sidebar.expander("Upstream calls"):
+        from core import call_policy
+
+        st.json(call_policy.stats())
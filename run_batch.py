@@ -0,0 +1,77 @@
+"""
+Run a JSONL file of agent requests offline.
+
+Each input line is {"intent": "<intent>", "payload": {...}} with an
+optional "id". Results are written to the output JSONL; an interrupted run
+resumes from its checkpoint when started again with the same arguments.
+
+    python run_batch.py screenings.jsonl results.jsonl --workers 16
+    python run_batch.py evals.jsonl out.jsonl --mode process --unordered
+"""
+
+import argparse
+import os
+import sys
+
+from core.batch_runner import run_batch
+
+
+def _progress(every):
+    def report(summary):
+        if summary["processed"] % every == 0:
+            print(
+                f"  {summary['processed']} processed, {summary['written']} written, "
+                f"{summary['errors']} errors",
+                file=sys.stderr
+            )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", help="JSONL file of {intent, payload} records")
+    parser.add_argument("output", help="JSONL file for results")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--unordered", action="store_true",
+                        help="write results as they complete instead of in input order")
+    parser.add_argument("--window", type=int, default=None,
+                        help="maximum records in flight (default 4 per worker)")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default <output>.ckpt)")
+    parser.add_argument("--checkpoint-every", type=int, default=100)
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+    parser.add_argument("--fake", action="store_true", help="use local stand-ins instead of OpenAI")
+    parser.add_argument("--progress-every", type=int, default=1000)
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint or f"{args.output}.ckpt"
+    if args.restart:
+        for path in (args.output, checkpoint):
+            if os.path.exists(path):
+                os.remove(path)
+
+    summary = run_batch(
+        args.input,
+        args.output,
+        workers=args.workers,
+        mode=args.mode,
+        ordered=not args.unordered,
+        window=args.window,
+        checkpoint_path=checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        fake=args.fake,
+        progress=_progress(max(args.progress_every, 1))
+    )
+
+    if summary.get("already_complete"):
+        print(f"{args.input} was already fully processed into {args.output} (use --restart to rerun)")
+    else:
+        print(
+            f"Processed {summary['processed']} records in {summary['seconds']}s "
+            f"({summary['written']} written, {summary['errors']} errors, "
+            f"{summary['skipped']} already done)"
+        )
+
+
+if __name__ == "__main__":
+    main()
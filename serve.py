@@ -0,0 +1,92 @@
+"""
+Serve the agent over HTTP/JSON for the ATS and other non-Streamlit clients.
+
+Each intent is POST /v1/<intent> with the same JSON payload run_batch.py
+reads; add ?stream=1 for NDJSON events. GET /health reports warm/cold
+state, GET /ready turns 200 once warm and GET /metrics exports Prometheus
+metrics. Requests beyond --workers running plus --queue-depth waiting get 429.
+
+    python serve.py --port 8080 --workers 32 --queue-depth 64
+    python serve.py --fake --llm-latency 0.4 --llm-p99 2 --workers 8 --queue-depth 16
+
+    curl -s localhost:8080/v1/hr_qa -d '{"question": "How many vacation days do I get?"}'
+"""
+
+import argparse
+import sys
+
+from core import config
+from core.server import make_server, start
+
+
+def _install_fakes(args):
+    from core.fakes import install_fakes, lognormal_latency
+
+    llm_latency = args.llm_latency
+    if args.llm_p99 and llm_latency:
+        llm_latency = lognormal_latency(llm_latency, args.llm_p99, seed=args.seed)
+    install_fakes(
+        llm_latency=llm_latency,
+        embed_latency=args.embed_latency,
+        chunk_latency=args.chunk_latency,
+        failure_rate=args.failure_rate
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVER_WORKERS,
+                        help="agent requests executed at once")
+    parser.add_argument("--queue-depth", type=int, default=config.SERVER_QUEUE_DEPTH,
+                        help="requests allowed to wait for a worker before 429")
+    parser.add_argument("--keepalive", type=float, default=config.SERVER_KEEPALIVE_SECONDS,
+                        help="idle seconds before a keep-alive connection is closed")
+    parser.add_argument("--max-connections", type=int, default=config.SERVER_MAX_CONNECTIONS)
+    parser.add_argument("--lazy", action="store_true",
+                        help="build clients on the first request instead of at startup")
+    parser.add_argument("--access-log", action="store_true", help="log every request to stderr")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="disable the LLM and semantic answer caches")
+    parser.add_argument("--fake", action="store_true", help="use local stand-ins instead of OpenAI")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="fake LLM latency (median) in s")
+    parser.add_argument("--llm-p99", type=float, default=None, help="fake LLM p99 latency (lognormal) in s")
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--chunk-latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of fake calls that fail")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.no_cache:
+        config.LLM_CACHE_ENABLED = False
+        config.SEMANTIC_CACHE_ENABLED = False
+    if args.fake:
+        _install_fakes(args)
+
+    server = make_server(
+        args.host,
+        args.port,
+        workers=args.workers,
+        queue_depth=args.queue_depth,
+        keepalive=args.keepalive,
+        max_connections=args.max_connections,
+        access_log=args.access_log
+    )
+    host, port = server.server_address[:2]
+    print(
+        f"Serving on http://{host}:{port} ({args.workers} workers, queue depth {args.queue_depth}"
+        f"{', fake backends' if args.fake else ''})",
+        file=sys.stderr
+    )
+    thread = start(server, warm=not args.lazy)
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        print("Shutting down, draining queued requests", file=sys.stderr)
+        server.shutdown()
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from core import (  # noqa: E402
+    call_policy, config, llm_cache, question_bank, registry, resume_store, retrieval, semantic_cache, singleflight
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    """Keep every test away from the repo's .cache/ and shared singletons."""
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(config, "RESUME_POOL_DIR", tmp_path / "resume_pool")
+    monkeypatch.setattr(resume_store, "_store", None)
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "SEMANTIC_CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "QUESTION_BANK_ENABLED", False)
+    monkeypatch.setattr(semantic_cache, "_cache", None)
+    llm_cache.set_cache(None)
+    question_bank.set_bank(None)
+    retrieval.clear()
+    singleflight.reset()
+    call_policy.reset()
+    yield
+    llm_cache.set_cache(None)
+    question_bank.set_bank(None)
+    retrieval.clear()
+    registry.restore_defaults()
+
+
+@pytest.fixture
+def fakes():
+    """Registry pointed at the local stand-ins (no latency)."""
+    from core.fakes import install_fakes
+
+    install_fakes()
+    return registry
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from core import batch_runner
+
+LINES = 12
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def requests_file(tmp_path):
+    path = tmp_path / "requests.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(LINES):
+            if n == 4:
+                f.write("not json\n")
+            else:
+                record = {"id": f"r{n}", "intent": "hr_qa", "payload": {"question": f"Leave policy {n}?"}}
+                f.write(json.dumps(record) + "\n")
+    return path
+
+
+def _interrupt_after(count):
+    def progress(summary):
+        if summary["processed"] >= count:
+            raise Interrupted()
+    return progress
+
+
+def _lines(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["line"] for line in f]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_resume_after_interrupt_loses_and_duplicates_nothing(requests_file, tmp_path, ordered):
+    output = tmp_path / "out.jsonl"
+    with pytest.raises(Interrupted):
+        batch_runner.run_batch(requests_file, output, workers=2, ordered=ordered, checkpoint_every=2,
+                               fake=True, progress=_interrupt_after(5))
+    assert len(_lines(output)) < LINES
+
+    summary = batch_runner.run_batch(requests_file, output, workers=2, ordered=ordered, fake=True)
+
+    assert summary["complete"]
+    assert summary["skipped"] > 0
+    assert sorted(_lines(output)) == list(range(1, LINES + 1))
+    if ordered:
+        assert _lines(output) == list(range(1, LINES + 1))
+
+
+def test_output_past_the_checkpoint_is_dropped_on_resume(requests_file, tmp_path):
+    output = tmp_path / "out.jsonl"
+    with pytest.raises(Interrupted):
+        batch_runner.run_batch(requests_file, output, workers=1, fake=True, progress=_interrupt_after(3))
+    with open(output, "ab") as f:
+        f.write(b'{"line": 99, "result": {"answer": "half-writ')  # killed mid-write
+
+    batch_runner.run_batch(requests_file, output, workers=1, fake=True)
+
+    assert _lines(output) == list(range(1, LINES + 1))
+
+
+def test_finished_run_is_not_repeated(requests_file, tmp_path):
+    output = tmp_path / "out.jsonl"
+    batch_runner.run_batch(requests_file, output, workers=2, fake=True)
+    size = output.stat().st_size
+
+    summary = batch_runner.run_batch(requests_file, output, workers=2, fake=True)
+
+    assert summary["already_complete"]
+    assert output.stat().st_size == size
+
+
+def test_checkpoint_of_another_input_is_refused(requests_file, tmp_path):
+    output = tmp_path / "out.jsonl"
+    batch_runner.run_batch(requests_file, output, workers=1, fake=True)
+    other = tmp_path / "other.jsonl"
+    other.write_text(requests_file.read_text())
+
+    with pytest.raises(ValueError):
+        batch_runner.run_batch(other, output, workers=1, fake=True)
+
+
+def test_deferred_explanations_are_run_inline_and_handles_refused(tmp_path):
+    source = tmp_path / "requests.jsonl"
+    records = [
+        {"intent": "resume_screening", "payload": {
+            "resume_text": "Python and SQL developer.",
+            "job_description": "Python, SQL",
+            "explain": "lazy"
+        }},
+        {"intent": "explanation", "payload": {"handle": "expl_0123"}},
+    ]
+    source.write_text("".join(json.dumps(r) + "\n" for r in records))
+    output = tmp_path / "out.jsonl"
+
+    batch_runner.run_batch(source, output, workers=1, fake=True)
+
+    screened, fetched = [json.loads(line) for line in output.read_text().splitlines()]
+    assert "explanation_handle" not in screened["result"]
+    assert screened["result"]["explanation"]
+    assert "cannot be fetched" in fetched["error"]
@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from core import call_policy, config
+from core.fakes import FakeRateLimitError, FakeUpstreamError
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    monkeypatch.setattr(config, "BREAKER_FAILURES", 2)
+    monkeypatch.setattr(config, "BREAKER_COOLDOWN_SECONDS", 0.05)
+    return call_policy.CallPolicy("test", "LLM_TIMEOUT_SECONDS")
+
+
+def _fail():
+    raise FakeUpstreamError("connection reset")
+
+
+def _open(policy):
+    for _ in range(config.BREAKER_FAILURES):
+        with pytest.raises(call_policy.UpstreamError):
+            policy.call(_fail)
+
+
+def test_breaker_opens_after_consecutive_failures(policy):
+    _open(policy)
+
+    with pytest.raises(call_policy.CircuitOpenError):
+        policy.call(lambda: "ok")
+    assert policy.stats()["breaker"] == "open"
+    assert policy.stats()["rejected"] == 1
+
+
+def test_half_open_probe_success_closes_the_breaker(policy):
+    _open(policy)
+    time.sleep(config.BREAKER_COOLDOWN_SECONDS)
+
+    assert policy.call(lambda: "ok") == "ok"
+    assert policy.stats()["breaker"] == "closed"
+    assert policy.call(lambda: "again") == "again"
+
+
+def test_half_open_probe_failure_reopens_the_breaker(policy):
+    _open(policy)
+    time.sleep(config.BREAKER_COOLDOWN_SECONDS)
+
+    with pytest.raises(call_policy.UpstreamError):
+        policy.call(_fail)
+    assert policy.stats()["breaker"] == "open"
+    assert policy.stats()["breaker_opens"] == 2
+    with pytest.raises(call_policy.CircuitOpenError):
+        policy.call(lambda: "ok")
+
+
+def test_half_open_admits_a_single_probe(policy):
+    _open(policy)
+    time.sleep(config.BREAKER_COOLDOWN_SECONDS)
+    now = time.monotonic()
+
+    assert policy.breaker.allow(now)
+    assert not policy.breaker.allow(now)
+
+
+def test_programming_errors_propagate_unwrapped_and_keep_the_breaker_closed(policy):
+    def buggy():
+        return {}["missing"]
+
+    for _ in range(config.BREAKER_FAILURES + 1):
+        with pytest.raises(KeyError):
+            policy.call(buggy)
+    with pytest.raises(TypeError):
+        policy.call(len, 1, 2)
+
+    assert policy.stats()["breaker"] == "closed"
+    assert policy.call(lambda: "ok") == "ok"
+
+
+def test_provider_errors_are_wrapped():
+    assert call_policy.is_upstream_failure(FakeRateLimitError())
+    assert call_policy.is_upstream_failure(TimeoutError())
+    assert not call_policy.is_upstream_failure(ValueError("bad argument"))
+
+
+def test_stream_errors_follow_the_same_rules(policy):
+    def broken_stream():
+        yield "a"
+        raise FakeUpstreamError("stream dropped")
+
+    def buggy_stream():
+        yield "a"
+        raise TypeError("bad chunk")
+
+    with pytest.raises(call_policy.UpstreamError):
+        list(policy.stream(broken_stream))
+    with pytest.raises(TypeError):
+        list(policy.stream(buggy_stream))
+    assert policy.breaker.failures == 1
+
+
+def test_llm_is_not_hedged_by_default():
+    assert "llm" not in config.HEDGE_UPSTREAMS
+    assert call_policy.policy("llm")._hedge_delay() is None
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core import concurrency, llm_cache, structured_output
+from core.fakes import FakeLLM
+
+
+@pytest.fixture
+def two_slots(monkeypatch):
+    monkeypatch.setattr(concurrency, "_slots", concurrency._Slots(2))
+
+
+def _wait_until_free(timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while concurrency.in_flight() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return concurrency.in_flight()
+
+
+def test_cap_is_shared_by_threads_and_event_loops(two_slots):
+    seen = []
+    lock = threading.Lock()
+
+    def reply(prompt):
+        with lock:
+            seen.append(concurrency.in_flight())
+        return "ok"
+
+    llm = FakeLLM(reply=reply, latency=0.02)
+
+    def sync_caller():
+        for n in range(3):
+            llm_cache.cached_invoke(llm, f"sync {threading.get_ident()} {n}")
+
+    def loop_caller():
+        async def run():
+            await asyncio.gather(*(
+                llm_cache.acached_invoke(llm, f"async {threading.get_ident()} {n}") for n in range(3)
+            ))
+        asyncio.run(run())
+
+    threads = [threading.Thread(target=fn) for fn in (sync_caller, sync_caller, loop_caller, loop_caller)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(seen) == 12
+    assert max(seen) <= 2
+    assert concurrency.in_flight() == 0
+
+
+def test_abandoned_stream_gives_its_slot_back(two_slots):
+    llm = FakeLLM(reply="x" * 64, chunk_size=8)
+    stream = llm_cache.cached_stream(llm, "prompt")
+
+    assert next(stream) == "x" * 8
+    assert _wait_until_free() == 0  # generator still alive and suspended
+    stream.close()
+
+
+def test_abandoned_structured_chunks_give_their_slot_back(two_slots):
+    chunks = structured_output._chunks(FakeLLM(reply='{"a": 1}', chunk_size=2), "prompt")
+
+    next(chunks)
+    assert _wait_until_free() == 0
+    chunks.close()
+
+
+def test_slot_release_is_idempotent(two_slots):
+    slot = concurrency.acquire_slot()
+    slot.release()
+    slot.release()
+
+    assert concurrency.in_flight() == 0
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from core import embedding_pipeline
+from core.embedding_pipeline import ProgressJournal, embed_chunks
+from core.fakes import FakeEmbeddings, FakeRateLimitError
+
+SETTINGS = {"chunk_size": 500, "model": "fake"}
+CHUNKS = [(f"c{n}", f"Policy paragraph number {n}.", {"source": "policy.txt"}) for n in range(20)]
+
+
+class Store:
+    def __init__(self):
+        self.ids = []
+
+    def add_embeddings(self, ids, texts, vectors, metadatas):
+        self.ids.extend(ids)
+
+
+class Outage(Exception):
+    pass
+
+
+class FailingEmbeddings(FakeEmbeddings):
+    """Fails every batch from the `fail_on`-th request on (1-based)."""
+
+    def __init__(self, fail_on=None):
+        super().__init__()
+        self.fail_on = fail_on
+        self.texts = []
+
+    def embed_documents(self, texts):
+        if self.fail_on is not None and self.calls + 1 >= self.fail_on:
+            raise Outage("provider down")
+        self.texts.extend(texts)
+        return super().embed_documents(texts)
+
+
+def _embed(journal, store, embeddings):
+    return embed_chunks(CHUNKS, store, embeddings, journal=journal,
+                        batch_size=4, concurrency=1, flush_chunks=4)
+
+
+def test_failed_build_resumes_without_reembedding_or_duplicates(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    store = Store()
+
+    with pytest.raises(Outage):
+        _embed(ProgressJournal(path).open(SETTINGS), store, FailingEmbeddings(fail_on=3))
+    assert store.ids == [c[0] for c in CHUNKS[:8]]
+
+    journal = ProgressJournal(path).open(SETTINGS)
+    embeddings = FailingEmbeddings()
+    stats = _embed(journal, store, embeddings)
+
+    assert journal.resumed
+    assert stats["chunks_skipped"] == 8
+    assert len(embeddings.texts) == len(CHUNKS) - 8
+    assert sorted(store.ids) == sorted(c[0] for c in CHUNKS)
+    assert len(store.ids) == len(set(store.ids))
+
+
+def test_torn_last_journal_line_is_ignored(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = ProgressJournal(str(path)).open(SETTINGS)
+    journal.record(["c0", "c1"])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"ids": ["c2", "c')  # crashed mid-append
+
+    assert ProgressJournal(str(path)).open(SETTINGS).done == {"c0", "c1"}
+
+
+def test_journal_of_other_settings_starts_over(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    ProgressJournal(str(path)).open(SETTINGS).record(["c0"])
+
+    journal = ProgressJournal(str(path)).open(dict(SETTINGS, chunk_size=800))
+
+    assert not journal.resumed
+    assert journal.done == set()
+    assert json.loads(path.read_text().splitlines()[0])["settings"]["chunk_size"] == 800
+
+
+def test_rate_limited_batch_is_retried(monkeypatch):
+    monkeypatch.setattr(embedding_pipeline, "BACKOFF_BASE_SECONDS", 0.001)
+    embeddings = FakeEmbeddings()
+    real = embeddings.embed_documents
+    throttled = []
+
+    def embed_documents(texts):
+        if not throttled:
+            throttled.append(texts)
+            raise FakeRateLimitError(retry_after=0.001)
+        return real(texts)
+
+    embeddings.embed_documents = embed_documents
+    store = Store()
+    stats = embed_chunks(CHUNKS, store, embeddings, batch_size=4, concurrency=4)
+
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+    assert sorted(store.ids) == sorted(c[0] for c in CHUNKS)
+
+
+class TextOnlyStore:
+    """A store like langchain Chroma: rows go in through `add_texts` only."""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.vectors = {}
+
+    def add_texts(self, texts, metadatas=None, ids=None):
+        for chunk_id, vector in zip(ids, self.embeddings.embed_documents(texts)):
+            self.vectors[chunk_id] = vector
+        return ids
+
+
+def test_text_only_store_reuses_the_precomputed_vectors():
+    embeddings = FakeEmbeddings()
+    store = TextOnlyStore(embedding_pipeline.PrecomputedEmbeddings(embeddings))
+
+    stats = embed_chunks(CHUNKS, store, embeddings, batch_size=4, concurrency=1)
+
+    assert stats["chunks_embedded"] == len(CHUNKS)
+    assert embeddings.calls == stats["batches"]
+    assert store.vectors["c3"] == FakeEmbeddings().embed_documents([CHUNKS[3][1]])[0]
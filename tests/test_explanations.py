@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from core import explanations
+
+
+@pytest.fixture
+def gate():
+    release = threading.Event()
+    yield release
+    release.set()
+
+
+def test_background_handle_is_pending_then_ready(gate):
+    handle = explanations.submit(lambda: gate.wait(2) and "Strong Python match.")
+
+    assert explanations.get_explanation(handle, wait=False)["status"] == "pending"
+    assert explanations.get_explanation(handle, timeout=0.01)["status"] == "pending"
+    gate.set()
+    assert explanations.get_explanation(handle) == {
+        "handle": handle, "status": "ready", "explanation": "Strong Python match."
+    }
+
+
+def test_lazy_handle_runs_once_on_the_first_waiting_fetch():
+    calls = []
+    handle = explanations.defer(lambda: calls.append(1) or "Lacks SQL.")
+
+    assert explanations.get_explanation(handle, wait=False)["status"] == "pending"
+    assert calls == []
+    assert explanations.get_explanation(handle)["explanation"] == "Lacks SQL."
+    assert explanations.get_explanation(handle)["explanation"] == "Lacks SQL."
+    assert calls == [1]
+
+
+def test_failed_explanation_is_reported_and_a_lazy_one_retried():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("LLM unreachable")
+        return "Recovered."
+
+    handle = explanations.defer(flaky)
+
+    assert explanations.get_explanation(handle) == {"error": "Explanation failed: LLM unreachable"}
+    assert explanations.get_explanation(handle)["explanation"] == "Recovered."
+
+
+def test_unknown_and_evicted_handles_are_errors(monkeypatch):
+    monkeypatch.setattr(explanations.config, "EXPLANATION_HANDLES", 1)
+    first = explanations.defer(lambda: "first")
+    explanations.defer(lambda: "second")
+
+    assert "error" in explanations.get_explanation("expl_missing")
+    assert "error" in explanations.get_explanation(first)
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import pytest
+
+from core import ingestion
+
+RESUME = "Jane Doe\n\nSkills: Python, SQL, Docker\nBuilt pay-\nroll APIs."
+CORRUPT_PDF = b"%PDF-1.7\n1 0 obj << /Type /Catalog >> truncated"
+
+
+@pytest.fixture
+def resumes(tmp_path):
+    directory = tmp_path / "resumes"
+    directory.mkdir()
+    (directory / "jane.txt").write_text(RESUME)
+    (directory / "broken.pdf").write_bytes(CORRUPT_PDF)
+    return directory
+
+
+def _by_name(documents):
+    return {Path(doc["name"]).name: doc for doc in documents}
+
+
+def test_unchanged_content_is_served_from_the_cache(resumes, monkeypatch):
+    first = _by_name(ingestion.ingest([resumes], workers=0))["jane.txt"]
+
+    def fail(data):
+        raise AssertionError("extracted again")
+
+    monkeypatch.setitem(ingestion._EXTRACTORS, ".txt", fail)
+    again = list(ingestion.ingest([resumes / "jane.txt", ("renamed.txt", RESUME.encode())], workers=0))
+
+    assert first["text"] == "Jane Doe\n\nSkills: Python, SQL, Docker\nBuilt payroll APIs."
+    assert not first["cached"]
+    assert all(doc["cached"] and doc["text"] == first["text"] for doc in again)
+    assert again[0]["sha256"] == again[1]["sha256"] == first["sha256"]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_corrupt_pdf_is_reported_without_stopping_the_others(resumes, monkeypatch, workers):
+    monkeypatch.setattr(ingestion, "PROCESS_POOL_MIN_FILES", 2)
+
+    documents = _by_name(ingestion.ingest([resumes], workers=workers))
+
+    assert documents["broken.pdf"]["text"] is None
+    assert documents["broken.pdf"]["error"]
+    assert documents["jane.txt"]["error"] is None
+    assert "Python" in documents["jane.txt"]["text"]
+    assert not (ingestion._cache_path(
+        ingestion.config.CACHE_DIR / "extracted", documents["broken.pdf"]["sha256"]
+    )).exists()
+
+
+def test_screening_lists_unreadable_documents(fakes, resumes):
+    result = ingestion.screen_documents([resumes], "Python, SQL", workers=0, explain="none")
+
+    assert [Path(r["name"]).name for r in result["results"]] == ["jane.txt"]
+    assert [Path(f["name"]).name for f in result["failed"]] == ["broken.pdf"]
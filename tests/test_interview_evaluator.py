@@ -0,0 +1,69 @@
+import asyncio
+import json
+import re
+
+import pytest
+
+from core.fakes import FakeLLM
+from core.tools import interview_evaluator
+
+PAIRS = [
+    {"question": "What is a REST API?", "answer": "An HTTP interface over resources"},
+    {"question": "What is an index?", "answer": "A lookup structure"},
+    {"question": "Why test?", "answer": ""},
+    {"question": "What is a race condition?", "answer": "Two threads touching shared state unsynchronized"},
+]
+BROKEN = "A lookup structure"
+
+
+def _evaluation(answer: str) -> dict:
+    words = len(answer.split())
+    return {"base_score": 40 + 10 * words, "strengths": [f"{words} words"], "weaknesses": [],
+            "reasoning": f"Scored '{answer}'."}
+
+
+def reply(prompt: str) -> str:
+    """Scores each answer by its length; packed replies garble the BROKEN answer."""
+    answers = re.findall(r"Candidate Answer:\n(.*)\n", prompt)
+    if '"evaluations"' not in prompt:
+        return json.dumps(_evaluation(answers[0]))
+    evaluations = []
+    for pair, answer in enumerate(answers, start=1):
+        entry = dict(_evaluation(answer), pair=pair)
+        if answer == BROKEN:
+            entry["base_score"] = "high"
+        evaluations.append(entry)
+    return json.dumps({"evaluations": evaluations})
+
+
+@pytest.fixture
+def llm(fakes):
+    model = FakeLLM(reply=reply)
+    fakes.configure(llm=lambda model_name, temperature: model)
+    return model
+
+
+def _evaluate(**kwargs):
+    return interview_evaluator.evaluate_interview_batch(PAIRS, "Backend engineer", "Mid", **kwargs)
+
+
+def test_packed_scoring_matches_per_item_scoring(llm):
+    single = _evaluate()
+    single_calls = llm.calls
+    packed = _evaluate(packed=True, pack_size=3)
+
+    assert packed["results"] == single["results"]
+    assert packed["aggregate"] == single["aggregate"]
+    assert single_calls == 3
+    # One packed call for the three answers, then a re-score of the garbled one
+    assert llm.calls - single_calls == 2
+
+
+def test_async_packed_scoring_matches_per_item_scoring(llm):
+    single = asyncio.run(interview_evaluator.aevaluate_interview_batch(PAIRS, "Backend engineer", "Mid"))
+    packed = asyncio.run(interview_evaluator.aevaluate_interview_batch(
+        PAIRS, "Backend engineer", "Mid", packed=True, pack_size=3
+    ))
+
+    assert packed["results"] == single["results"]
+    assert single["results"][2]["weaknesses"] == ["No answer provided"]
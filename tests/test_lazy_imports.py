@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY_MODULES = (
+    "langchain_openai",
+    "langchain_community",
+    "langchain_core",
+    "langchain_text_splitters",
+    "chromadb",
+    "numpy",
+    "openai",
+)
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    """Run `code` in a fresh interpreter without an OpenAI key."""
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env["PYTHONPATH"] = ROOT_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          env=env, cwd=ROOT_DIR, timeout=60)
+
+
+def _loaded_heavy(code: str) -> list:
+    proc = _run(code + "\nimport json, sys; print(json.dumps(sorted(sys.modules)))")
+    assert proc.returncode == 0, proc.stderr
+    loaded = set(json.loads(proc.stdout.splitlines()[-1]))
+    return sorted(m for m in HEAVY_MODULES if m in loaded)
+
+
+def test_importing_the_agent_needs_no_key_and_loads_no_heavy_modules():
+    assert _loaded_heavy("import core.agent") == []
+
+
+def test_fake_run_never_loads_the_openai_client():
+    heavy = _loaded_heavy(
+        "from core.fakes import install_fakes\n"
+        "from core.agent import Intent, run_agent\n"
+        "install_fakes()\n"
+        "assert 'answer' in run_agent(Intent.HR_QA, {'question': 'Annual leave?'})"
+    )
+
+    assert "openai" not in heavy
+    assert "langchain_openai" not in heavy
+
+
+@pytest.mark.skipif(os.path.exists(os.path.join(ROOT_DIR, ".env")), reason=".env may set the key")
+def test_missing_key_is_reported_on_first_use():
+    proc = _run("from core import config\nconfig.OPENAI_API_KEY")
+
+    assert proc.returncode != 0
+    assert "OPENAI_API_KEY not found" in proc.stderr
+
@@ -0,0 +1,81 @@
+from core import config, llm_cache, registry
+from core.fakes import FakeLLM, install_fakes
+
+
+def test_key_depends_on_model_temperature_and_prompt():
+    base = llm_cache.make_key("gpt-4o-mini", 0.2, "prompt")
+
+    assert base == llm_cache.make_key("gpt-4o-mini", 0.2, "prompt")
+    assert base != llm_cache.make_key("gpt-4o", 0.2, "prompt")
+    assert base != llm_cache.make_key("gpt-4o-mini", 0.3, "prompt")
+    assert base != llm_cache.make_key("gpt-4o-mini", 0.2, "prompt ")
+
+
+def test_fake_llm_never_shares_a_real_models_key():
+    class Real:
+        model_name = "gpt-4o-mini"
+        temperature = 0.2
+
+    fake = FakeLLM(model_name="gpt-4o-mini", temperature=0.2)
+
+    assert fake.model_name == "fake-gpt-4o-mini"
+    assert llm_cache.key_for(fake, "p") != llm_cache.key_for(Real(), "p")
+
+
+def test_install_fakes_keeps_replies_out_of_the_persistent_cache(monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True)
+    install_fakes()
+    llm = registry.get_llm()
+
+    llm_cache.cached_invoke(llm, "What is the notice period?")
+    llm_cache.cached_invoke(llm, "What is the notice period?")
+
+    assert llm.calls == 1
+    assert not (config.CACHE_DIR / "llm_cache.sqlite").exists()
+
+
+def test_memory_and_disk_tiers_round_trip(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    llm_cache.LLMCache(path=path).put("k", "v")
+
+    reopened = llm_cache.LLMCache(path=path)
+    assert reopened.get("k") == "v"
+    assert reopened.stats()["disk_hits"] == 1
+    assert reopened.get("k") == "v"
+    assert reopened.stats()["memory_hits"] == 1
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = llm_cache.LLMCache(path=tmp_path / "cache.sqlite", ttl_seconds=60)
+    cache.put("k", "v")
+
+    now[0] += 59
+    assert cache.get("k") == "v"
+
+    now[0] += 2
+    assert cache.get("k") is None
+    assert llm_cache.LLMCache(path=tmp_path / "cache.sqlite", ttl_seconds=60).get("k") is None
+
+
+def test_memory_tier_is_bounded():
+    cache = llm_cache.LLMCache(memory_entries=2)
+    for key in "abc":
+        cache.put(key, key)
+
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_use_cache_false_refreshes_the_entry(monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True)
+    llm_cache.set_cache(llm_cache.LLMCache())
+    llm = FakeLLM(reply="first")
+    llm_cache.cached_invoke(llm, "p")
+
+    llm.reply = "second"
+    assert llm_cache.cached_invoke(llm, "p") == "first"
+    assert llm_cache.cached_invoke(llm, "p", use_cache=False) == "second"
+    assert llm_cache.cached_invoke(llm, "p") == "second"
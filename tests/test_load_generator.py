@@ -0,0 +1,68 @@
+import pytest
+
+from core.load_generator import arrival_times, compare
+
+
+def _in(offsets, start, end):
+    return sum(1 for t in offsets if start <= t < end)
+
+
+def test_flat_rate_is_evenly_spaced():
+    offsets = arrival_times(10, 2)
+
+    assert len(offsets) == 20
+    assert offsets[:3] == pytest.approx([0.0, 0.1, 0.2])
+
+
+def test_ramp_up_follows_the_rising_rate():
+    offsets = arrival_times(0, 2, ramp_to=20)
+
+    # The rate climbs from 0 to 20/s: 5 arrivals in the first second, 15 in the second
+    assert len(offsets) == 20
+    assert (_in(offsets, 0, 1), _in(offsets, 1, 2)) == (5, 15)
+    assert offsets == sorted(offsets)
+
+
+def test_ramp_down_to_zero_ends_within_the_run():
+    offsets = arrival_times(20, 2, ramp_to=0)
+
+    assert len(offsets) == 20
+    assert (_in(offsets, 0, 1), _in(offsets, 1, 2)) == (15, 5)
+    assert offsets[-1] < 2
+
+
+def test_poisson_arrivals_match_the_rate_and_the_seed():
+    offsets = arrival_times(50, 20, poisson=True, seed=7)
+
+    # 1000 expected, standard deviation ~32
+    assert abs(len(offsets) - 1000) < 130
+    assert offsets == sorted(offsets)
+    assert 0 < offsets[0] and offsets[-1] < 20
+    assert offsets == arrival_times(50, 20, poisson=True, seed=7)
+    assert offsets != arrival_times(50, 20, poisson=True, seed=8)
+
+
+@pytest.mark.parametrize("qps, duration, ramp_to", [(-1, 1, None), (1, 0, None), (1, 1, -5)])
+def test_bad_rates_are_rejected(qps, duration, ramp_to):
+    with pytest.raises(ValueError):
+        arrival_times(qps, duration, ramp_to=ramp_to)
+
+
+def test_compare_reports_relative_changes_per_scope():
+    baseline = {
+        "overall": {"throughput_rps": 20.0, "error_rate": 0.0, "latency_ms": {"p50_ms": 100.0, "p99_ms": 400.0}},
+        "intents": {"hr_qa": {"throughput_rps": 20.0, "error_rate": 0.0, "latency_ms": {"p50_ms": 100.0}}},
+    }
+    current = {
+        "overall": {"throughput_rps": 25.0, "error_rate": 0.02, "latency_ms": {"p50_ms": 80.0, "p99_ms": 600.0}},
+        "intents": {"resume_screening": {"throughput_rps": 5.0, "error_rate": 0.0, "latency_ms": {}}},
+    }
+
+    rows = {(r["scope"], r["metric"]): r for r in compare(baseline, current)}
+
+    assert rows[("overall", "throughput_rps")]["change"] == 0.25
+    assert rows[("overall", "p50_ms")]["change"] == -0.2
+    assert rows[("overall", "p99_ms")]["change"] == 0.5
+    assert rows[("overall", "error_rate")]["change"] is None  # baseline of 0
+    assert rows[("hr_qa", "throughput_rps")]["current"] is None
+    assert rows[("resume_screening", "throughput_rps")]["baseline"] is None
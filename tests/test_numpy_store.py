@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pytest
+
+from core import numpy_store
+from core.fakes import FakeEmbeddings
+from core.numpy_store import NumpyVectorStore
+
+TEXTS = [
+    "Annual leave is 20 days per year.",
+    "Remote work requires manager approval.",
+    "Payroll runs on the last business day.",
+    "Parental leave is 16 weeks.",
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NumpyVectorStore(str(tmp_path / "index"), FakeEmbeddings())
+
+
+def _texts(docs):
+    return [d.page_content for d in docs]
+
+
+def test_search_returns_the_closest_rows_best_first(store):
+    store.add_texts(TEXTS, ids=[f"c{n}" for n in range(len(TEXTS))])
+
+    assert _texts(store.similarity_search("Parental leave weeks", k=1)) == [TEXTS[3]]
+    ranked = _texts(store.similarity_search("annual leave days", k=10))
+    assert sorted(ranked) == sorted(TEXTS)
+    assert ranked[0] == TEXTS[0]
+
+
+def test_top_k_orders_every_row_when_k_is_at_least_n():
+    scores = np.array([0.1, 0.9, -0.3, 0.5], dtype=np.float32)
+
+    assert numpy_store._top_k(scores, 4).tolist() == [1, 3, 0, 2]
+    assert numpy_store._top_k(scores, 9).tolist() == [1, 3, 0, 2]
+    assert numpy_store._top_k(scores, 0).tolist() == []
+
+
+def _records_bytes(store):
+    with open(store._path(numpy_store.RECORDS_FILE), "rb") as f:
+        return f.read()
+
+
+def test_flushes_append_without_rewriting_earlier_rows(store):
+    store.add_texts(TEXTS[:2], ids=["c0", "c1"])
+    written, capacity = _records_bytes(store), store._capacity
+
+    store.add_texts(TEXTS[2:3], ids=["c2"])
+    store.add_texts(TEXTS[3:], ids=["c3"])
+
+    assert len(store) == len(TEXTS)
+    assert _records_bytes(store).startswith(written)
+    assert store._capacity == numpy_store.GROWTH_FACTOR * capacity
+
+
+def test_reopened_index_sees_every_row(store):
+    store.add_texts(TEXTS[:2], ids=["c0", "c1"])
+    store.add_texts(TEXTS[2:], ids=["c2", "c3"])
+
+    reopened = NumpyVectorStore(store.directory, FakeEmbeddings())
+
+    assert len(reopened) == len(TEXTS)
+    assert _texts(reopened.similarity_search("Payroll last business day", k=1)) == [TEXTS[2]]
+
+
+def test_existing_ids_are_replaced_not_duplicated(store):
+    store.add_texts(TEXTS, ids=["c0", "c1", "c2", "c3"])
+    store.add_texts(["Annual leave is 25 days per year."], ids=["c0"])
+
+    reopened = NumpyVectorStore(store.directory, FakeEmbeddings())
+    assert len(reopened) == len(TEXTS)
+    assert "Annual leave is 25 days per year." in _texts(reopened.similarity_search("leave", k=10))
+    assert TEXTS[0] not in _texts(reopened.similarity_search("leave", k=10))
+
+
+def test_rows_of_an_unfinished_append_are_ignored_and_overwritten(store):
+    store.add_texts(TEXTS[:2], ids=["c0", "c1"])
+    with open(store._path(numpy_store.RECORDS_FILE), "ab") as f:
+        f.write(b'{"id": "c9", "text": "half-writ')  # crashed before meta.json was updated
+
+    reopened = NumpyVectorStore(store.directory, FakeEmbeddings())
+    assert len(reopened) == 2
+    reopened.add_texts(TEXTS[2:], ids=["c2", "c3"])
+
+    lines = _records_bytes(store).splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["c0", "c1", "c2", "c3"]
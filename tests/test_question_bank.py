@@ -0,0 +1,71 @@
+from core import config, question_bank
+from core.tools.interview_generator import generate_interview_questions
+
+POSTING = (
+    "Senior backend engineer. Python, Django, PostgreSQL, Docker, AWS. "
+    "Build and operate APIs for payroll."
+)
+
+
+def test_near_duplicate_posting_is_served_from_the_bank(fakes, monkeypatch):
+    monkeypatch.setattr(config, "QUESTION_BANK_ENABLED", True)
+    first = generate_interview_questions(POSTING, "Senior")
+    again = generate_interview_questions(POSTING + " Remote friendly.", "Senior")
+
+    assert again["reasoning"][0].startswith("Served from question bank")
+    assert again["questions"] == first["questions"]
+    assert question_bank.get_bank().stats()["entries"] == 1
+
+
+def test_install_fakes_keeps_banked_questions_out_of_the_persistent_bank(fakes, monkeypatch):
+    monkeypatch.setattr(config, "QUESTION_BANK_ENABLED", True)
+    generate_interview_questions(POSTING, "Senior")
+
+    assert not (config.CACHE_DIR / "question_bank.sqlite").exists()
+
+
+def test_questions_generated_during_a_vector_outage_are_not_banked(fakes, monkeypatch):
+    monkeypatch.setattr(config, "QUESTION_BANK_ENABLED", True)
+
+    def down(*args, **kwargs):
+        raise ConnectionError("vector store unreachable")
+
+    monkeypatch.setattr(fakes.get_vector_store(), "similarity_search", down)
+    generate_interview_questions(POSTING, "Senior")
+
+    assert question_bank.get_bank().stats()["entries"] == 0
+
+
+def test_rebuilt_knowledge_base_or_new_prompt_invalidates_banked_questions(fakes, monkeypatch, tmp_path):
+    from core import vector_store
+    from core.tools import interview_generator
+
+    monkeypatch.setattr(config, "QUESTION_BANK_ENABLED", True)
+    manifest = tmp_path / "manifest.json"
+    monkeypatch.setattr(vector_store, "MANIFEST_PATH", str(manifest))
+    manifest.write_text('{"files": {"leave.txt": {"sha256": "a"}}}')
+    generate_interview_questions(POSTING, "Senior")
+    assert generate_interview_questions(POSTING, "Senior")["reasoning"][0].startswith("Served from")
+
+    manifest.write_text('{"files": {"leave.txt": {"sha256": "bb"}}}')
+    rebuilt = generate_interview_questions(POSTING, "Senior")
+    monkeypatch.setattr(interview_generator, "PROMPT_VERSION", "edited")
+    reprompted = generate_interview_questions(POSTING, "Senior")
+
+    assert not rebuilt["reasoning"][0].startswith("Served from")
+    assert not reprompted["reasoning"][0].startswith("Served from")
+    assert question_bank.get_bank().stats()["entries"] == 1
+
+
+def test_oldest_entries_beyond_the_cap_are_evicted():
+    bank = question_bank.QuestionBank(max_entries=2)
+    postings = [f"{skill} engineer for the platform team." for skill in ("Python", "Java", "Golang")]
+    for job_description in postings:
+        bank.put(bank.match(job_description, "v1"), "Senior", {"questions": [job_description]})
+
+    assert (bank.stats()["entries"], bank.stats()["evicted"]) == (2, 1)
+    assert bank.get(bank.match(postings[0], "v1"), "Senior") is None
+    assert bank.get(bank.match(postings[2], "v1"), "Senior") == {"questions": [postings[2]]}
+
+    bank.put(bank.match(postings[0], "v2"), "Senior", {"questions": ["rebuilt"]})
+    assert (bank.stats()["entries"], bank.stats()["evicted"]) == (1, 3)
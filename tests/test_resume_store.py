@@ -0,0 +1,106 @@
+from core import config, resume_store
+from core.agent import Intent, run_agent
+from core.resume_store import ResumeStore
+
+JD = "Python, SQL, Docker"
+
+
+def _ids(result):
+    return [r["candidate_id"] for r in result["results"]]
+
+
+def test_add_search_remove_reload_through_the_agent():
+    added = run_agent(Intent.CANDIDATE_ADD, {"candidates": [
+        {"id": "ana", "resume_text": "Python, SQL, Docker"},
+        {"id": "ben", "resume_text": "Python and some SQL"},
+        {"id": "cy", "resume_text": "Java, Spring"},
+    ]})
+    assert added["pool_size"] == 3
+    assert _ids(run_agent(Intent.CANDIDATE_SEARCH, {"job_description": JD})) == ["ana", "ben"]
+
+    removed = run_agent(Intent.CANDIDATE_REMOVE, {"candidate_ids": ["ana", "nobody"]})
+    assert removed["removed"] == ["ana"] and removed["not_found"] == ["nobody"]
+    assert _ids(run_agent(Intent.CANDIDATE_SEARCH, {"job_description": JD})) == ["ben"]
+
+    # A fresh process sees the saved pool
+    resume_store._store = None
+    result = run_agent(Intent.CANDIDATE_SEARCH, {"job_description": JD})
+    assert _ids(result) == ["ben"]
+    assert len(resume_store.get_store()) == 2
+
+
+def test_adding_an_existing_id_replaces_it():
+    resume_store.add_candidates([{"id": "ana", "resume_text": "Java"}])
+    resume_store.add_candidates([{"id": "ana", "resume_text": "Python, SQL, Docker"}])
+
+    store = ResumeStore.load()
+    assert len(store) == 1
+    assert store.search(JD)[0]["match_percentage"] == 100.0
+
+
+def test_invalid_candidates_are_rejected():
+    assert "error" in run_agent(Intent.CANDIDATE_ADD, {"candidates": []})
+    assert "error" in run_agent(Intent.CANDIDATE_ADD, {"candidates": [{"resume_text": "Python"}]})
+    assert "error" in run_agent(Intent.CANDIDATE_REMOVE, {"candidate_ids": []})
+
+
+def test_screen_documents_can_add_to_the_pool():
+    from core.ingestion import screen_documents
+
+    result = screen_documents(
+        [("ana.txt", b"Python, SQL, Docker"), ("ben.txt", b"Java")], JD,
+        explain_top_k=0, use_cache=False, add_to_pool=True
+    )
+
+    assert "error" not in result
+    assert _ids(resume_store.search_candidates(JD)) == ["ana.txt"]
+
+
+def _pool_file(name):
+    return config.RESUME_POOL_DIR / name
+
+
+def test_changes_are_appended_not_rewritten():
+    resume_store.add_candidates([{"id": f"c{n}", "resume_text": "Python, SQL"} for n in range(50)])
+    resume_store.add_candidates([{"id": "late", "resume_text": "Docker"}])
+    resume_store.remove_candidates(["c1"])
+
+    assert not _pool_file("index.json").exists()
+    assert _pool_file("changes.jsonl").read_bytes().count(b"\n") == 52
+    store = ResumeStore.load()
+    assert len(store) == 50 and "late" in store and "c1" not in store
+
+
+def test_log_is_compacted_into_a_snapshot(monkeypatch):
+    monkeypatch.setattr(config, "RESUME_POOL_COMPACT_CHANGES", 3)
+    resume_store.add_candidates([{"id": "ana", "resume_text": "Python"}])
+    resume_store.add_candidates([{"id": "ben", "resume_text": "SQL"}])
+    resume_store.remove_candidates(["ana"])
+
+    assert _pool_file("index.json").exists()
+    assert _pool_file("changes.jsonl").stat().st_size == 0
+    assert ResumeStore.load()._candidate_ids == ["ben"]
+
+
+def test_changes_from_another_process_are_picked_up():
+    resume_store.add_candidates([{"id": "ana", "resume_text": "Python, SQL, Docker"}])
+    other = ResumeStore.load()  # stands in for another process's pool
+
+    other.commit([{"op": "add", "id": "ben", "skills": ["python"]}])
+    assert _ids(resume_store.search_candidates(JD)) == ["ana", "ben"]
+
+    other.commit([{"op": "remove", "id": "ana"}])
+    resume_store.add_candidates([{"id": "cy", "resume_text": "Docker"}])
+    assert sorted(resume_store.get_store()._rows) == ["ben", "cy"]
+    assert sorted(ResumeStore.load()._rows) == ["ben", "cy"]
+
+
+def test_torn_last_log_line_is_ignored():
+    resume_store.add_candidates([{"id": "ana", "resume_text": "Python"}])
+    with open(_pool_file("changes.jsonl"), "ab") as f:
+        f.write(b'{"op": "add", "id": "be')
+
+    assert sorted(ResumeStore.load()._rows) == ["ana"]
+    resume_store._store = None
+    resume_store.add_candidates([{"id": "cy", "resume_text": "Docker"}])
+    assert sorted(ResumeStore.load()._rows) == ["ana", "cy"]
@@ -0,0 +1,83 @@
+import pytest
+
+from core.tools import resume_tool
+
+
+def test_batch_ranks_by_skill_overlap(fakes):
+    resumes = ["Java, Spring", "Python, SQL, Docker", "Python"]
+    results = list(resume_tool.run_resume_screening_batch(
+        resumes, "Python, SQL, Docker", explain_top_k=0
+    ))
+
+    assert [r["index"] for r in results] == [1, 2, 0]
+    assert [r["rank"] for r in results] == [1, 2, 3]
+    assert results[0]["match_percentage"] == 100.0
+    assert results[0]["explanation"] == resume_tool.DETERMINISTIC_EXPLANATION
+
+
+@pytest.mark.parametrize("resumes, job_description, explain", [
+    ([], "Python", "inline"),
+    (["Python"], "", "inline"),
+    (["Python"], "Python", "sometimes"),
+])
+def test_batch_bad_input_raises_before_screening(resumes, job_description, explain):
+    with pytest.raises(ValueError):
+        resume_tool.run_resume_screening_batch(resumes, job_description, explain=explain)
+
+
+def test_agent_reports_bad_batch_input_as_an_error_dict():
+    from core.agent import Intent, run_agent
+
+    result = run_agent(Intent.RESUME_SCREENING_BATCH, {"resumes": [], "job_description": "Python"})
+
+    assert result == {"error": "Resumes and Job Description required."}
+
+
+def test_batch_without_explanations_starts_no_pool(fakes, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("explanation pool created")
+
+    monkeypatch.setattr(resume_tool, "ThreadPoolExecutor", fail)
+    for kwargs in ({"explain_top_k": 0}, {"explain_top_k": 3, "explain": "none"}):
+        assert len(list(resume_tool.run_resume_screening_batch(["Python"], "Python", **kwargs))) == 1
+
+
+def test_batch_explains_top_k_only(fakes):
+    results = list(resume_tool.run_resume_screening_batch(
+        ["Python", "Python, SQL", "SQL"], "Python, SQL", explain_top_k=1
+    ))
+
+    assert results[0]["index"] == 1
+    assert results[0]["explanation"] != resume_tool.DETERMINISTIC_EXPLANATION
+    assert all(r["explanation"] == resume_tool.DETERMINISTIC_EXPLANATION for r in results[1:])
+
+
+def test_skills_missing_from_the_dictionary_still_count():
+    jd = "Python, SQL, Underwater Basket Weaving, Stakeholder Management"
+
+    assert resume_tool._score("Python, SQL", jd) == (50.0, "Hold")
+    assert resume_tool._score("python, sql, stakeholder management, underwater basket weaving", jd) == (
+        100.0, "Shortlist"
+    )
+
+
+@pytest.mark.parametrize("jd", [
+    "Backend engineer. Python and SQL required, remote friendly, flexible hours.",
+    "We are a remote friendly team hiring for Python, SQL and on-call support!",
+])
+def test_prose_job_descriptions_only_require_dictionary_skills(jd):
+    assert resume_tool.screening_skills(jd) == {"python", "sql"}
+    assert resume_tool._score("Python, SQL", jd) == (100.0, "Shortlist")
+
+
+def test_bulleted_skill_lists_keep_unknown_items():
+    jd = "- Python\n- Stakeholder Management\n- Underwater Basket Weaving."
+
+    assert {"stakeholder management", "underwater basket weaving"} <= resume_tool.screening_skills(jd)
+
+
+def test_aliases_and_prose_resolve_to_dictionary_skills():
+    skills = resume_tool.screening_skills("Seasoned engineer with k8s and py experience, Docker")
+
+    assert {"kubernetes", "python", "docker"} <= skills
+    assert not any(len(s.split()) > resume_tool.LIST_TERM_MAX_WORDS for s in skills)
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from core import config, retrieval
+from core.bm25 import BM25Index
+from core.tools import hr_qa_tool
+
+POLICIES = [
+    "Employees receive 20 days of annual leave per year.",
+    "The probation period for new hires is six months.",
+    "Resignations require a notice period of 30 days.",
+]
+
+
+@pytest.fixture
+def bm25(tmp_path, monkeypatch):
+    index = BM25Index()
+    for n, text in enumerate(POLICIES):
+        index.add(f"policy-{n}", text, {"source": "policy.txt"})
+    path = str(tmp_path / "bm25.json")
+    index.save(path)
+
+    monkeypatch.setattr(retrieval, "BM25_PATH", path)
+    monkeypatch.setattr(retrieval, "_bm25", None)
+    monkeypatch.setattr(retrieval, "_bm25_mtime", None)
+    monkeypatch.setattr(config, "SEMANTIC_CACHE_ENABLED", True)
+    return index
+
+
+def _fast_paths():
+    return retrieval.stats()["lexical_fast_path"]
+
+
+def test_keyword_question_still_goes_through_the_semantic_cache(fakes, bm25):
+    before = _fast_paths()
+    first = hr_qa_tool.answer_hr_question("probation period")
+    again = hr_qa_tool.answer_hr_question("probation period")
+
+    assert first["source"] == "Vector DB + LLM"
+    assert again["source"].startswith("Semantic Cache")
+    assert fakes.get_embeddings().calls == 2  # the question, twice; no vector search
+    assert _fast_paths() == before + 1
+
+
+def test_keyword_question_needs_no_embedding_without_the_semantic_cache(fakes, bm25, monkeypatch):
+    monkeypatch.setattr(config, "SEMANTIC_CACHE_ENABLED", False)
+    before = _fast_paths()
+    result = hr_qa_tool.answer_hr_question("probation period")
+
+    assert result["source"] == "Vector DB + LLM"
+    assert fakes.get_embeddings().calls == 0
+    assert _fast_paths() == before + 1
+
+
+def test_async_and_stream_take_the_same_fast_path(fakes, bm25):
+    before = _fast_paths()
+    asyncio.run(hr_qa_tool.aanswer_hr_question("annual leave"))
+    events = list(hr_qa_tool.stream_hr_question("notice period"))
+
+    assert events[-1]["result"]["source"] == "Vector DB + LLM"
+    assert fakes.get_embeddings().calls == 2
+    assert _fast_paths() == before + 2
+
+
+def test_unsure_lexical_match_fuses_with_the_vector_search(fakes, bm25):
+    embeddings = fakes.get_embeddings()
+    before = retrieval.stats()
+    hr_qa_tool.answer_hr_question("How do I claim travel expenses?")
+    vector_store_build = 1  # the fake store embeds its corpus in one batch
+
+    assert embeddings.calls == 1 + vector_store_build
+    assert retrieval.stats()["lexical_fast_path"] == before["lexical_fast_path"]
+    assert retrieval.stats()["hybrid"] == before["hybrid"] + 1
+
+
+def test_answers_built_during_a_vector_outage_are_not_cached(fakes, monkeypatch):
+    monkeypatch.setattr(config, "SEMANTIC_CACHE_ENABLED", True)
+    store = fakes.get_vector_store()
+    outage = [True]
+    search_by_vector = store.similarity_search_by_vector
+
+    def flaky(*args, **kwargs):
+        if outage[0]:
+            raise ConnectionError("vector store unreachable")
+        return search_by_vector(*args, **kwargs)
+
+    monkeypatch.setattr(store, "similarity_search_by_vector", flaky)
+    degraded = hr_qa_tool.answer_hr_question("How do I claim travel expenses?")
+    outage[0] = False
+    recovered = hr_qa_tool.answer_hr_question("How do I claim travel expenses?")
+
+    assert degraded["source"] == "LLM (No Retrieval)"
+    assert recovered["source"] == "Vector DB + LLM"
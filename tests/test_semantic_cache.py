@@ -0,0 +1,50 @@
+from core.semantic_cache import SemanticCache
+
+LEAVE = [1.0, 0.0, 0.0]
+LEAVE_REPHRASED = [0.98, 0.2, 0.0]
+PAYROLL = [0.0, 1.0, 0.0]
+
+
+def test_hit_needs_the_similarity_threshold():
+    cache = SemanticCache(threshold=0.95, capacity=4)
+    cache.store(LEAVE, {"answer": "20 days"}, version=1)
+
+    value, similarity = cache.lookup(LEAVE_REPHRASED, version=1)
+    assert value == {"answer": "20 days"}
+    assert 0.95 <= similarity < 1.0
+    assert cache.lookup(PAYROLL, version=1) is None
+    assert SemanticCache(threshold=0.99).lookup(LEAVE_REPHRASED, version=1) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_new_store_version_drops_every_entry():
+    cache = SemanticCache(threshold=0.9, capacity=4)
+    cache.store(LEAVE, {"answer": "20 days"}, version=1)
+
+    assert cache.lookup(LEAVE, version=2) is None
+    assert cache.stats()["entries"] == 0
+    assert cache.lookup(LEAVE, version=1) is None
+
+
+def test_hits_are_private_copies():
+    cache = SemanticCache(threshold=0.9, capacity=4)
+    stored = {"answer": "20 days", "reasoning": ["policy"]}
+    cache.store(LEAVE, stored, version=1)
+    stored["reasoning"].append("edited after storing")
+
+    first, _ = cache.lookup(LEAVE, version=1)
+    first["reasoning"].append("edited by a caller")
+
+    assert cache.lookup(LEAVE, version=1)[0] == {"answer": "20 days", "reasoning": ["policy"]}
+
+
+def test_least_recently_used_entry_is_overwritten_when_full():
+    cache = SemanticCache(threshold=0.9, capacity=2)
+    cache.store(LEAVE, "leave", version=1)
+    cache.store(PAYROLL, "payroll", version=1)
+    cache.lookup(LEAVE, version=1)
+    cache.store([0.0, 0.0, 1.0], "benefits", version=1)
+
+    assert cache.lookup(PAYROLL, version=1) is None
+    assert cache.lookup(LEAVE, version=1)[0] == "leave"
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,99 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from core import server as agent_server
+
+
+@pytest.fixture
+def serve(fakes):
+    """Factory of servers on free ports, shut down after the test."""
+    started = []
+
+    def make(workers=1, queue_depth=0):
+        srv = agent_server.make_server(host="127.0.0.1", port=0, workers=workers, queue_depth=queue_depth)
+        agent_server.start(srv, warm=False)
+        started.append(srv)
+        return srv
+
+    yield make
+    for srv in started:
+        srv.shutdown()
+        srv.close()
+
+
+def _request(srv, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection(*srv.server_address, timeout=5)
+    try:
+        if isinstance(body, dict):
+            body = json.dumps(body).encode("utf-8")
+        conn.putrequest(method, path)
+        for name, value in (headers or {}).items():
+            conn.putheader(name, value)
+        if body is not None and "Content-Length" not in (headers or {}):
+            conn.putheader("Content-Length", str(len(body)))
+        conn.endheaders(body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        conn.close()
+
+
+def test_full_queue_answers_429(serve):
+    srv = serve(workers=1, queue_depth=0)
+    release = threading.Event()
+    srv.dispatcher.submit(release.wait)
+    try:
+        status, body = _request(srv, "POST", "/v1/hr_qa", {"question": "Annual leave?"})
+    finally:
+        release.set()
+
+    assert status == 429
+    assert "busy" in body["error"]
+    assert srv.dispatcher.stats()["rejected"] == 1
+
+
+def test_deadline_passing_in_the_queue_answers_504(serve):
+    srv = serve(workers=1, queue_depth=1)
+    release = threading.Event()
+    srv.dispatcher.submit(release.wait)
+    responses = []
+    client = threading.Thread(target=lambda: responses.append(_request(
+        srv, "POST", "/v1/hr_qa", {"question": "Annual leave?"}, {"X-Deadline-Seconds": "0.05"}
+    )))
+    client.start()
+    client.join(0.2)
+    release.set()
+    client.join()
+
+    status, body = responses[0]
+    assert status == 504
+    assert "passed while queued" in body["error"]
+
+
+@pytest.mark.parametrize("headers, status", [
+    ({"Content-Length": "abc"}, 400),
+    ({"Content-Length": "-1"}, 400),
+    ({"Content-Length": str(10 ** 12)}, 413),
+    ({"X-Deadline-Seconds": "soon"}, 400),
+    ({"X-Deadline-Seconds": "-3"}, 400),
+    ({"X-Deadline-Seconds": "nan"}, 400),
+])
+def test_malformed_headers_are_rejected(serve, headers, status):
+    srv = serve()
+    body = b"{}" if "Content-Length" not in headers else None
+
+    assert _request(srv, "POST", "/v1/hr_qa", body, headers)[0] == status
+
+
+def test_missing_content_length_answers_411(serve):
+    assert _request(serve(), "POST", "/v1/hr_qa")[0] == 411
+
+
+def test_bad_payload_deadline_and_timeout_answer_400(serve):
+    srv = serve()
+
+    assert _request(srv, "POST", "/v1/hr_qa", {"question": "q", "deadline_seconds": "x"})[0] == 400
+    assert _request(srv, "GET", "/v1/explanation/abc?timeout=later")[0] == 400
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core import call_policy, singleflight
+
+FOLLOWERS = 3
+
+
+@pytest.fixture(autouse=True)
+def no_flights_left():
+    yield
+    assert singleflight.stats()["in_flight"] == 0
+
+
+def _wait_for_followers(count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while singleflight.stats()["coalesced"] < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def _overlapping(fn, coalesced=FOLLOWERS):
+    """Run `singleflight.do` from a leader and FOLLOWERS threads; returns their outcomes."""
+    release = threading.Event()
+    calls = []
+
+    def leader_fn():
+        calls.append(1)
+        release.wait(2)
+        return fn()
+
+    outcomes = [None] * (FOLLOWERS + 1)
+
+    def run(n):
+        try:
+            outcomes[n] = singleflight.do("hr_qa", {"question": "Leave?"}, leader_fn)
+        except Exception as e:
+            outcomes[n] = e
+
+    threads = [threading.Thread(target=run, args=(n,)) for n in range(FOLLOWERS + 1)]
+    threads[0].start()
+    while not calls:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    _wait_for_followers(coalesced)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return outcomes, len(calls)
+
+
+def test_overlapping_calls_share_one_execution_with_private_copies():
+    outcomes, executions = _overlapping(lambda: {"answer": "20 days", "reasoning": ["policy"]})
+
+    assert executions == 1
+    results = [result for result, _ in outcomes]
+    assert all(r == results[0] for r in results)
+    assert sorted(shared for _, shared in outcomes) == [False] + [True] * FOLLOWERS
+
+    results[1]["reasoning"].append("edited by one caller")
+    assert all(r["reasoning"] == ["policy"] for n, r in enumerate(results) if n != 1)
+    assert singleflight.stats()["by_intent"]["hr_qa"] == {
+        "calls": FOLLOWERS + 1, "executions": 1, "coalesced": FOLLOWERS
+    }
+
+
+def test_every_waiter_gets_the_leaders_exception():
+    error = ValueError("tool failed")
+
+    def fail():
+        raise error
+
+    outcomes, executions = _overlapping(fail)
+
+    assert executions == 1
+    assert all(outcome is error for outcome in outcomes)
+    assert singleflight.stats()["in_flight"] == 0
+
+
+def test_nothing_is_kept_after_the_flight_lands():
+    calls = []
+    for _ in range(2):
+        singleflight.do("hr_qa", {"question": "Leave?"}, lambda: calls.append(1) or {"answer": "x"})
+
+    assert len(calls) == 2
+
+
+def test_key_ignores_whitespace_and_argument_order():
+    key = singleflight.request_key("hr_qa", {"question": "Annual  leave?\n", "k": 4})
+
+    assert key == singleflight.request_key("hr_qa", {"k": 4, "question": "Annual leave?"})
+    assert key != singleflight.request_key("resume_screening", {"k": 4, "question": "Annual leave?"})
+    assert key != singleflight.request_key("hr_qa", {"k": 5, "question": "Annual leave?"})
+
+
+def test_async_waiters_share_one_execution_and_survive_a_cancelled_peer():
+    calls = []
+
+    async def tool():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"answer": "20 days"}
+
+    async def main():
+        tasks = [asyncio.ensure_future(singleflight.ado("hr_qa", {"question": "Leave?"}, tool))
+                 for _ in range(FOLLOWERS + 1)]
+        await asyncio.sleep(0.01)
+        tasks[0].cancel()  # the leader's caller gives up
+        return await asyncio.gather(*tasks[1:])
+
+    outcomes = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(result == {"answer": "20 days"} and shared for result, shared in outcomes)
+    assert outcomes[0][0] is not outcomes[1][0]
+
+
+def test_disabled_singleflight_runs_every_call(monkeypatch):
+    monkeypatch.setattr(singleflight.config, "SINGLEFLIGHT_ENABLED", False)
+
+    outcomes, executions = _overlapping(lambda: {"answer": "x"}, coalesced=0)
+
+    assert executions == FOLLOWERS + 1
+    assert not any(shared for _, shared in outcomes)
+
+
+
+def _lead_in_background(budget, release, calls):
+    """Start a leader under `budget` seconds that runs until `release` is set."""
+    def slow():
+        calls.append("leader")
+        release.wait(2)
+        return {"answer": "from the leader"}
+
+    def run():
+        with call_policy.budget(budget):
+            singleflight.do("hr_qa", {"question": "Leave?"}, slow)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    while not calls:
+        time.sleep(0.001)
+    return thread
+
+
+def test_follower_gives_up_when_its_own_deadline_passes():
+    release, calls = threading.Event(), []
+    leader = _lead_in_background(None, release, calls)
+    started = time.monotonic()
+    try:
+        with call_policy.budget(0.05), pytest.raises(call_policy.DeadlineExceeded):
+            singleflight.do("hr_qa", {"question": "Leave?"}, lambda: {"answer": "own"})
+    finally:
+        release.set()
+        leader.join()
+
+    assert time.monotonic() - started < 1.0
+    assert calls == ["leader"]
+
+
+def test_longer_deadline_does_not_join_a_shorter_budgeted_flight():
+    release, calls = threading.Event(), []
+    leader = _lead_in_background(0.5, release, calls)
+    try:
+        result, shared = singleflight.do("hr_qa", {"question": "Leave?"}, lambda: {"answer": "own"})
+    finally:
+        release.set()
+        leader.join()
+
+    assert (result, shared) == ({"answer": "own"}, False)
+    assert singleflight.stats()["coalesced"] == 0
+
+
+def test_async_follower_gives_up_when_its_own_deadline_passes():
+    async def slow():
+        await asyncio.sleep(0.5)
+        return {"answer": "from the leader"}
+
+    async def follow():
+        with call_policy.budget(0.05):
+            return await singleflight.ado("hr_qa", {"question": "Leave?"}, slow)
+
+    async def main():
+        leader = asyncio.ensure_future(singleflight.ado("hr_qa", {"question": "Leave?"}, slow))
+        await asyncio.sleep(0.01)
+        with pytest.raises(call_policy.DeadlineExceeded):
+            await follow()
+        return await leader
+
+    assert asyncio.run(main()) == ({"answer": "from the leader"}, False)
@@ -0,0 +1,56 @@
+import pytest
+
+from core.agent import Intent, run_agent, stream_agent
+
+SCREENING = {"resume_text": "Python, SQL, Docker", "job_description": "Python, SQL"}
+EVALUATION = {
+    "question": "What is a REST API?",
+    "answer": "An HTTP interface over resources.",
+    "job_description": "Backend engineer",
+    "role_level": "Junior"
+}
+
+
+def _kinds(events):
+    """Event types with consecutive repeats collapsed: token, token, result -> token, result."""
+    kinds = []
+    for event in events:
+        if not kinds or kinds[-1] != event["type"]:
+            kinds.append(event["type"])
+    return kinds
+
+
+def test_hr_answer_streams_tokens_then_the_result(fakes):
+    events = list(stream_agent(Intent.HR_QA, {"question": "How many days of annual leave do I get?"}))
+
+    assert _kinds(events) == ["token", "result"]
+    assert len(events) > 2
+    assert "".join(e["text"] for e in events[:-1]) == events[-1]["result"]["answer"]
+
+
+def test_screening_streams_the_score_before_the_explanation(fakes):
+    events = list(stream_agent(Intent.RESUME_SCREENING, SCREENING))
+
+    assert _kinds(events) == ["partial", "token", "result"]
+    assert events[0]["fields"] == {"match_percentage": 100.0, "recommendation": "Shortlist"}
+    result = events[-1]["result"]
+    assert "".join(e["text"] for e in events if e["type"] == "token") == result["explanation"]
+    assert result == run_agent(Intent.RESUME_SCREENING, SCREENING)
+
+
+def test_evaluation_streams_partial_fields_then_the_same_result_as_run_agent(fakes):
+    events = list(stream_agent(Intent.INTERVIEW_EVALUATION, EVALUATION))
+
+    assert _kinds(events) == ["partial", "result"]
+    assert events[-2]["fields"]["overall_score"] == events[-1]["result"]["overall_score"]
+    assert events[-1]["result"] == run_agent(Intent.INTERVIEW_EVALUATION, EVALUATION)
+
+
+@pytest.mark.parametrize("intent, payload", [
+    (Intent.CANDIDATE_SEARCH, {"job_description": "Python"}),
+    ("not_an_intent", {}),
+])
+def test_intents_without_a_stream_yield_only_the_result(fakes, intent, payload):
+    events = list(stream_agent(intent, payload))
+
+    assert [e["type"] for e in events] == ["result"]
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from core import config, llm_cache, structured_output
+from core.fakes import FakeLLM
+
+
+@pytest.fixture
+def flaky_llm(monkeypatch):
+    """JSON only when asked with the retry instruction."""
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True)
+    llm_cache.set_cache(llm_cache.LLMCache())
+
+    def reply(prompt):
+        if prompt.startswith(structured_output.RETRY_PREFIX):
+            return '{"score": 7}'
+        return "Sorry, I can only describe the score in words."
+
+    return FakeLLM(reply=reply)
+
+
+def test_successful_retry_is_cached_for_the_original_prompt(flaky_llm):
+    assert structured_output.structured_invoke(flaky_llm, "rate it") == {"score": 7}
+    assert flaky_llm.calls == 2
+
+    assert structured_output.structured_invoke(flaky_llm, "rate it") == {"score": 7}
+    assert flaky_llm.calls == 2
+
+
+def test_successful_stream_retry_is_cached_for_the_original_prompt(flaky_llm):
+    events = list(structured_output.stream_structured(flaky_llm, "rate it"))
+    assert events[-1] == ("final", {"score": 7})
+
+    assert list(structured_output.stream_structured(flaky_llm, "rate it")) == [("final", {"score": 7})]
+    assert flaky_llm.calls == 2
+
+
+def test_successful_async_retry_is_cached_for_the_original_prompt(flaky_llm):
+    assert asyncio.run(structured_output.astructured_invoke(flaky_llm, "rate it")) == {"score": 7}
+    assert asyncio.run(structured_output.astructured_invoke(flaky_llm, "rate it")) == {"score": 7}
+    assert flaky_llm.calls == 2
+
+
+def test_unparseable_output_is_not_cached(monkeypatch):
+    monkeypatch.setattr(config, "LLM_CACHE_ENABLED", True)
+    llm_cache.set_cache(llm_cache.LLMCache())
+    llm = FakeLLM(reply="no json here")
+
+    for _ in range(2):
+        with pytest.raises(structured_output.StructuredOutputError):
+            structured_output.structured_invoke(llm, "rate it")
+    assert llm.calls == 4
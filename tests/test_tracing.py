@@ -0,0 +1,30 @@
+import threading
+
+import pytest
+
+from core import tracing
+
+
+@pytest.fixture(autouse=True)
+def tracing_on(monkeypatch):
+    monkeypatch.setattr(tracing, "_enabled", True)
+
+
+def test_last_trace_is_the_callers_own():
+    seen = {}
+    started = threading.Barrier(2)
+
+    def session(intent):
+        with tracing.trace(intent):
+            started.wait(2)
+        started.wait(2)  # both traces have finished
+        seen[intent] = tracing.last_trace()["intent"]
+
+    threads = [threading.Thread(target=session, args=(intent,)) for intent in ("hr_qa", "resume_screening")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == {"hr_qa": "hr_qa", "resume_screening": "resume_screening"}
+    assert {"hr_qa", "resume_screening"} <= {t["intent"] for t in tracing.recent_traces()}
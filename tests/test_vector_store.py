@@ -0,0 +1,89 @@
+import pytest
+
+from core import config, vector_store
+from core.fakes import FakeEmbeddings
+
+LEAVE = "\n\n".join(f"Employees accrue {n} days of annual leave after {n} years. " * 6 for n in range(8))
+PAYROLL = "Payroll runs on the last business day of each month."
+
+
+class Outage(Exception):
+    pass
+
+
+class FailingEmbeddings(FakeEmbeddings):
+    """Fails every embedding request after the first `succeed` ones."""
+
+    def __init__(self, succeed=None):
+        super().__init__()
+        self.succeed = succeed
+
+    def embed_documents(self, texts):
+        if self.succeed is not None and self.calls >= self.succeed:
+            raise Outage("provider down")
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def knowledge(tmp_path, monkeypatch):
+    """An empty knowledge base directory; the index lives under tmp_path."""
+    data, db = tmp_path / "hr_knowledge", tmp_path / "vector_db"
+    data.mkdir()
+    monkeypatch.setattr(config, "VECTOR_BACKEND", "numpy")
+    monkeypatch.setattr(config, "EMBED_FLUSH_CHUNKS", 1)
+    monkeypatch.setattr(vector_store, "DATA_DIR", str(data))
+    monkeypatch.setattr(vector_store, "VECTOR_DB_DIR", str(db))
+    for name, file in (("MANIFEST_PATH", "manifest.json"), ("NUMPY_INDEX_DIR", "numpy"),
+                       ("JOURNAL_PATH", "build_journal.jsonl"), ("BM25_PATH", "bm25.json")):
+        monkeypatch.setattr(vector_store, name, str(db / file))
+    (data / "leave.txt").write_text(LEAVE)
+    (data / "payroll.txt").write_text(PAYROLL)
+    return data
+
+
+def _build(embeddings):
+    return vector_store.build_vector_store(embeddings, batch_size=1, concurrency=1)
+
+
+def _stored(embeddings):
+    return len(vector_store.load_vector_store(embeddings))
+
+
+def test_unchanged_files_are_not_embedded_again(knowledge):
+    first = _build(FakeEmbeddings())
+    embeddings = FakeEmbeddings()
+    again = _build(embeddings)
+
+    assert first["chunks_added"] == _stored(embeddings) > 2
+    assert again["files_unchanged"] == 2
+    assert again["chunks_added"] == 0
+    assert embeddings.calls == 0
+
+
+def test_changed_and_deleted_files_are_synced(knowledge):
+    _build(FakeEmbeddings())
+    (knowledge / "payroll.txt").write_text("Payroll runs on the 25th of each month.")
+    (knowledge / "leave.txt").unlink()
+    embeddings = FakeEmbeddings()
+
+    summary = _build(embeddings)
+
+    assert (summary["files_changed"], summary["files_removed"]) == (1, 1)
+    assert summary["chunks_added"] == 1
+    assert summary["chunks_removed"] > 1
+    assert _stored(embeddings) == 1
+    assert [d.page_content for d in vector_store.load_vector_store(embeddings).similarity_search("payroll")] == [
+        "Payroll runs on the 25th of each month."
+    ]
+
+
+def test_resumed_build_counts_only_the_chunks_it_embedded(knowledge):
+    with pytest.raises(Outage):
+        _build(FailingEmbeddings(succeed=2))
+    embeddings = FakeEmbeddings()
+
+    summary = _build(embeddings)
+
+    assert summary["chunks_resumed"] == 2
+    assert summary["chunks_added"] == embeddings.calls
+    assert summary["chunks_added"] + summary["chunks_resumed"] == _stored(embeddings)
@@ -0,0 +1,79 @@
+"""
+Pre-generate interview questions for every open posting.
+
+Postings are a JSONL file of {"id": ..., "job_description": "..."} records
+or a directory of .txt job descriptions (one posting per file). Questions
+are generated once per near-duplicate group and role level and stored in
+the question bank, so interactive generation becomes a lookup.
+
+    python warm_question_bank.py postings.jsonl --levels Junior Mid Senior --workers 8
+    python warm_question_bank.py postings/ --refresh
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from core.question_bank import get_bank, warm
+
+
+def read_postings(path):
+    """`(posting_id, job_description)` pairs from a JSONL file or a directory."""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".txt"):
+                with open(os.path.join(path, name), "r", encoding="utf-8") as f:
+                    yield name, f.read()
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            job_description = record.get("job_description") or ""
+            if job_description.strip():
+                yield record.get("id", line_no), job_description
+
+
+def _progress(every):
+    def report(done, total):
+        if done % every == 0 or done == total:
+            print(f"  {done}/{total} generated", file=sys.stderr)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("postings", help="JSONL of {id, job_description} or a directory of .txt files")
+    parser.add_argument("--levels", nargs="+", default=["Junior", "Mid", "Senior"])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--refresh", action="store_true", help="regenerate questions already banked")
+    parser.add_argument("--fake", action="store_true", help="use local stand-ins instead of OpenAI")
+    parser.add_argument("--progress-every", type=int, default=25)
+    args = parser.parse_args()
+
+    if args.fake:
+        from core.fakes import install_fakes
+
+        install_fakes()
+
+    summary = warm(
+        read_postings(args.postings),
+        role_levels=args.levels,
+        workers=args.workers,
+        refresh=args.refresh,
+        progress=_progress(max(args.progress_every, 1))
+    )
+    print(
+        f"{summary['postings']} postings -> {summary['fingerprints']} distinct "
+        f"({summary['near_duplicates']} near-duplicates); {summary['generated']} generated, "
+        f"{summary['already_banked']} already banked, {summary['failed']} failed "
+        f"in {summary['seconds']}s"
+    )
+    print(f"Bank now holds {len(get_bank())} (posting, role level) entries")
+
+
+if __name__ == "__main__":
+    main()